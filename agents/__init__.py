@@ -8,6 +8,8 @@ from .job_intelligence_agent import job_intelligence
 from .application_writer_agent import application_writer
 from .interview_prep_agent import interview_prep_agent
 
+import copy
+
 
 # ============================================================================
 # HELPER FUNCTIONS FOR AGENT INTEGRATION
@@ -48,6 +50,50 @@ def get_all_agents():
 
     }
 
+_agent_variants = {}
+
+def agent_variant(agent, model_id=None, schema=None):
+    """
+    Copy of an agent bound to another model and/or a JSON response schema
+
+    Args:
+        agent: Agent to copy (all of its settings; tools are dropped with a
+            schema since Gemini does not combine the two)
+        model_id: Gemini model to use instead of the agent's own
+        schema: Pydantic model the response must match
+
+    Returns:
+        The agent itself when nothing changes, otherwise a copy made once
+        per (agent, model, schema)
+    """
+    model_id = model_id or agent.model.id
+    if schema is None and model_id == agent.model.id:
+        return agent
+    key = (agent.name, model_id, schema)
+    if key not in _agent_variants:
+        model = copy.copy(agent.model)
+        model.id = model_id
+        update = {'model': model}
+        if schema is not None:
+            model.generation_config = {'response_mime_type': 'application/json', 'response_schema': schema}
+            update['tools'] = None
+        _agent_variants[key] = agent.deep_copy(update=update)
+    return _agent_variants[key]
+
+def routed_agent(agent, call_class, schema=None):
+    """
+    Agent whose calls go through the shared model router: each run uses the
+    fastest healthy model of call_class's tier, falling over on errors
+
+    Args:
+        agent: Agent providing name, instructions and tools
+        call_class: Router call class, e.g. 'tailoring' or 'interview_prep'
+        schema: Optional pydantic model for JSON responses
+    """
+    from utils.model_router import RoutedAgent, get_model_router
+    return RoutedAgent(agent, call_class, get_model_router(),
+                       lambda base, model_id: agent_variant(base, model_id=model_id, schema=schema))
+
 def get_core_agents():
     """Get core specialist agents (excluding orchestrator)"""
     return {
@@ -71,5 +117,7 @@ __all__ = [
     # Helper functions
     'get_agent_by_name',
     'get_all_agents',
-    'get_core_agents'
+    'get_core_agents',
+    'agent_variant',
+    'routed_agent'
 ]
\ No newline at end of file
@@ -0,0 +1,10 @@
+"""
+Gunicorn settings shared by every deployment (see Dockerfile).
+Background services run per worker; they start once the worker has loaded
+the app instead of when main is imported.
+"""
+
+
+def post_worker_init(worker):
+    from main import start_background_services
+    start_background_services()
@@ -10,14 +10,18 @@ warnings.filterwarnings("ignore", category=DeprecationWarning)
 import os
 import sys
 import json
+import queue
 import time
 import argparse
+import contextvars
 import logging
 import re
 import threading
 import tempfile
+import shutil
 import traceback
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from functools import wraps
 from pathlib import Path
@@ -34,9 +38,9 @@ warnings.filterwarnings("ignore", category=DeprecationWarning, message=".*update
 warnings.filterwarnings("ignore", category=DeprecationWarning, message=".*create_document.*")
 
 # Third-party imports
+import markdown
 from dotenv import load_dotenv
-import pypdf
-from flask import Flask, request, jsonify, send_file, g, Response
+from flask import Flask, Request, request, jsonify, send_file, g, Response
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 from werkzeug.exceptions import RequestEntityTooLarge
@@ -55,14 +59,32 @@ from appwrite.role import Role
 
 # Local imports
 from agents import (
-    profile_builder,
-    job_intelligence,
-    interview_prep_agent
+    interview_prep_agent,
+    routed_agent
 )
 from utils import AdvancedJobScraper, CVTailoringEngine, ApplicationTracker
-from utils.scraping import extract_skills_from_description
-from utils.ai_retries import retry_ai_call
+from utils.scraping import extract_skills_from_description, register_job_cache_listener
+from utils.match_materializer import MatchMaterializer, normalize_location
+from utils.cache import build_cache
+from utils.matching import score_job_match, score_matrix
+from utils.query_planner import plan_queries, run_queries
+from utils.profile_updates import (
+    ProfileRevisions, affected_results, apply_profile_diff, diff_profile, structured_profile_from_doc
+)
+from utils.llm_cache import get_llm_cache, hash_job
+from utils.model_router import get_model_router
+from utils.llm_governor import get_llm_governor, llm_priority
+from utils.prompt_builder import PromptBuilder, format_job, JOB_TOKEN_BUDGET
+from utils.llm_stream import JSONFieldStream, sse_event
+from utils.structured_output import ProfileOutput, parse_structured
 from utils.pdf_generator import PDFGenerator
+from utils.cv_extraction import ImageOnlyPDFError, extract_document
+from utils.cv_parser import compact_cv_text, unpack_cv_text
+from utils.cv_cache import get_parsed_cv_cache, hash_cv_file, hash_cv_text
+from utils.stage_runner import StageRunner
+from utils.preview_store import get_preview_store
+from utils.background_jobs import BackgroundJobs, JobQueueFull
+from utils.uploads import HashingUploadFile, MAX_CV_UPLOAD_BYTES, UploadTooLarge, stream_to_tempfile, upload_suffix
 
 # Load environment variables
 load_dotenv()
@@ -90,6 +112,12 @@ DEFAULT_QUERY = os.getenv('SEARCH_QUERY', 'Python Developer')
 DEFAULT_LOCATION = os.getenv('LOCATION', 'South Africa')
 DEFAULT_MAX_JOBS = int(os.getenv('MAX_JOBS', '10'))
 
+# Cover letter, interview prep and uploads of one application run in parallel
+# on this pool (shared by all applications, so LLM concurrency stays bounded)
+APPLY_CONCURRENT_STAGES = os.getenv('APPLY_CONCURRENT_STAGES', 'true').lower() in ('1', 'true', 'yes')
+APPLY_STAGE_WORKERS = int(os.getenv('APPLY_STAGE_WORKERS', '4'))
+stage_executor = ThreadPoolExecutor(max_workers=APPLY_STAGE_WORKERS, thread_name_prefix='apply-stage')
+
 # ==========================================
 # Core Pipeline Class
 # ==========================================
@@ -107,68 +135,22 @@ class JobApplicationPipeline:
         self.tracker = ApplicationTracker()
         self.cv_engine = None
         self.profile = None
+        self.document = None
+        self.cv_hash = None
+        self.parsed_cv = None
         self.applications = []
         
-    def _normalize_cv_text(self, text: str) -> str:
-        try:
-            # Fix hyphenated line breaks: devel-\nopment -> development
-            text = re.sub(r"(\w)-\n(\w)", r"\1\2", text)
-            # Collapse excessive whitespace
-            text = re.sub(r"[ \t]+", " ", text)
-            text = re.sub(r"\n{3,}", "\n\n", text)
-            # Remove common placeholder artifacts
-            text = text.replace("\x0c", "\n").strip()
-        except Exception:
-            pass
-        return text
-
-    def _extract_pdf_text(self, path: str) -> str:
-        try:
-            reader = pypdf.PdfReader(path)
-            text_parts = []
-            for page in reader.pages:
-                t = page.extract_text() or ""
-                text_parts.append(t)
-            text = "\n".join(text_parts)
-            if len(text.strip()) >= 200:
-                return text
-        except Exception as e:
-            logger.warning(f"pypdf extraction failed: {e}")
-        try:
-            from pdfminer.high_level import extract_text as _pdfminer_extract_text  # type: ignore
-            text = _pdfminer_extract_text(path) or ""
-            if len(text.strip()) >= 200:
-                return text
-        except Exception as e:
-            logger.warning(f"pdfminer extraction unavailable/failed: {e}")
-        return ""
-
-    def _extract_docx_text(self, path: str) -> str:
-        try:
-            import docx  # type: ignore
-            doc = docx.Document(path)
-            return "\n".join([p.text for p in doc.paragraphs])
-        except Exception as e:
-            logger.warning(f"python-docx extraction failed: {e}")
-            try:
-                import zipfile
-                with zipfile.ZipFile(path) as z:
-                    xml = z.read("word/document.xml").decode("utf-8", errors="ignore")
-                    xml = re.sub(r"<(.|\n)*?>", "\n", xml)
-                    return "\n".join([l.strip() for l in xml.splitlines() if l.strip()])
-            except Exception as e2:
-                logger.warning(f"zip/docx fallback failed: {e2}")
-        return ""
-
-    def _extract_doc_text(self, path: str) -> str:
-        try:
-            import textract  # type: ignore
-            return textract.process(path).decode("utf-8", errors="ignore")
-        except Exception as e:
-            logger.warning(f"textract .doc extraction unavailable/failed: {e}")
-        return ""
+    def load_cached_cv(self, cv_hash):
+        """Restore CV text and parse results from the parsed-CV cache; None on a miss"""
+        parsed = get_parsed_cv_cache().get(cv_hash) if cv_hash else None
+        if parsed is None:
+            return None
+        self.cv_hash = cv_hash
+        self.parsed_cv = parsed
+        logger.info(f"Parsed CV cache hit for {cv_hash[:12]}")
+        return parsed.cv_content
 
-    def load_cv(self):
+    def load_cv(self, cv_hash=None):
         """Load CV content from file with robust extraction"""
         logger.info(f"Loading CV from: {self.cv_path}")
         print(f"\n📄 Loading CV from: {self.cv_path}")
@@ -179,89 +161,68 @@ class JobApplicationPipeline:
             # For now keeping behavior consistent.
             raise FileNotFoundError(f"CV not found at {self.cv_path}")
 
-        ext = Path(self.cv_path).suffix.lower()
-        content = ""
-        if ext == ".pdf":
-            print("📄 Extracting text from PDF...")
-            content = self._extract_pdf_text(self.cv_path)
-        elif ext == ".docx":
-            print("📄 Extracting text from DOCX...")
-            content = self._extract_docx_text(self.cv_path)
-        elif ext == ".doc":
-            print("📄 Extracting text from DOC...")
-            content = self._extract_doc_text(self.cv_path)
-        else:
-            try:
-                with open(self.cv_path, "r", encoding="utf-8") as f:
-                    content = f.read()
-            except Exception as e:
-                logger.error(f"Unsupported CV format or read error: {e}")
-                raise
-        
+        # Skip extraction and parsing entirely for a CV we have seen before
+        self.cv_hash = cv_hash or hash_cv_file(self.cv_path)
+        cached_content = self.load_cached_cv(self.cv_hash)
+        if cached_content:
+            print(f"✓ CV loaded from cache ({len(cached_content)} characters)")
+            return cached_content
+
+        # Decode the file once; build_profile reuses the same document for parsing.
+        # The full text (page-capped) is read since it becomes the master CV
+        print(f"📄 Extracting text from {Path(self.cv_path).suffix.upper().lstrip('.') or 'file'}...")
+        try:
+            self.document = extract_document(self.cv_path)
+        except Exception as e:
+            logger.error(f"Unsupported CV format or read error: {e}")
+            raise
+        logger.info(f"CV extracted with {self.document.engine} ({self.document.page_count} pages)")
+        if self.document.image_only:
+            raise ImageOnlyPDFError(
+                "This PDF is a scanned image with no selectable text. "
+                "Please upload a text-based PDF or a Word document."
+            )
+
+        content = self.document.text
         if not content or len(content.strip()) < 50:
             print("⚠️ CV text extraction weak; using minimal content placeholder")
             content = f"Extracted from {self.cv_path}: insufficient text for analysis."
-        content = self._normalize_cv_text(content)
         print(f"✓ CV loaded ({len(content)} characters)")
         return content
     
-    @retry_ai_call
     def build_profile(self, cv_content):
         """Build student profile using Rule-Based Parser"""
         logger.info("Building candidate profile (Rule-Based)...")
         print("\n🔍 Building candidate profile...")
         
         try:
-            from utils.cv_parser import CVParser
-            
-            # Use file path if available and PDF, otherwise use content
-            parser = None
-            if self.cv_path and self.cv_path.lower().endswith('.pdf'):
-                parser = CVParser(file_path=self.cv_path)
+            from utils.cv_parser import CVParser, build_profile_from_cv_data
+
+            # Content we have parsed before (same file or same text) skips the parser
+            cache = get_parsed_cv_cache()
+            if self.parsed_cv is None:
+                self.parsed_cv = cache.get(hash_cv_text(cv_content))
+            if self.parsed_cv is not None and self.parsed_cv.cv_content == cv_content:
+                self.profile = dict(self.parsed_cv.profile)
+                self.cv_engine = CVTailoringEngine(cv_content, self.profile, parsed_cv_data=self.parsed_cv.cv_data)
+                print("✓ Profile restored from parsed CV cache")
+                return self.profile
+
+            # Reuse the document decoded by load_cv; otherwise parse the given content
+            if self.document is not None and self.document.is_pdf:
+                parser = CVParser(document=self.document)
             else:
                 parser = CVParser(raw_text=cv_content)
                 
             cv_data = parser.parse()
-            
-            # Map CVData to flat profile structure
-            skills = []
-            if cv_data.technical_skills:
-                for cat, s_list in cv_data.technical_skills.items():
-                    skills.extend(s_list)
-            
-            # Education
-            education_str = "Not specified"
-            if cv_data.education:
-                top_edu = cv_data.education[0]
-                education_str = top_edu.degree
-                if top_edu.institution:
-                    education_str += f" at {top_edu.institution}"
-                
-            # Experience Level Heuristic from work experience
-            exp_level = "Entry Level"
-            if cv_data.work_experience:
-                years_of_exp = len(cv_data.work_experience) * 1.5 # Rough estimate
-                if any('senior' in exp.title.lower() for exp in cv_data.work_experience):
-                    exp_level = "Senior"
-                elif years_of_exp > 5:
-                    exp_level = "Senior"
-                elif years_of_exp > 2:
-                    exp_level = "Mid Level"
-            
-            self.profile = {
-                "name": cv_data.contact_info.name or "Unknown",
-                "email": cv_data.contact_info.email or "",
-                "phone": cv_data.contact_info.phone or "",
-                "location": cv_data.contact_info.address or "",
-                "skills": list(set(skills)), # Unique skills
-                "experience_level": exp_level,
-                "education": education_str,
-                "strengths": skills[:5], # Use top skills as strengths
-                "career_goals": cv_data.professional_profile or "To leverage my skills in a challenging role."
-            }
+            self.profile = build_profile_from_cv_data(cv_data)
+
+            # Cache by file hash (uploads, rehydration) and by text hash (builder fallback)
+            for key in {self.cv_hash, hash_cv_text(cv_content)}:
+                cache.put(key, cv_content, cv_data, self.profile)
             
             # Initialize CV Engine with the loaded profile
-            self.cv_engine = CVTailoringEngine(cv_content, self.profile)
+            self.cv_engine = CVTailoringEngine(cv_content, self.profile, parsed_cv_data=cv_data)
             
             print("✓ Profile built successfully (Rule-Based)")
             return self.profile
@@ -287,7 +248,7 @@ class JobApplicationPipeline:
             self.cv_engine = CVTailoringEngine(cv_content, self.profile)
             return self.profile
     
-    def search_jobs(self, query, location, max_results):
+    def search_jobs(self, query, location, max_results, notify_listeners=True):
         """Search for jobs using the scraper"""
         print(f"DEBUG: Entering search_jobs with query='{query}', location='{location}'")
         logger.info(f"Searching for jobs: '{query}' in {location}")
@@ -299,7 +260,8 @@ class JobApplicationPipeline:
                 search_term=query,
                 location=location,
                 results_wanted=max_results,
-                country_indeed=location
+                country_indeed=location,
+                notify_listeners=notify_listeners
             )
             
             if jobs:
@@ -315,8 +277,17 @@ class JobApplicationPipeline:
             # Return empty list instead of crashing
             return []
     
-    def generate_application_package(self, job, template_type=None):
-        """Generate optimized CV (PDF) and cover letter for a specific job"""
+    def generate_application_package(self, job, template_type=None, regenerate=False, preview=None,
+                                     interview_prep=False, concurrent=APPLY_CONCURRENT_STAGES):
+        """
+        Generate optimized CV (PDF) and cover letter for a specific job.
+        With a stored apply-preview the approved CV version and cover letter
+        are rendered as-is; regenerate bypasses the LLM cache.
+
+        In concurrent mode the cover letter (written from the master CV) and
+        interview prep (job only) run alongside CV tailoring on the shared
+        stage executor. Per-stage timings are returned under 'timings'.
+        """
         job_title = job.get('title', 'Unknown Position')
         company = job.get('company', 'Unknown Company')
         timestamp = datetime.now().strftime('%Y%m%d_%H%M')
@@ -327,15 +298,38 @@ class JobApplicationPipeline:
         logger.info(f"Generating application for: {job_title} at {company}")
         print(f"\n✍️  Generating application for: {job_title} at {company}")
 
+        stages = StageRunner(stage_executor if concurrent else None)
+        timed = stages.timed
+
+        def cover_letter(tailored_cv):
+            if preview:
+                cl_markdown = preview['cover_letter_markdown']
+            else:
+                cl_markdown = timed('cover_letter', self.cv_engine._generate_cover_letter_markdown,
+                                    job, tailored_cv=tailored_cv, regenerate=regenerate)
+            return timed('cover_letter_pdf', self.cv_engine.save_cover_letter, job, cl_markdown, output_dir=str(app_dir)) or cl_markdown
+
+        def interview():
+            return timed('interview_prep', self.prepare_interview, job, output_dir=str(app_dir), regenerate=regenerate)
+
         try:
-            cv_content, ats_analysis = self.cv_engine.generate_tailored_cv(job, template_type)
-            if not self.cv_engine.cv_versions:
-                 logger.error("No CV versions generated")
-                 return None
-            version_id = list(self.cv_engine.cv_versions.keys())[-1]
-            cv_data = self.cv_engine.get_cv_version(version_id) or {}
-
-            pdf_path = self.cv_engine.export_cv(version_id, format='pdf', output_dir=str(app_dir))
+            # Independent stages start first so they overlap CV tailoring
+            stages.start('cover_letter', cover_letter, None)
+            if interview_prep:
+                stages.start('interview_prep', interview)
+
+            if preview:
+                version_id = preview['version_id']
+                cv_data = self.cv_engine.restore_cv_version(version_id, preview['cv_version'])
+                cv_content, ats_analysis = cv_data['cv_content'], cv_data['ats_analysis']
+            else:
+                cv_content, ats_analysis, version_id = timed('tailored_cv', self.cv_engine.generate_tailored_cv,
+                                                             job, template_type, regenerate=regenerate)
+                if not version_id:
+                     raise RuntimeError("No CV versions generated")
+                cv_data = self.cv_engine.get_cv_version(version_id) or {}
+
+            pdf_path = timed('cv_pdf', self.cv_engine.export_cv, version_id, format='pdf', output_dir=str(app_dir))
             final_cv_path = app_dir / 'cv.pdf'
             try:
                 os.replace(pdf_path, final_cv_path)
@@ -343,7 +337,8 @@ class JobApplicationPipeline:
                 final_cv_path = Path(pdf_path)
             print(f"✓ CV generated: {final_cv_path}")
 
-            cover_letter_result = self.cv_engine.generate_cover_letter(job, tailored_cv=cv_content, output_dir=str(app_dir))
+            # Sequential mode keeps writing the cover letter from the tailored CV
+            cover_letter_result = stages.result('cover_letter', cover_letter, cv_content)
             if isinstance(cover_letter_result, str) and cover_letter_result.endswith('.pdf') and os.path.exists(cover_letter_result):
                 cl_temp = Path(cover_letter_result)
                 final_cl_path = app_dir / 'cover_letter.pdf'
@@ -358,6 +353,12 @@ class JobApplicationPipeline:
                     f.write(cover_letter_result if isinstance(cover_letter_result, str) else str(cover_letter_result))
                 print(f"✓ Cover Letter saved: {final_cl_path}")
 
+            interview_prep_path = None
+            if interview_prep:
+                interview_prep_path = stages.result('interview_prep', interview)
+            timings = stages.finish()
+            logger.info(f"Application stages for {job_title} at {company}: {timings}")
+
             metadata = {
                 'job': {
                     'title': job_title,
@@ -399,12 +400,17 @@ class JobApplicationPipeline:
                 'metadata_path': str(metadata_path),
                 'ats_score': cv_data.get('ats_score'),
                 'ats_analysis': ats_analysis,
-                'app_id': app_id
+                'app_id': app_id,
+                'interview_prep_path': interview_prep_path,
+                'timings': timings
             }
 
         except Exception as e:
             logger.error(f"Error generating application: {e}")
             print(f"✗ Error generating application: {e}")
+            # Stop the background stages before dropping their output directory
+            stages.cancel()
+            shutil.rmtree(app_dir, ignore_errors=True)
             return None
 
     def run(self, query, location, max_applications, template=None):
@@ -430,19 +436,17 @@ class JobApplicationPipeline:
         
         for i, job in enumerate(jobs):
             print(f"\n--- Application {i+1}/{len(jobs)} ---")
-            app_result = self.generate_application_package(job, template_type=template)
+            # Interview prep is generated with the package
+            app_result = self.generate_application_package(job, template_type=template, interview_prep=True)
             
             if app_result:
                 self.applications.append(app_result)
-                # Optional: Generate Interview Prep
-                self.prepare_interview(job, output_dir=app_result['app_dir'])
                 
             if i < len(jobs) - 1:
                 time.sleep(2)
                 
-    @retry_ai_call
-    def prepare_interview(self, job, output_dir=None):
-        """Generate interview preparation materials for a job"""
+    def prepare_interview(self, job, output_dir=None, regenerate=False):
+        """Generate interview preparation materials for a job (cached per job; regenerate asks the model again)"""
         job_title = job.get('title', 'Unknown Position')
         company = job.get('company', 'Unknown Company')
         
@@ -451,12 +455,10 @@ class JobApplicationPipeline:
         
         try:
             # Generate interview prep using the interview_prep_agent
-            response = interview_prep_agent.run(f"""
-            Prepare comprehensive interview materials for this position:
-            
-            Job: {job_title}
-            Company: {company}
-            Description: {job.get('description', 'Not provided')}
+            prompt = (PromptBuilder('interview_prep')
+                      .add('Job', format_job(job), JOB_TOKEN_BUDGET)
+                      .instructions("""
+            Prepare comprehensive interview materials for this position.
             
             Generate:
             1. Likely interview questions (8-10 questions)
@@ -465,6 +467,11 @@ class JobApplicationPipeline:
             4. Key topics to research about the company
             5. Technical concepts to review
             """)
+                      .build())
+            # Routed to the fastest healthy model of the interview prep tier
+            agent = routed_agent(interview_prep_agent, 'interview_prep')
+            response = get_llm_cache().run(agent, prompt.text, 'interview_prep',
+                                           regenerate=regenerate, job=hash_job(job))
             
             # Save interview prep to file
             out_dir = Path(output_dir) if output_dir else self.output_dir
@@ -504,7 +511,14 @@ class JobApplicationPipeline:
 # Flask API Server Setup & Helpers
 # ==========================================
 
+class UploadRequest(Request):
+    """Streams multipart file parts straight into hashed, size-capped temp files"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return HashingUploadFile(app.config['UPLOAD_FOLDER'], upload_suffix(filename), MAX_CV_UPLOAD_BYTES)
+
 app = Flask(__name__)
+app.request_class = UploadRequest
 
 # Configure CORS
 allowed_origins = os.getenv('CORS_ORIGINS', '').split(',')
@@ -527,7 +541,9 @@ CORS(app, resources={
 })
 
 app.secret_key = os.getenv('SECRET_KEY') or os.urandom(24)
-app.config['MAX_CONTENT_LENGTH'] = 10 * 1024 * 1024
+# Multipart framing and form fields on top of the file itself
+UPLOAD_FORM_OVERHEAD_BYTES = 64 * 1024
+app.config['MAX_CONTENT_LENGTH'] = MAX_CV_UPLOAD_BYTES + UPLOAD_FORM_OVERHEAD_BYTES
 
 # Initialize Appwrite Client (Server Side Default)
 client = Client()
@@ -560,92 +576,92 @@ COLLECTION_ID_ANALYTICS = 'analytics'
 COLLECTION_ID_MATCHES = 'matches'
 
 # Global storage for pipelines and profiles
-store_lock = threading.Lock()
+# Reentrant: rehydration takes it while callers such as _preview_pipeline already hold it
+store_lock = threading.RLock()
 pipeline_store = {}
 profile_store = {}
 
 # ==========================================
 # Caching Layer
 # ==========================================
-from datetime import timedelta
 import hashlib
 
-# Profile cache with TTL (1 hour)
-profile_cache = {}  # {user_id: {data, cached_at}}
-profile_cache_ttl = timedelta(hours=1)
+# Bounded LRU+TTL caches, shared by all gunicorn workers on the host
+# (CACHE_BACKEND=memory gives each worker its own copy: single worker only)
+PROFILE_CACHE_TTL_SECS = int(os.getenv('PROFILE_CACHE_TTL_SECS', str(60 * 60)))
+PROFILE_CACHE_MAX_ENTRIES = int(os.getenv('PROFILE_CACHE_MAX_ENTRIES', '1000'))
+MATCH_CACHE_TTL_SECS = int(os.getenv('MATCH_CACHE_TTL_SECS', str(6 * 60 * 60)))
+MATCH_CACHE_MAX_ENTRIES = int(os.getenv('MATCH_CACHE_MAX_ENTRIES', '2000'))
 
-# Match results cache with TTL (6 hours)
-match_cache = {}  # {cache_key: {matches, cached_at}}
-match_cache_ttl = timedelta(hours=6)
+profile_cache = build_cache('profiles', maxsize=PROFILE_CACHE_MAX_ENTRIES, ttl=PROFILE_CACHE_TTL_SECS)
+match_cache = build_cache('matches', maxsize=MATCH_CACHE_MAX_ENTRIES, ttl=MATCH_CACHE_TTL_SECS)
+# Latest profile edit per user, so workers that did not handle it update their in-memory profiles
+profile_revisions = ProfileRevisions(build_cache('profile_revisions', maxsize=PROFILE_CACHE_MAX_ENTRIES, ttl=30 * 24 * 3600))
 
 def get_cached_profile(user_id: str):
     """Get profile from cache if not expired"""
-    if user_id in profile_cache:
-        cached = profile_cache[user_id]
-        if datetime.now() - cached['cached_at'] < profile_cache_ttl:
-            logger.info(f"Profile cache hit for user {user_id}")
-            return cached['data']
-        else:
-            del profile_cache[user_id]  # Expired, remove
-    return None
+    cached = profile_cache.get(user_id)
+    if cached is not None:
+        logger.info(f"Profile cache hit for user {user_id}")
+    return cached
 
 def cache_profile(user_id: str, profile_data: dict):
-    """Cache profile data with timestamp"""
-    profile_cache[user_id] = {
-        'data': profile_data,
-        'cached_at': datetime.now()
-    }
+    """Cache profile data"""
+    profile_cache.set(user_id, profile_data, user_id=user_id)
     logger.info(f"Cached profile for user {user_id}")
 
 def invalidate_profile_cache(user_id: str):
     """Invalidate profile cache when CV is uploaded"""
-    if user_id in profile_cache:
-        del profile_cache[user_id]
+    if profile_cache.invalidate_user(user_id):
         logger.info(f"Invalidated profile cache for user {user_id}")
 
 def get_match_cache_key(user_id: str, location: str) -> str:
     """Generate cache key for match results"""
-    key_str = f"{user_id}:{location}"
+    key_str = f"{user_id}:{normalize_location(location)}"
     return hashlib.md5(key_str.encode()).hexdigest()
 
 def get_cached_matches(user_id: str, location: str):
     """Get cached match results"""
-    cache_key = get_match_cache_key(user_id, location)
-    if cache_key in match_cache:
-        cached = match_cache[cache_key]
-        if datetime.now() - cached['cached_at'] < match_cache_ttl:
-            logger.info(f"Match cache hit for user {user_id}, location {location}")
-            return cached['matches']
-        else:
-            del match_cache[cache_key]
-    return None
+    cached = match_cache.get(get_match_cache_key(user_id, location))
+    if cached is not None:
+        logger.info(f"Match cache hit for user {user_id}, location {location}")
+    return cached
 
 def cache_matches(user_id: str, location: str, matches: list):
     """Cache match results"""
-    cache_key = get_match_cache_key(user_id, location)
-    match_cache[cache_key] = {
-        'matches': matches,
-        'cached_at': datetime.now()
-    }
+    match_cache.set(get_match_cache_key(user_id, location), matches, user_id=user_id)
     logger.info(f"Cached {len(matches)} matches for user {user_id}, location {location}")
 
 def invalidate_match_cache(user_id: str):
     """Clear all cached matches for a user"""
-    keys_to_remove = [k for k in match_cache.keys() if k.startswith(hashlib.md5(f"{user_id}:".encode()).hexdigest()[:8])]
-    for key in keys_to_remove:
-        del match_cache[key]
-    if keys_to_remove:
-        logger.info(f"Invalidated {len(keys_to_remove)} match cache entries for user {user_id}")
+    removed = match_cache.invalidate_user(user_id)
+    if removed:
+        logger.info(f"Invalidated {removed} match cache entries for user {user_id}")
 
 apply_jobs = {}
 APPLY_JOB_TIMEOUT_SECS = 300
 APPLY_JOB_CLEANUP_SECS = 600
 
+# Approved apply-preview output by preview token (shared by the workers);
+# apply-job renders it without new LLM calls
+preview_store = get_preview_store()
+
+# Background CV analysis (/api/analyze-cv-async): bounded pool plus a cap on queued jobs.
+# Job status lives in the shared cache, so /api/analyze-status can be polled on any worker.
+ANALYZE_WORKERS = int(os.getenv('ANALYZE_WORKERS', '2'))
+ANALYZE_MAX_PENDING = int(os.getenv('ANALYZE_MAX_PENDING', '20'))
+ANALYZE_JOB_TIMEOUT_SECS = 300
+analyze_jobs = BackgroundJobs(workers=ANALYZE_WORKERS, max_pending=ANALYZE_MAX_PENDING,
+                              timeout=ANALYZE_JOB_TIMEOUT_SECS, name="analyze-cv",
+                              timeout_error='Analysis timed out. Please try again.',
+                              store=build_cache('analyze_jobs', maxsize=1000, ttl=APPLY_JOB_CLEANUP_SECS))
+
 rate_limits = {}
 MAX_RATE_ANALYTICS_PER_MIN = 60
 MAX_RATE_MATCHES_PER_MIN = 20
 MAX_RATE_APPLY_PER_MIN = 5
 MAX_RATE_ANALYZE_PER_MIN = 5
+MAX_RATE_SCORE_BATCH_PER_MIN = 30
 
 
 def check_rate(endpoint: str, limit: int, window_sec: int = 60):
@@ -723,19 +739,10 @@ def parse_profile(profile_output):
         if hasattr(profile_output, 'decode'):
             profile_text = profile_output.decode('utf-8', errors='ignore')
 
-        json_str = profile_text
-        if '```json' in profile_text:
-            json_str = profile_text.split('```json')[1].split('```')[0]
-        elif '```' in profile_text:
-             json_str = profile_text.split('```')[1].split('```')[0]
-        
-        json_str = json_str.strip()
-        try:
-            data = json.loads(json_str)
-            if isinstance(data, dict):
-                return parse_profile(data)
-        except Exception:
-            pass
+        # Profile agent JSON, validated (and repaired if slightly malformed)
+        structured = parse_structured(profile_text, ProfileOutput)
+        if structured:
+            return parse_profile(structured.model_dump(exclude_unset=True))
 
         # Regex fallback (as in api_server.py)
         
@@ -750,43 +757,20 @@ def parse_profile(profile_output):
         
     return profile_data
 
-def score_job_match(job, profile_info):
-    profile_data = profile_info['profile_data']
-    job_title = job.get('title', '').lower()
-    job_description = (job.get('description', '') or '').lower()
-    job_company = job.get('company', '').lower()
-    job_text = f"{job_title} {job_description} {job_company}"
-    
-    score = 20
-    reasons = []
-    
-    skills = profile_data.get('skills', [])
-    matched_skills = []
-    
-    for skill in skills:
-        skill_lower = skill.lower()
-        if skill_lower in job_text:
-            matched_skills.append(skill)
-            score += 15
-        elif any(w in job_text for w in skill_lower.split() if len(w) > 2):
-            matched_skills.append(skill)
-            score += 10
-            
-    if matched_skills:
-        reasons.append(f"Matches your skills: {', '.join(matched_skills[:3])}")
-        
-    # Experience
-    experience = profile_data.get('experience_level', '').lower()
-    if experience:
-        if ('senior' in experience and 'senior' in job_text) or \
-           ('junior' in experience and ('junior' in job_text or 'entry' in job_text)) or \
-           ('mid' in experience and ('mid' in job_text or 'intermediate' in job_text)):
-             score += 15
-             reasons.append("Experience level match")
-    
-    score = min(score, 100)
-    if not reasons: reasons.append("Relevant to your profile")
-    return {'score': score, 'reasons': reasons[:3]}
+def _format_match(job, match_res, location):
+    """Shape a scored job into the match payload returned by the API"""
+    return {
+        'job': {
+            'id': str(job.get('job_hash', job.get('url', str(uuid.uuid4())))),
+            'title': job.get('title'),
+            'company': job.get('company'),
+            'location': job.get('location', location),
+            'url': job.get('url'),
+            'description': (job.get('description', '') or '')[:200]
+        },
+        'match_score': match_res['score'],
+        'match_reasons': match_res['reasons']
+    }
 
 def send_job_match_notification(user_email, user_name, matches, threshold=70):
     try:
@@ -811,6 +795,157 @@ def send_job_match_notification(user_email, user_name, matches, threshold=70):
     except Exception:
         pass
 
+# ==========================================
+# Background Match Materialization
+# ==========================================
+
+MATERIALIZED_MATCHES_LIMIT = int(os.getenv('MATERIALIZED_MATCHES_LIMIT', '20'))
+
+def _get_admin_client():
+    """Server-side Appwrite client with API key, or None when not configured"""
+    api_key = os.getenv('APPWRITE_API_KEY')
+    if not api_key:
+        return None
+    admin_client = Client()
+    admin_client.set_endpoint(os.getenv('APPWRITE_API_ENDPOINT', 'https://cloud.appwrite.io/v1'))
+    admin_client.set_project(os.getenv('APPWRITE_PROJECT_ID'))
+    admin_client.set_key(api_key)
+    return admin_client
+
+def _write_materialized_matches(user_id: str, location: str, matches: list, db_client=None):
+    """Persist ranked matches to the cache and the matches collection"""
+    cache_matches(user_id, location, matches)
+    db_client = db_client or _get_admin_client()
+    if not db_client:
+        return
+    try:
+        databases = Databases(db_client)
+        data = {
+            'userId': user_id,
+            'location': location,
+            'matches': json.dumps(matches),
+            'last_seen': datetime.now().isoformat()
+        }
+        existing = databases.list_documents(
+            DATABASE_ID, COLLECTION_ID_MATCHES,
+            queries=[Query.equal('userId', user_id), Query.equal('location', location), Query.limit(1)]
+        )
+        if existing.get('total', 0) > 0:
+            databases.update_document(DATABASE_ID, COLLECTION_ID_MATCHES, existing['documents'][0]['$id'], data=data)
+        else:
+            databases.create_document(
+                DATABASE_ID, COLLECTION_ID_MATCHES, ID.unique(), data=data,
+                permissions=[
+                    Permission.read(Role.user(user_id)),
+                    Permission.update(Role.user(user_id)),
+                    Permission.delete(Role.user(user_id))
+                ]
+            )
+    except Exception as e:
+        logger.warning(f"Could not persist materialized matches for {user_id}: {e}")
+
+def _load_materialized_matches(user_id: str, location: str, db_client):
+    """Read precomputed matches for a user/location from the matches collection"""
+    try:
+        databases = Databases(db_client)
+        result = databases.list_documents(
+            DATABASE_ID, COLLECTION_ID_MATCHES,
+            queries=[Query.equal('userId', user_id), Query.equal('location', location), Query.limit(1)]
+        )
+        if result.get('total', 0) == 0:
+            return None
+        return json.loads(result['documents'][0].get('matches', '[]') or '[]') or None
+    except Exception as e:
+        logger.warning(f"Could not load materialized matches for {user_id}: {e}")
+        return None
+
+def _clear_materialized_matches(user_id: str, db_client):
+    """Drop precomputed matches for a user (e.g. after a new CV upload)"""
+    match_materializer.unsubscribe_user(user_id)
+    try:
+        # Documents written before users had delete permission can only be
+        # removed server-side
+        databases = Databases(_get_admin_client() or db_client)
+        result = databases.list_documents(DATABASE_ID, COLLECTION_ID_MATCHES, queries=[Query.equal('userId', user_id)])
+        for doc in result.get('documents', []):
+            databases.delete_document(DATABASE_ID, COLLECTION_ID_MATCHES, doc['$id'])
+    except Exception as e:
+        logger.warning(f"Could not clear materialized matches for {user_id}: {e}")
+
+def _materializer_profile(user_id: str):
+    _sync_profile_edits(user_id)
+    profile_info = profile_store.get(user_id)
+    if profile_info:
+        return profile_info.get('profile_data')
+    # Not loaded in this worker (e.g. after a restart): use the stored profile
+    admin_client = _get_admin_client()
+    if not admin_client:
+        return None
+    try:
+        result = Databases(admin_client).list_documents(
+            DATABASE_ID, COLLECTION_ID_PROFILES, queries=[Query.equal('userId', user_id), Query.limit(1)]
+        )
+        if result.get('total', 0) == 0:
+            return None
+        return _profile_data_from_doc(result['documents'][0])
+    except Exception as e:
+        logger.warning(f"Could not load stored profile for {user_id}: {e}")
+        return None
+
+def _seed_materializer_subscriptions(page_size: int = 100):
+    """
+    Subscriptions live in worker memory; restore them from the stored matches
+    (one document per user and location) so materialization resumes after a
+    restart without waiting for each user to search again
+    """
+    admin_client = _get_admin_client()
+    if not admin_client:
+        return 0
+    seeded = 0
+    cursor = None
+    try:
+        databases = Databases(admin_client)
+        while True:
+            queries = [Query.limit(page_size)]
+            if cursor:
+                queries.append(Query.cursor_after(cursor))
+            result = databases.list_documents(DATABASE_ID, COLLECTION_ID_MATCHES, queries=queries)
+            documents = result.get('documents', [])
+            for doc in documents:
+                match_materializer.subscribe(doc.get('userId'), doc.get('location'))
+                seeded += 1
+            if len(documents) < page_size:
+                break
+            cursor = documents[-1]['$id']
+    except Exception as e:
+        logger.warning(f"Could not seed match subscriptions: {e}")
+    if seeded:
+        logger.info(f"Restored {seeded} match subscription(s)")
+    return seeded
+
+match_materializer = MatchMaterializer(
+    score_fn=lambda job, profile_data: _format_match(job, score_job_match(job, {'profile_data': profile_data}), job.get('location', '')),
+    profile_provider=_materializer_profile,
+    writer=_write_materialized_matches,
+    max_matches=MATERIALIZED_MATCHES_LIMIT
+)
+
+def start_background_services():
+    """
+    Start match materialization in this process (idempotent). Called per
+    gunicorn worker from gunicorn.conf.py and by the development server, not
+    on import, so the CLI and tests do not start background work.
+    """
+    global _background_services_started
+    if _background_services_started:
+        return
+    _background_services_started = True
+    register_job_cache_listener(match_materializer.notify)
+    match_materializer.start()
+    threading.Thread(target=_seed_materializer_subscriptions, daemon=True).start()
+
+_background_services_started = False
+
 def _rehydrate_pipeline_from_profile(session_id: str, client) -> JobApplicationPipeline | None:
     try:
         databases = Databases(client)
@@ -837,9 +972,11 @@ def _rehydrate_pipeline_from_profile(session_id: str, client) -> JobApplicationP
                     'profile_data': parse_profile(pipeline.profile),
                     'raw_profile': pipeline.profile,
                     'cv_filename': doc.get('cv_filename', 'CV'),
-                    'cv_content': cv_text,
+                    'cv_content': compact_cv_text(cv_text),
                     'file_id': file_id
                 }
+            # Rebuilt from the CV: profile edits are applied again on next use
+            profile_revisions.reload(session_id)
             return pipeline
         
         # Fallback download
@@ -847,12 +984,15 @@ def _rehydrate_pipeline_from_profile(session_id: str, client) -> JobApplicationP
             try:
                 tmp_name = f"rehydrated_{file_id}.pdf"
                 cv_path = os.path.join(app.config['UPLOAD_FOLDER'], tmp_name)
-                data = storage.get_file_download(bucket_id=BUCKET_ID_CVS, file_id=file_id)
-                with open(cv_path, 'wb') as f:
-                    f.write(data)
-                
                 pipeline = JobApplicationPipeline(cv_path=cv_path)
-                cv_content = pipeline.load_cv()
+
+                # A CV parsed before (by content hash) needs neither download nor parsing
+                cv_content = pipeline.load_cached_cv(doc.get('cv_hash'))
+                if not cv_content:
+                    data = storage.get_file_download(bucket_id=BUCKET_ID_CVS, file_id=file_id)
+                    with open(cv_path, 'wb') as f:
+                        f.write(data)
+                    cv_content = pipeline.load_cv()
                 pipeline.build_profile(cv_content)
                 with store_lock:
                     pipeline_store[session_id] = pipeline
@@ -860,9 +1000,10 @@ def _rehydrate_pipeline_from_profile(session_id: str, client) -> JobApplicationP
                         'profile_data': parse_profile(pipeline.profile),
                         'raw_profile': pipeline.profile,
                         'cv_filename': doc.get('cv_filename', 'CV'),
-                        'cv_content': cv_content,
+                        'cv_content': compact_cv_text(cv_content),
                         'file_id': file_id
                     }
+                profile_revisions.reload(session_id)
                 return pipeline
             except Exception:
                 pass
@@ -870,6 +1011,23 @@ def _rehydrate_pipeline_from_profile(session_id: str, client) -> JobApplicationP
     except Exception:
         return None
 
+def _profile_document(user_id, profile_data, filename, file_hash, file_id=None):
+    """Profiles collection document for a parsed CV"""
+    doc = {
+        'userId': user_id,
+        'skills': json.dumps(profile_data.get('skills', [])),
+        'experience_level': profile_data.get('experience_level', 'N/A'),
+        'education': profile_data.get('education', ''),
+        'strengths': json.dumps(profile_data.get('strengths', [])),
+        'career_goals': profile_data.get('career_goals', ''),
+        'cv_filename': filename,
+        'cv_hash': file_hash  # Store hash for duplicate detection
+        # Removed cv_text to save space and avoid row limits
+    }
+    if file_id:
+        doc['cv_file_id'] = file_id
+    return doc
+
 def ensure_database_schema():
     """Ensure Appwrite schema exists."""
     try:
@@ -955,195 +1113,302 @@ def search_jobs():
     except Exception as e:
         return jsonify({'jobs': [], 'error': str(e)})
 
+def _upload_too_large():
+    return jsonify({
+        'success': False,
+        'error': 'file_too_large',
+        'message': f'CV files are limited to {MAX_CV_UPLOAD_BYTES // (1024 * 1024)} MB.'
+    }), 413
+
+@app.errorhandler(RequestEntityTooLarge)
+def handle_request_too_large(e):
+    return _upload_too_large()
+
+def _streamed_upload(cv_file):
+    """The upload's hashed temp file; copies it in chunks if another stream type was used"""
+    if isinstance(cv_file.stream, HashingUploadFile):
+        cv_file.stream.flush()
+        return cv_file.stream
+    return stream_to_tempfile(cv_file.stream, app.config['UPLOAD_FOLDER'], upload_suffix(cv_file.filename))
+
+def _discard_uploads(keep=None):
+    """Delete this request's upload temp files other than keep"""
+    try:
+        for f in request.files.values():
+            if isinstance(f.stream, HashingUploadFile) and f.stream is not keep:
+                f.stream.discard()
+    except Exception:
+        pass
+
+def _analyze_cv_upload(user_id, client, filename, cv_path, file_hash, overwrite=False, progress=None):
+    """
+    Duplicate checks, parsing, storage upload and profile upsert for an
+    uploaded CV already on disk. Runs in the request (/api/analyze-cv) or in
+    the analyze worker pool (/api/analyze-cv-async).
+
+    Args:
+        progress: Optional callable(stage, **partial) told about each stage;
+                  called with the parsed profile before the storage upload.
+
+    Returns:
+        (payload, http_status)
+    """
+    report = progress or (lambda stage, **partial: None)
+
+    # Check for existing CV with same hash or filename
+    report('checking_duplicates')
+    databases = Databases(client)
+    storage_client = Storage(client)
+    
+    existing_profiles = databases.list_documents(
+        database_id=DATABASE_ID,
+        collection_id=COLLECTION_ID_PROFILES,
+        queries=[Query.equal('userId', user_id)]
+    )
+    existing_doc_id = None
+    
+    if existing_profiles['total'] > 0:
+        existing_profile = existing_profiles['documents'][0]
+        existing_doc_id = existing_profile['$id']
+        existing_filename = existing_profile.get('cv_filename', '')
+        existing_hash = existing_profile.get('cv_hash', '')
+        existing_file_id = existing_profile.get('cv_file_id', '')
+        
+        # Verify the file actually exists in storage
+        file_exists_in_storage = False
+        if existing_file_id:
+            try:
+                storage_client.get_file(BUCKET_ID_CVS, existing_file_id)
+                file_exists_in_storage = True
+            except Exception as e:
+                logger.warning(f"File {existing_file_id} not found in storage: {e}")
+                # File is missing from storage, clean up the orphaned database record
+                try:
+                    databases.delete_document(DATABASE_ID, COLLECTION_ID_PROFILES, existing_profile['$id'])
+                    existing_doc_id = None
+                    logger.info(f"Deleted orphaned profile record: {existing_profile['$id']}")
+                except Exception as del_err:
+                    logger.error(f"Could not delete orphaned profile: {del_err}")
+        
+        # Only return duplicate error if file actually exists in storage
+        if file_exists_in_storage:
+            # Check if same file (by hash) or same filename
+            if file_hash == existing_hash:
+                return {
+                    'success': False,
+                    'error': 'duplicate_exact',
+                    'message': 'This exact CV file has already been uploaded.',
+                    'existing_filename': existing_filename
+                }, 409
+            
+            if filename == existing_filename and not overwrite:
+                return {
+                    'success': False,
+                    'error': 'duplicate_filename',
+                    'message': f'A CV with filename "{filename}" already exists. Do you want to replace it?',
+                    'existing_filename': existing_filename
+                }, 409
+            
+            # If overwriting, delete the old file from storage first
+            if overwrite and existing_file_id:
+                try:
+                    storage_client.delete_file(BUCKET_ID_CVS, existing_file_id)
+                    logger.info(f"Deleted old CV file: {existing_file_id}")
+                except Exception as e:
+                    logger.warning(f"Could not delete old CV file: {e}")
+    
+    report('parsing')
+    pipeline = JobApplicationPipeline(cv_path=cv_path)
+    try:
+        cv_content = pipeline.load_cv(cv_hash=file_hash)
+    except ImageOnlyPDFError as e:
+        return {'success': False, 'error': 'image_only_pdf', 'message': str(e)}, 422
+    if not cv_content:
+        return {'success': False, 'error': 'Failed to load CV'}, 200
+    
+    profile_text = pipeline.build_profile(cv_content)
+    profile_data = parse_profile(profile_text)
+    report('parsed', profile=profile_data)
+    
+    # Appwrite Save
+    try:
+        storage = Storage(client)
+        
+        report('uploading')
+        logger.info(f"Saving CV file for user {user_id}...")
+        input_file = InputFile.from_path(cv_path)
+        input_file.filename = filename
+        result = storage.create_file(bucket_id=BUCKET_ID_CVS, file_id=ID.unique(), file=input_file)
+        file_id = result['$id']
+        logger.info(f"CV file saved with ID: {file_id}")
+
+        # Update/Create Profile (the lookup above already found any existing document)
+        report('saving_profile')
+        logger.info(f"Updating profile for user {user_id}...")
+        profile_doc_data = _profile_document(user_id, profile_data, filename, file_hash, file_id)
+
+        # Retry logic for Appwrite operations (handles 502 errors)
+        max_retries = 3
+        retry_delay = 1
+        
+        for attempt in range(max_retries):
+            try:
+                if existing_doc_id:
+                    databases.update_document(DATABASE_ID, COLLECTION_ID_PROFILES, existing_doc_id, data=profile_doc_data)
+                    logger.info("Existing profile updated.")
+                else:
+                    databases.create_document(DATABASE_ID, COLLECTION_ID_PROFILES, ID.unique(), data=profile_doc_data)
+                    logger.info("New profile created.")
+                break  # Success, exit retry loop
+            except Exception as retry_error:
+                if attempt < max_retries - 1:
+                    logger.warning(f"Appwrite operation failed (attempt {attempt + 1}/{max_retries}), retrying in {retry_delay}s...")
+                    time.sleep(retry_delay)
+                    retry_delay *= 2  # Exponential backoff
+                else:
+                    raise  # Re-raise on final attempt
+        
+        # Clear any existing state for this user to prevent stale data
+        with store_lock:
+            # Remove old pipeline if exists
+            if user_id in pipeline_store:
+                del pipeline_store[user_id]
+            
+            # Store fresh profile data
+            profile_store[user_id] = {
+                'profile_data': profile_data,
+                'raw_profile': profile_text,
+                'cv_filename': filename,
+                'cv_content': compact_cv_text(cv_content),
+                'file_id': file_id,
+                'cv_hash': file_hash
+            }
+            pipeline_store[user_id] = pipeline
+        
+        # Invalidate caches for this user (new CV uploaded)
+        invalidate_profile_cache(user_id)
+        profile_revisions.clear(user_id)
+        invalidate_match_cache(user_id)
+        _clear_materialized_matches(user_id, client)
+
+    except Exception as db_error:
+        logger.error(f"Appwrite DB/Storage Error: {db_error}")
+        print(f"Appwrite Error: {db_error}")
+        print(traceback.format_exc())
+        return {'success': False, 'error': f"Database save failed: {str(db_error)}"}, 500
+
+    return {
+        'success': True,
+        'session_id': user_id,
+        'profile': profile_data,
+        'raw_profile': profile_text,
+        'cv_filename': filename
+    }, 200
+
+def _receive_cv_upload():
+    """
+    The 'cv' file of this request as (upload, filename, overwrite, error_response);
+    error_response is set when there is nothing to analyze.
+    """
+    # Reject oversized bodies before reading any of them
+    if request.content_length and request.content_length > app.config['MAX_CONTENT_LENGTH']:
+        return None, None, False, _upload_too_large()
+
+    cv_file = request.files.get('cv')
+    overwrite = request.form.get('overwrite', 'false').lower() == 'true'
+    
+    if not cv_file or cv_file.filename == '':
+        return None, None, overwrite, jsonify({'success': False, 'error': 'No file selected'})
+    if not allowed_file(cv_file.filename):
+        return None, None, overwrite, jsonify({'success': False, 'error': 'Invalid file type'})
+
+    # The body was streamed to a temp file and hashed while it arrived
+    return _streamed_upload(cv_file), secure_filename(cv_file.filename), overwrite, None
+
 @app.route('/api/analyze-cv', methods=['POST'])
 @login_required
 def analyze_cv():
+    upload = None
     try:
         if not check_rate('analyze-cv', MAX_RATE_ANALYZE_PER_MIN):
              return jsonify({'success': False, 'error': 'Rate limit exceeded'}), 429
 
-        cv_file = request.files.get('cv')
-        overwrite = request.form.get('overwrite', 'false').lower() == 'true'
-        
-        if not cv_file or cv_file.filename == '':
-            return jsonify({'success': False, 'error': 'No file selected'})
-        
-        if cv_file and allowed_file(cv_file.filename):
-            filename = secure_filename(cv_file.filename)
-            cv_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            
-            # Calculate file hash for duplicate detection
-            import hashlib
-            cv_file.seek(0)  # Reset file pointer
-            file_content = cv_file.read()
-            file_hash = hashlib.sha256(file_content).hexdigest()
-            cv_file.seek(0)  # Reset again for saving
-            
-            # Check for existing CV with same hash or filename
-            databases = Databases(g.client)
-            storage_client = Storage(g.client)
-            
-            existing_profiles = databases.list_documents(
-                database_id=DATABASE_ID,
-                collection_id=COLLECTION_ID_PROFILES,
-                queries=[Query.equal('userId', g.user_id)]
-            )
-            
-            if existing_profiles['total'] > 0:
-                existing_profile = existing_profiles['documents'][0]
-                existing_filename = existing_profile.get('cv_filename', '')
-                existing_hash = existing_profile.get('cv_hash', '')
-                existing_file_id = existing_profile.get('cv_file_id', '')
-                
-                # Verify the file actually exists in storage
-                file_exists_in_storage = False
-                if existing_file_id:
-                    try:
-                        storage_client.get_file(BUCKET_ID_CVS, existing_file_id)
-                        file_exists_in_storage = True
-                    except Exception as e:
-                        logger.warning(f"File {existing_file_id} not found in storage: {e}")
-                        # File is missing from storage, clean up the orphaned database record
-                        try:
-                            databases.delete_document(DATABASE_ID, COLLECTION_ID_PROFILES, existing_profile['$id'])
-                            logger.info(f"Deleted orphaned profile record: {existing_profile['$id']}")
-                        except Exception as del_err:
-                            logger.error(f"Could not delete orphaned profile: {del_err}")
-                
-                # Only return duplicate error if file actually exists in storage
-                if file_exists_in_storage:
-                    # Check if same file (by hash) or same filename
-                    if file_hash == existing_hash:
-                        return jsonify({
-                            'success': False,
-                            'error': 'duplicate_exact',
-                            'message': 'This exact CV file has already been uploaded.',
-                            'existing_filename': existing_filename
-                        }), 409
-                    
-                    if filename == existing_filename and not overwrite:
-                        return jsonify({
-                            'success': False,
-                            'error': 'duplicate_filename',
-                            'message': f'A CV with filename "{filename}" already exists. Do you want to replace it?',
-                            'existing_filename': existing_filename
-                        }), 409
-                    
-                    # If overwriting, delete the old file from storage first
-                    if overwrite and existing_file_id:
-                        try:
-                            storage_client.delete_file(BUCKET_ID_CVS, existing_file_id)
-                            logger.info(f"Deleted old CV file: {existing_file_id}")
-                        except Exception as e:
-                            logger.warning(f"Could not delete old CV file: {e}")
-            
-            # Save the file
-            cv_file.save(cv_path)
-            
-            pipeline = JobApplicationPipeline(cv_path=cv_path)
-            cv_content = pipeline.load_cv()
-            if not cv_content:
-                return jsonify({'success': False, 'error': 'Failed to load CV'})
-            
-            profile_text = pipeline.build_profile(cv_content)
-            print("DEBUG: Returned from build_profile")
-            profile_data = parse_profile(profile_text)
-            print("DEBUG: Returned from parse_profile")
-            
-            # Appwrite Save
-            try:
-                databases = Databases(g.client)
-                storage = Storage(g.client)
-                
-                logger.info(f"Saving CV file for user {g.user_id}...")
-                result = storage.create_file(bucket_id=BUCKET_ID_CVS, file_id=ID.unique(), file=InputFile.from_path(cv_path))
-                file_id = result['$id']
-                logger.info(f"CV file saved with ID: {file_id}")
-
-                # Update/Create Profile
-                logger.info(f"Updating profile for user {g.user_id}...")
-                existing_profiles = databases.list_documents(
-                    database_id=DATABASE_ID,
-                    collection_id=COLLECTION_ID_PROFILES,
-                    queries=[Query.equal('userId', g.user_id)]
-                )
-                
-                profile_doc_data = {
-                    'userId': g.user_id,
-                    'skills': json.dumps(profile_data.get('skills', [])),
-                    'experience_level': profile_data.get('experience_level', 'N/A'),
-                    'education': profile_data.get('education', ''),
-                    'strengths': json.dumps(profile_data.get('strengths', [])),
-                    'career_goals': profile_data.get('career_goals', ''),
-                    'cv_file_id': file_id,
-                    'cv_filename': filename,
-                    'cv_hash': file_hash  # Store hash for duplicate detection
-                    # Removed cv_text to save space and avoid row limits
-                }
+        upload, filename, overwrite, error = _receive_cv_upload()
+        if error:
+            return error
 
-                # Retry logic for Appwrite operations (handles 502 errors)
-                max_retries = 3
-                retry_delay = 1
-                last_error = None
-                
-                for attempt in range(max_retries):
-                    try:
-                        if existing_profiles['total'] > 0:
-                            databases.update_document(DATABASE_ID, COLLECTION_ID_PROFILES, existing_profiles['documents'][0]['$id'], data=profile_doc_data)
-                            logger.info("Existing profile updated.")
-                        else:
-                            databases.create_document(DATABASE_ID, COLLECTION_ID_PROFILES, ID.unique(), data=profile_doc_data)
-                            logger.info("New profile created.")
-                        break  # Success, exit retry loop
-                    except Exception as retry_error:
-                        last_error = retry_error
-                        if attempt < max_retries - 1:
-                            logger.warning(f"Appwrite operation failed (attempt {attempt + 1}/{max_retries}), retrying in {retry_delay}s...")
-                            import time
-                            time.sleep(retry_delay)
-                            retry_delay *= 2  # Exponential backoff
-                        else:
-                            raise  # Re-raise on final attempt
-                
-                # Clear any existing state for this user to prevent stale data
-                with store_lock:
-                    # Remove old pipeline if exists
-                    if g.user_id in pipeline_store:
-                        del pipeline_store[g.user_id]
-                    
-                    # Store fresh profile data
-                    profile_store[g.user_id] = {
-                        'profile_data': profile_data,
-                        'raw_profile': profile_text,
-                        'cv_filename': filename,
-                        'cv_content': cv_content,
-                        'file_id': file_id,
-                        'cv_hash': file_hash
-                    }
-                    pipeline_store[g.user_id] = pipeline
-                
-                # Invalidate caches for this user (new CV uploaded)
-                invalidate_profile_cache(g.user_id)
-                invalidate_match_cache(g.user_id)
+        payload, status = _analyze_cv_upload(g.user_id, g.client, filename, upload.path, upload.sha256, overwrite)
+        return jsonify(payload), status
+    except UploadTooLarge:
+        return _upload_too_large()
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+    finally:
+        # The text is in profile_store and the parsed CV cache, the file in storage
+        if upload is not None:
+            upload.discard()
+        _discard_uploads()
 
+@app.route('/api/analyze-cv-async', methods=['POST'])
+@login_required
+def analyze_cv_async():
+    """
+    Accept a CV and analyze it in the background pool; poll /api/analyze-status.
+    The parsed profile appears in the status as soon as parsing finishes,
+    before the storage upload and profile save complete.
+    """
+    upload = None
+    keep_upload = False
+    try:
+        if not check_rate('analyze-cv', MAX_RATE_ANALYZE_PER_MIN):
+             return jsonify({'success': False, 'error': 'Rate limit exceeded'}), 429
 
-            except Exception as db_error:
-                logger.error(f"Appwrite DB/Storage Error: {db_error}")
-                print(f"Appwrite Error: {db_error}")
-                print(traceback.format_exc())
-                return jsonify({'success': False, 'error': f"Database save failed: {str(db_error)}"}), 500
+        if analyze_jobs.pending() >= ANALYZE_MAX_PENDING:
+            return jsonify({'success': False, 'error': 'busy', 'message': 'Too many CVs are being analyzed. Please retry shortly.'}), 503
 
-            return jsonify({
-                'success': True,
-                'session_id': g.user_id,
-                'profile': profile_data,
-                'raw_profile': profile_text,
-                'cv_filename': filename
-            })
-        
-        return jsonify({'success': False, 'error': 'Invalid file type'})
+        upload, filename, overwrite, error = _receive_cv_upload()
+        if error:
+            return error
+
+        user_id = g.user_id
+        client_jwt_client = g.client
+        job_upload = upload
+
+        def _work(progress):
+            try:
+                return _analyze_cv_upload(user_id, client_jwt_client, filename, job_upload.path,
+                                          job_upload.sha256, overwrite, progress=progress)
+            finally:
+                # Done with the file whatever the outcome (see analyze_cv)
+                job_upload.discard()
+
+        try:
+            job_id = analyze_jobs.submit(user_id, _work, cv_filename=filename)
+        except JobQueueFull:
+            return jsonify({'success': False, 'error': 'busy', 'message': 'Too many CVs are being analyzed. Please retry shortly.'}), 503
+        # The worker owns the upload from here
+        keep_upload = True
+        return jsonify({'success': True, 'job_id': job_id}), 202
+    except UploadTooLarge:
+        return _upload_too_large()
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
+    finally:
+        if upload is not None and not keep_upload:
+            upload.discard()
+        _discard_uploads(keep=upload if keep_upload else None)
+
+@app.route('/api/analyze-status', methods=['GET'])
+@login_required
+def analyze_status():
+    try:
+        job_id = request.args.get('job_id')
+        info = analyze_jobs.status(job_id, g.user_id)
+        if info is None:
+            return jsonify({'status': 'not_found'})
+        return jsonify(info)
+    except Exception as e:
+        return jsonify({'status': 'error', 'error': str(e)})
 
 @app.route('/api/profile/current', methods=['GET'])
 @login_required
@@ -1265,19 +1530,33 @@ def match_jobs():
         print(f"DEBUG: match_jobs data received: {data}")
         location = data.get('location', DEFAULT_LOCATION)
         max_results = int(data.get('max_results', 20))
+        force_refresh = bool(data.get('refresh', False))
         session_id = g.user_id
         print(f"DEBUG: Session ID: {session_id}")
-        
-        # Check match cache first
-        cached_matches = get_cached_matches(session_id, location)
-        if cached_matches:
-            return jsonify({
-                'success': True,
-                'matches': cached_matches,
-                'cached': True
-            })
+
+        # Keep this user's matches materialized whenever fresh jobs land for the location
+        match_materializer.subscribe(session_id, location)
+
+        # Serve precomputed matches unless a refresh is forced
+        if not force_refresh:
+            cached_matches = get_cached_matches(session_id, location)
+            if cached_matches:
+                return jsonify({
+                    'success': True,
+                    'matches': cached_matches,
+                    'cached': True
+                })
+            materialized = _load_materialized_matches(session_id, location, g.client)
+            if materialized:
+                cache_matches(session_id, location, materialized)
+                return jsonify({
+                    'success': True,
+                    'matches': materialized,
+                    'cached': True
+                })
         
         # 1. Rehydration
+        _sync_profile_edits(session_id)
         print("DEBUG: Acquiring store_lock...")
         with store_lock:
             print("DEBUG: store_lock acquired")
@@ -1299,7 +1578,7 @@ def match_jobs():
                         pipeline = JobApplicationPipeline()
                         # We don't rebuild_profile necessarily to save calls, just load data
                         pipeline.profile = profile_info['raw_profile']
-                        pipeline.cv_engine = CVTailoringEngine(profile_info['cv_content'], pipeline.profile)
+                        pipeline.cv_engine = CVTailoringEngine(unpack_cv_text(profile_info['cv_content']), pipeline.profile)
                         pipeline_store[session_id] = pipeline
         
         print("DEBUG: Rehydration logic complete")
@@ -1312,92 +1591,26 @@ def match_jobs():
         print("DEBUG: parsing profile...")
         profile_data = parse_profile(pipeline.profile)
         
-        # Improved Query Generation - Use job titles/roles, not technical skills
-        query = ""
-        
-        # First, try to extract a job title from career goals or professional profile
-        career_goals = profile_data.get('career_goals', '')
-        
-        # Look for common job title patterns in career goals
-        job_title_keywords = ['developer', 'engineer', 'analyst', 'manager', 'designer', 
-                             'architect', 'consultant', 'specialist', 'administrator', 
-                             'coordinator', 'lead', 'intern', 'graduate']
-        
-        if career_goals:
-            career_lower = career_goals.lower()
-            # Extract first sentence or phrase that contains a job title keyword
-            for keyword in job_title_keywords:
-                if keyword in career_lower:
-                    # Extract a reasonable phrase around the keyword
-                    words = career_goals.split()
-                    for i, word in enumerate(words):
-                        if keyword in word.lower():
-                            # Take 2-3 words around the keyword
-                            start = max(0, i-1)
-                            end = min(len(words), i+3)
-                            query = ' '.join(words[start:end])
-                            break
-                    if query:
-                        break
-        
-        # If still no query, try using experience level + primary skill domain
-        if not query or len(query) < 5:
-            skills = profile_data.get('skills', [])
-            exp_level = profile_data.get('experience_level', '')
-            
-            # Identify skill domain (e.g., "Web Developer" from React/JavaScript)
-            skill_domains = {
-                'web': ['react', 'angular', 'vue', 'html', 'css', 'javascript', 'typescript'],
-                'backend': ['python', 'java', 'node', 'express', 'django', 'flask'],
-                'mobile': ['react native', 'flutter', 'swift', 'kotlin', 'android', 'ios'],
-                'data': ['sql', 'mongodb', 'postgresql', 'data', 'analytics'],
-                'cloud': ['aws', 'azure', 'gcp', 'cloud', 'devops']
-            }
-            
-            domain = None
-            for dom, keywords in skill_domains.items():
-                if any(any(kw in skill.lower() for kw in keywords) for skill in skills):
-                    domain = dom
-                    break
-            
-            # Construct query from domain + level
-            if domain:
-                level_prefix = ''
-                if 'senior' in exp_level.lower():
-                    level_prefix = 'Senior '
-                elif 'junior' in exp_level.lower() or 'entry' in exp_level.lower():
-                    level_prefix = 'Junior '
-                
-                query = f"{level_prefix}{domain.capitalize()} Developer"
-            else:
-                # Ultimate fallback
-                query = 'Software Developer'
-        
-        logger.info(f"Generated job search query: {query}")
-        
-        jobs = pipeline.search_jobs(query, location, max_results)
+        # Ranked queries (memoized per profile), run concurrently under one deadline
+        queries = plan_queries(profile_data)
+        logger.info(f"Planned job search queries: {queries}")
+
+        # This request scores the scraped jobs itself; the materializer only
+        # rescores them for the location's other subscribers
+        jobs = run_queries(lambda q: pipeline.search_jobs(q, location, max_results, notify_listeners=False), queries)
+        match_materializer.notify(', '.join(queries), location, jobs, skip_users={session_id})
         
         # 3. Match
         matches = []
-        for job in jobs[:max_results]:
+        for job in jobs:
              match_res = score_job_match(job, {'profile_data': profile_data})
-             matches.append({
-                 'job': {
-                    'id': str(job.get('job_hash', job.get('url', str(uuid.uuid4())))),
-                    'title': job.get('title'),
-                    'company': job.get('company'),
-                    'location': job.get('location', location),
-                    'url': job.get('url'),
-                    'description': (job.get('description', '') or '')[:200]
-                 },
-                 'match_score': match_res['score'],
-                 'match_reasons': match_res['reasons']
-             })
-        
+             matches.append(_format_match(job, match_res, location))
+
         matches.sort(key=lambda x: x['match_score'], reverse=True)
-        
-        # Cache the results for future requests
-        cache_matches(session_id, location, matches)
+        matches = matches[:max_results]
+
+        # Cache and persist the results so later requests read them directly
+        _write_materialized_matches(session_id, location, matches, db_client=g.client)
         
         return jsonify({'success': True, 'matches': matches, 'cached': False})
 
@@ -1410,8 +1623,9 @@ def match_jobs():
 # Missing Routes Restoration
 # ==========================================
 
-def _process_application_async(job_data, session_id, client_jwt_client, template_type=None):
+def _process_application_async(job_data, session_id, client_jwt_client, template_type=None, regenerate=False, preview=None):
     try:
+        _sync_profile_edits(session_id)
         if session_id not in pipeline_store:
             pipeline_store[session_id] = JobApplicationPipeline()
         pipeline = pipeline_store[session_id]
@@ -1420,7 +1634,7 @@ def _process_application_async(job_data, session_id, client_jwt_client, template
             if profile_info and profile_info.get('cv_content'):
                 from utils.cv_tailoring import CVTailoringEngine
                 pipeline.cv_engine = CVTailoringEngine(
-                    profile_info['cv_content'],
+                    unpack_cv_text(profile_info['cv_content']),
                     profile_info.get('profile_data', {})
                 )
                 pipeline.profile = profile_info.get('profile_data', {})
@@ -1432,28 +1646,31 @@ def _process_application_async(job_data, session_id, client_jwt_client, template
                          pipeline.build_profile(cv_content)  # Build profile to initialize cv_engine
                     else:
                          return {'error': 'CV not found. Please upload a CV first.'}
-        app_result = pipeline.generate_application_package(job_data, template_type)
+        app_result = pipeline.generate_application_package(job_data, template_type, regenerate=regenerate,
+                                                           preview=preview, interview_prep=True)
         if not app_result or not isinstance(app_result, dict):
             return {'error': 'Application generation failed. Please try a different template or re-upload your CV.'}
-        interview_prep_path = pipeline.prepare_interview(job_data, output_dir=app_result.get('app_dir'))
+        timings = dict(app_result.get('timings') or {})
         files_payload = {}
         try:
             databases = Databases(client_jwt_client)
             storage = Storage(client_jwt_client)
-            cv_upload = storage.create_file(bucket_id=BUCKET_ID_CVS, file_id=ID.unique(), file=InputFile.from_path(app_result['cv_path']))
-            cl_upload = storage.create_file(bucket_id=BUCKET_ID_CVS, file_id=ID.unique(), file=InputFile.from_path(app_result['cover_letter_path']))
-            meta_upload = None
-            if app_result.get('metadata_path'):
-                meta_upload = storage.create_file(bucket_id=BUCKET_ID_CVS, file_id=ID.unique(), file=InputFile.from_path(app_result['metadata_path']))
-            prep_upload = None
-            if interview_prep_path:
-                prep_upload = storage.create_file(bucket_id=BUCKET_ID_CVS, file_id=ID.unique(), file=InputFile.from_path(interview_prep_path))
-            files_payload = {
-                'cv': f"/api/storage/download?bucket_id={BUCKET_ID_CVS}&file_id={cv_upload['$id']}",
-                'cover_letter': f"/api/storage/download?bucket_id={BUCKET_ID_CVS}&file_id={cl_upload['$id']}",
-                'interview_prep': f"/api/storage/download?bucket_id={BUCKET_ID_CVS}&file_id={prep_upload['$id']}" if prep_upload else None,
-                'metadata': f"/api/storage/download?bucket_id={BUCKET_ID_CVS}&file_id={meta_upload['$id']}" if meta_upload else None
+            paths = {
+                'cv': app_result['cv_path'],
+                'cover_letter': app_result['cover_letter_path'],
+                'interview_prep': app_result.get('interview_prep_path'),
+                'metadata': app_result.get('metadata_path')
             }
+            def _upload(path):
+                upload = storage.create_file(bucket_id=BUCKET_ID_CVS, file_id=ID.unique(), file=InputFile.from_path(path))
+                return f"/api/storage/download?bucket_id={BUCKET_ID_CVS}&file_id={upload['$id']}"
+            upload_started = time.perf_counter()
+            if APPLY_CONCURRENT_STAGES:
+                futures = {name: stage_executor.submit(_upload, path) for name, path in paths.items() if path}
+                files_payload = {name: futures[name].result() if name in futures else None for name in paths}
+            else:
+                files_payload = {name: _upload(path) if path else None for name, path in paths.items()}
+            timings['upload'] = round(time.perf_counter() - upload_started, 3)
             databases.create_document(
                 database_id=DATABASE_ID,
                 collection_id=COLLECTION_ID_APPLICATIONS,
@@ -1470,7 +1687,7 @@ def _process_application_async(job_data, session_id, client_jwt_client, template
             )
         except Exception as e:
             print(f"Error saving application to DB: {e}")
-        return {'files': files_payload, 'ats_score': app_result.get('ats_score'), 'ats_analysis': app_result.get('ats_analysis')}
+        return {'files': files_payload, 'ats_score': app_result.get('ats_score'), 'ats_analysis': app_result.get('ats_analysis'), 'timings': timings}
     except Exception as e:
         print(f"Async apply error: {e}")
         return {'error': str(e)}
@@ -1486,21 +1703,34 @@ def apply_job():
             session_id = g.user_id
             job_data = data.get('job')
             template_type = data.get('template')
+            regenerate = bool(data.get('regenerate', False))
+            preview = None
+            if data.get('preview_token') and not regenerate:
+                preview = preview_store.get(data['preview_token'], session_id)
+                if not preview:
+                    return jsonify({'success': False, 'error': 'Preview expired. Please preview again.'}), 410
+                job_data = preview['job'] or job_data
+                template_type = preview['template']
             job_id = str(uuid.uuid4())
             apply_jobs[job_id] = {'status': 'processing', 'created_at': time.time()}
             client_jwt_client = g.client
             def _runner():
-                result = _process_application_async(job_data, session_id, client_jwt_client, template_type)
+                with llm_priority('apply'):
+                    result = _process_application_async(job_data, session_id, client_jwt_client, template_type, regenerate, preview)
                 current = apply_jobs.get(job_id, {})
                 if current.get('status') == 'cancelled':
                     return
                 if 'error' in result:
+                    # The preview stays available so the user can retry
                     apply_jobs[job_id] = {'status': 'error', 'error': result['error'], 'created_at': current.get('created_at', time.time())}
                 else:
+                    if preview:
+                        preview_store.discard(data['preview_token'])
                     apply_jobs[job_id] = {
                         'status': 'done',
                         'files': result['files'],
                         'ats': {'score': result.get('ats_score'), 'analysis': result.get('ats_analysis')},
+                        'timings': result.get('timings'),
                         'created_at': current.get('created_at', time.time())
                     }
             threading.Thread(target=_runner, daemon=True).start()
@@ -1697,6 +1927,103 @@ def matches_last():
     except Exception as e:
         return jsonify({'success': False, 'error': 'Failed to fetch last matches'}), 200
 
+# ==========================================
+# Batch Scoring
+# ==========================================
+
+BATCH_SCORE_MAX_JOBS = int(os.getenv('BATCH_SCORE_MAX_JOBS', '500'))
+BATCH_SCORE_MAX_PROFILES = int(os.getenv('BATCH_SCORE_MAX_PROFILES', '50'))
+BATCH_SCORE_STREAM_THRESHOLD = int(os.getenv('BATCH_SCORE_STREAM_THRESHOLD', '2000'))  # N x M cells
+BATCH_SCORE_CHUNK_JOBS = 100
+
+def _profile_data_from_doc(doc):
+    """Scoring fields of a profile document"""
+    skills = doc.get('skills', [])
+    if isinstance(skills, str):
+        try: skills = json.loads(skills) if skills.strip() else []
+        except Exception: skills = []
+    return {'skills': skills or [], 'experience_level': doc.get('experience_level', '') or ''}
+
+def _job_id(job, index):
+    return str(job.get('id') or job.get('job_hash') or job.get('url') or index)
+
+@app.route('/api/score/batch', methods=['POST'])
+@login_required
+def score_batch():
+    """
+    Score N jobs against M profiles in one request.
+    Body: {jobs: [...], profile_ids: [...], profiles: [{id, skills, experience_level}], stream: bool}
+    Defaults to the caller's own profile when no profiles are given.
+    Returns a jobs x profiles score matrix, streamed as NDJSON rows when large.
+    """
+    try:
+        if not check_rate('score-batch', MAX_RATE_SCORE_BATCH_PER_MIN):
+            return jsonify({'success': False, 'error': 'Rate limit exceeded'}), 429
+
+        data = request.get_json() or {}
+        jobs = data.get('jobs') or []
+        if isinstance(data.get('job'), dict):
+            jobs = [data['job']] + jobs
+        if not jobs:
+            return jsonify({'success': False, 'error': 'No jobs provided'}), 400
+        if len(jobs) > BATCH_SCORE_MAX_JOBS:
+            return jsonify({'success': False, 'error': f'At most {BATCH_SCORE_MAX_JOBS} jobs per request'}), 400
+
+        # Resolve profiles: inline first, then stored documents (read with the caller's permissions)
+        profile_ids, profiles = [], []
+        for i, p in enumerate(data.get('profiles') or []):
+            profile_ids.append(str(p.get('id', f'inline-{i}')))
+            profiles.append(_profile_data_from_doc(p))
+
+        requested_ids = data.get('profile_ids') or []
+        if len(requested_ids) + len(profiles) > BATCH_SCORE_MAX_PROFILES:
+            return jsonify({'success': False, 'error': f'At most {BATCH_SCORE_MAX_PROFILES} profiles per request'}), 400
+
+        if requested_ids:
+            databases = Databases(g.client)
+            for pid in requested_ids:
+                try:
+                    doc = databases.get_document(DATABASE_ID, COLLECTION_ID_PROFILES, pid)
+                except Exception:
+                    return jsonify({'success': False, 'error': f'Profile {pid} not found'}), 404
+                profile_ids.append(pid)
+                profiles.append(_profile_data_from_doc(doc))
+
+        if not profiles:
+            own = _materializer_profile(g.user_id)
+            if not own:
+                databases = Databases(g.client)
+                result = databases.list_documents(DATABASE_ID, COLLECTION_ID_PROFILES, queries=[Query.equal('userId', g.user_id), Query.limit(1)])
+                if result.get('total', 0) == 0:
+                    return jsonify({'success': False, 'error': 'No profile found. Please upload CV first.'}), 404
+                own = _profile_data_from_doc(result['documents'][0])
+            profile_ids.append(g.user_id)
+            profiles.append(own)
+
+        job_ids = [_job_id(job, i) for i, job in enumerate(jobs)]
+        stream = bool(data.get('stream')) or len(jobs) * len(profiles) > BATCH_SCORE_STREAM_THRESHOLD
+
+        if not stream:
+            scores = score_matrix(jobs, profiles)
+            return jsonify({
+                'success': True,
+                'job_ids': job_ids,
+                'profile_ids': profile_ids,
+                'scores': scores.tolist()
+            })
+
+        def generate():
+            yield json.dumps({'job_ids': job_ids, 'profile_ids': profile_ids}) + '\n'
+            for start in range(0, len(jobs), BATCH_SCORE_CHUNK_JOBS):
+                chunk = jobs[start:start + BATCH_SCORE_CHUNK_JOBS]
+                for offset, row in enumerate(score_matrix(chunk, profiles).tolist()):
+                    yield json.dumps({'job_id': job_ids[start + offset], 'scores': row}) + '\n'
+
+        return Response(generate(), mimetype='application/x-ndjson')
+    except Exception as e:
+        logger.error(f"Batch scoring failed: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/profile', methods=['POST'])
 @login_required
 def get_profile():
@@ -1705,11 +2032,66 @@ def get_profile():
         session_id = data.get('session_id')
         if not session_id or session_id not in profile_store:
             return jsonify({'success': False, 'error': 'No profile found'})
+        _sync_profile_edits(session_id)
         profile_info = profile_store[session_id]
         return jsonify({'success': True, 'profile': profile_info['profile_data'], 'raw_profile': profile_info['raw_profile'], 'cv_filename': profile_info['cv_filename']})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+def _update_local_profiles(user_id: str, changed: dict):
+    """Write changed fields into this worker's stored profile, pipeline profile and tailoring engine profile"""
+    with store_lock:
+        profile_info = profile_store.get(user_id)
+        pipeline = pipeline_store.get(user_id)
+        # Usually one dict shared by all holders; update each distinct one once
+        targets = []
+        if profile_info:
+            targets += [profile_info.get('profile_data'), profile_info.get('raw_profile')]
+        if pipeline:
+            targets.append(pipeline.profile)
+            if pipeline.cv_engine:
+                targets.append(pipeline.cv_engine.profile)
+        seen = set()
+        for profile in targets:
+            if id(profile) not in seen:
+                seen.add(id(profile))
+                apply_profile_diff(profile, changed)
+
+def _sync_profile_edits(user_id: str):
+    """Apply a profile edit handled by another worker to this worker's in-memory profiles"""
+    try:
+        fields = profile_revisions.pull(user_id)
+    except Exception as e:
+        logger.warning(f"Could not read profile revision for {user_id}: {e}")
+        return
+    if fields:
+        _update_local_profiles(user_id, fields)
+        logger.info(f"Applied profile edit from another worker for {user_id}")
+
+def _apply_profile_update(user_id: str, previous: dict, updates: dict, client):
+    """
+    Apply a profile edit without re-parsing the CV. updates is diffed against
+    the stored profile (previous, from Appwrite); changed fields are written
+    into this worker's in-memory profiles in place and the edit is published
+    for the other workers. Only caches that depend on the changed fields are
+    dropped (skills/experience level -> match scores, career goals -> search
+    queries). Returns the changed fields.
+    """
+    changed = diff_profile(previous or {}, updates)
+    if changed:
+        _update_local_profiles(user_id, changed)
+    profile_revisions.publish(user_id, updates)
+
+    # The structured profile is the submitted edit; refresh it rather than refetch
+    cache_profile(user_id, dict(updates))
+
+    affected = affected_results(changed)
+    if affected:
+        invalidate_match_cache(user_id)
+        _clear_materialized_matches(user_id, client)
+    logger.info(f"Profile update for {user_id}: changed={sorted(changed)} invalidated={sorted(affected)}")
+    return changed
+
 @app.route('/api/profile', methods=['PUT'])
 @login_required
 def update_profile():
@@ -1730,11 +2112,22 @@ def update_profile():
             'notification_threshold': int(data.get('notification_threshold', 70)),
             'updated_at': datetime.now().isoformat()
         }
+        previous = {}
         if existing_profiles['total'] > 0:
+            previous = structured_profile_from_doc(existing_profiles['documents'][0])
             databases.update_document(DATABASE_ID, COLLECTION_ID_PROFILES, existing_profiles['documents'][0]['$id'], data=profile_doc)
         else:
             databases.create_document(DATABASE_ID, COLLECTION_ID_PROFILES, ID.unique(), data=profile_doc)
-        return jsonify({'success': True, 'message': 'Profile updated'})
+        changed = _apply_profile_update(user_id, previous, {
+            'skills': data.get('skills', []),
+            'experience_level': profile_doc['experience_level'],
+            'education': profile_doc['education'],
+            'strengths': data.get('strengths', []),
+            'career_goals': profile_doc['career_goals'],
+            'notification_enabled': profile_doc['notification_enabled'],
+            'notification_threshold': profile_doc['notification_threshold']
+        }, g.client)
+        return jsonify({'success': True, 'message': 'Profile updated', 'changed_fields': sorted(changed)})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -1742,31 +2135,36 @@ def update_profile():
 @login_required
 def get_structured_profile():
     try:
+        cached = get_cached_profile(g.user_id)
+        if cached is not None:
+            return jsonify({'success': True, 'profile': cached, 'cached': True})
         databases = Databases(g.client)
         result = databases.list_documents(DATABASE_ID, COLLECTION_ID_PROFILES, queries=[Query.equal('userId', g.user_id), Query.limit(10)])
         if result.get('total', 0) == 0: return jsonify({'success': False, 'error': 'No profile found'}), 404
-        doc = result['documents'][0]
-        def _safe_json(field, default):
-            try:
-                v = doc.get(field)
-                if isinstance(v, str):
-                    if not v.strip(): return default
-                    return json.loads(v)
-                return v if v is not None else default
-            except Exception: return default
-        profile = {
-            'skills': _safe_json('skills', []),
-            'experience_level': doc.get('experience_level', '') or '',
-            'education': doc.get('education', '') or '',
-            'strengths': _safe_json('strengths', []),
-            'career_goals': doc.get('career_goals', '') or '',
-            'notification_enabled': bool(doc.get('notification_enabled', False)),
-            'notification_threshold': int(doc.get('notification_threshold', 70) or 70)
-        }
+        profile = structured_profile_from_doc(result['documents'][0])
+        cache_profile(g.user_id, profile)
         return jsonify({'success': True, 'profile': profile})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def _preview_pipeline(user_id, client):
+    """The user's pipeline with a tailoring engine, restored if needed; None without a CV"""
+    _sync_profile_edits(user_id)
+    with store_lock:
+        if user_id not in pipeline_store:
+            pipeline_store[user_id] = _rehydrate_pipeline_from_profile(user_id, client)
+        pipeline = pipeline_store.get(user_id)
+        if not pipeline: pipeline = JobApplicationPipeline(); pipeline_store[user_id] = pipeline
+    
+    if not getattr(pipeline, 'cv_engine', None):
+         profile_info = profile_store.get(user_id)
+         if profile_info and profile_info.get('cv_content'):
+             pipeline.cv_engine = CVTailoringEngine(unpack_cv_text(profile_info['cv_content']), profile_info.get('profile_data', {}))
+             pipeline.profile = profile_info.get('profile_data', {})
+         else:
+             return None
+    return pipeline
+
 @app.route('/api/apply-preview', methods=['POST'])
 @login_required
 def apply_preview():
@@ -1775,23 +2173,15 @@ def apply_preview():
         data = request.get_json()
         job_data = data.get('job')
         template_type = (data.get('template') or 'MODERN').lower()
+        regenerate = bool(data.get('regenerate', False))
         
-        with store_lock:
-            if g.user_id not in pipeline_store:
-                pipeline_store[g.user_id] = _rehydrate_pipeline_from_profile(g.user_id, g.client)
-            pipeline = pipeline_store.get(g.user_id)
-            if not pipeline: pipeline = JobApplicationPipeline(); pipeline_store[g.user_id] = pipeline
+        pipeline = _preview_pipeline(g.user_id, g.client)
+        if not pipeline:
+            return jsonify({'success': False, 'error': 'No CV found'}), 400
         
-        if not getattr(pipeline, 'cv_engine', None):
-             profile_info = profile_store.get(g.user_id)
-             if profile_info and profile_info.get('cv_content'):
-                 pipeline.cv_engine = CVTailoringEngine(profile_info['cv_content'], profile_info.get('profile_data', {}))
-                 pipeline.profile = profile_info.get('profile_data', {})
-             else:
-                 return jsonify({'success': False, 'error': 'No CV found'}), 400
-        
-        cv_content, ats_analysis = pipeline.cv_engine.generate_tailored_cv(job_data, template_type)
-        version_id = list(pipeline.cv_engine.cv_versions.keys())[-1]
+        # Previews are interactive: their LLM calls are admitted before queued applications
+        with llm_priority('interactive'):
+            cv_content, ats_analysis, version_id = pipeline.cv_engine.generate_tailored_cv(job_data, template_type, regenerate=regenerate)
         cv_data = pipeline.cv_engine.get_cv_version(version_id) or {}
         
         generator = PDFGenerator()
@@ -1799,14 +2189,104 @@ def apply_preview():
         sections = pipeline.cv_engine._build_sections(cv_data)
         cv_html = generator.generate_html(cv_content, template_name=template_type, header=header, sections=sections)
         
-        cl_markdown = pipeline.cv_engine._generate_cover_letter_markdown(job_data, tailored_cv=cv_content)
+        with llm_priority('interactive'):
+            cl_markdown = pipeline.cv_engine._generate_cover_letter_markdown(job_data, tailored_cv=cv_content, regenerate=regenerate)
         header['date'] = datetime.now().strftime('%B %d, %Y')
         cl_html = generator.generate_html(cl_markdown, template_name='cover_letter', header=header)
+        preview_token = preview_store.save(g.user_id, job_data, template_type, version_id, cv_data, cl_markdown) if cv_data else None
         
-        return jsonify({'success': True, 'cv_html': cv_html, 'cover_letter_html': cl_html, 'ats': {'analysis': ats_analysis, 'score': cv_data.get('ats_score')}})
+        return jsonify({'success': True, 'cv_html': cv_html, 'cover_letter_html': cl_html, 'ats': {'analysis': ats_analysis, 'score': cv_data.get('ats_score')}, 'preview_token': preview_token})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+PREVIEW_STREAM_RENDER_SECS = 0.5
+PREVIEW_STREAM_KEEPALIVE_SECS = 15
+
+@app.route('/api/apply-preview/stream', methods=['POST'])
+@login_required
+def apply_preview_stream():
+    """
+    apply-preview as Server-Sent Events. Events, in order:
+      cv_token (markdown text as generated), cv_html (partial CV rendered
+      every PREVIEW_STREAM_RENDER_SECS), cv (final HTML, sections, ATS),
+      cover_letter_token, cover_letter (final HTML), done (preview_token);
+      error ends the stream early.
+    """
+    try:
+        if not check_rate('apply-job', MAX_RATE_APPLY_PER_MIN): return jsonify({'success': False, 'error': 'Limit exceeded'}), 429
+        data = request.get_json() or {}
+        job_data = data.get('job')
+        if not job_data: return jsonify({'success': False, 'error': 'No job provided'}), 400
+        template_type = (data.get('template') or 'MODERN').lower()
+        regenerate = bool(data.get('regenerate', False))
+        user_id = g.user_id
+        pipeline = _preview_pipeline(user_id, g.client)
+        if not pipeline:
+            return jsonify({'success': False, 'error': 'No CV found'}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+    events = queue.Queue()
+    engine = pipeline.cv_engine
+
+    def produce():
+        try:
+            cv_stream = JSONFieldStream('cv_content')
+            last_render = [0.0]
+            def on_cv_delta(chunk):
+                text = cv_stream.feed(chunk)
+                if not text:
+                    return
+                events.put(('cv_token', {'text': text}))
+                now = time.monotonic()
+                if now - last_render[0] >= PREVIEW_STREAM_RENDER_SECS:
+                    last_render[0] = now
+                    events.put(('cv_html', {'html': markdown.markdown(cv_stream.text, extensions=['extra'])}))
+
+            cv_content, ats_analysis, version_id = engine.generate_tailored_cv(job_data, template_type, regenerate=regenerate, on_delta=on_cv_delta)
+            cv_data = engine.get_cv_version(version_id) or {}
+            generator = PDFGenerator()
+            header = engine._extract_header_info()
+            sections = engine._build_sections(cv_data)
+            events.put(('cv', {
+                'html': generator.generate_html(cv_content, template_name=template_type, header=header, sections=sections),
+                'sections': cv_data.get('sections') or {},
+                'ats': {'analysis': ats_analysis, 'score': cv_data.get('ats_score')}
+            }))
+
+            cl_markdown = engine._generate_cover_letter_markdown(
+                job_data, tailored_cv=cv_content, regenerate=regenerate,
+                on_delta=lambda chunk: events.put(('cover_letter_token', {'text': chunk}))
+            )
+            header['date'] = datetime.now().strftime('%B %d, %Y')
+            events.put(('cover_letter', {'html': generator.generate_html(cl_markdown, template_name='cover_letter', header=header)}))
+            preview_token = preview_store.save(user_id, job_data, template_type, version_id, cv_data, cl_markdown) if cv_data else None
+            events.put(('done', {'preview_token': preview_token}))
+        except Exception as e:
+            logger.error(f"Streaming preview failed: {e}")
+            events.put(('error', {'error': str(e)}))
+        finally:
+            events.put(None)
+
+    # The producer's LLM calls run at interactive priority
+    with llm_priority('interactive'):
+        context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(produce,), daemon=True).start()
+
+    def generate():
+        while True:
+            try:
+                item = events.get(timeout=PREVIEW_STREAM_KEEPALIVE_SECS)
+            except queue.Empty:
+                yield ': keepalive\n\n'
+                continue
+            if item is None:
+                return
+            yield sse_event(*item)
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/api/debug/cv', methods=['GET'])
 @login_required
 def debug_cv():
@@ -1815,6 +2295,19 @@ def debug_cv():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/debug/cache', methods=['GET'])
+@login_required
+def debug_cache():
+    try:
+        return jsonify({
+            'success': True,
+            'caches': [profile_cache.stats(), match_cache.stats(), get_llm_cache().stats()],
+            'models': get_model_router().stats(),
+            'llm_governor': get_llm_governor().stats()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # Cleanup thread
 def _cleanup_apply_jobs():
     while True:
@@ -1825,18 +2318,99 @@ def _cleanup_apply_jobs():
                 if (now - info.get('created_at', now)) > APPLY_JOB_CLEANUP_SECS:
                     to_delete.append(jid)
             for jid in to_delete: del apply_jobs[jid]
+            analyze_jobs.prune(APPLY_JOB_CLEANUP_SECS)
         except Exception: pass
         time.sleep(60)
 
 threading.Thread(target=_cleanup_apply_jobs, daemon=True).start()
 
+# ==========================================
+# Bulk CV Ingestion (CLI)
+# ==========================================
+
+INGEST_UPSERT_BATCH = 100
+INGEST_UPSERT_WORKERS = 8
+
+def _bulk_upsert_profiles(records):
+    """
+    Create or update one profile per ingested CV with the server API key.
+    The user id is the CV file name without extension. Existing profiles
+    are looked up INGEST_UPSERT_BATCH users per query.
+    """
+    admin_client = _get_admin_client()
+    if not admin_client:
+        print("APPWRITE_API_KEY not set; skipping profile upserts")
+        return 0, len(records)
+    admin_db = Databases(admin_client)
+
+    def upsert(record, existing_id):
+        user_id = record['user_id']
+        data = _profile_document(user_id, parse_profile(record['profile']),
+                                 os.path.basename(record['file']), record['cv_hash'])
+        try:
+            if existing_id:
+                admin_db.update_document(DATABASE_ID, COLLECTION_ID_PROFILES, existing_id, data=data)
+            else:
+                admin_db.create_document(
+                    DATABASE_ID, COLLECTION_ID_PROFILES, ID.unique(), data=data,
+                    permissions=[Permission.read(Role.user(user_id)), Permission.update(Role.user(user_id))]
+                )
+            return True
+        except Exception as e:
+            logger.warning(f"Profile upsert failed for {user_id}: {e}")
+            return False
+
+    ok = failed = 0
+    for i in range(0, len(records), INGEST_UPSERT_BATCH):
+        batch = records[i:i + INGEST_UPSERT_BATCH]
+        try:
+            existing = admin_db.list_documents(
+                DATABASE_ID, COLLECTION_ID_PROFILES,
+                queries=[Query.equal('userId', [r['user_id'] for r in batch]), Query.limit(len(batch))]
+            )
+            existing_ids = {d.get('userId'): d['$id'] for d in existing.get('documents', [])}
+        except Exception as e:
+            logger.warning(f"Profile lookup failed for batch {i // INGEST_UPSERT_BATCH}: {e}")
+            failed += len(batch)
+            continue
+        with ThreadPoolExecutor(max_workers=INGEST_UPSERT_WORKERS) as executor:
+            results = list(executor.map(lambda r: upsert(r, existing_ids.get(r['user_id'])), batch))
+        ok += sum(results)
+        failed += len(results) - sum(results)
+    return ok, failed
+
+def run_ingest(argv):
+    """python main.py ingest --dir cvs/ --workers N [--out cv_ingest.jsonl] [--upsert]"""
+    from utils.cv_ingest import ingest_directory, read_ingest_records
+
+    parser = argparse.ArgumentParser(prog='main.py ingest', description='Parse a directory of CVs into JSONL')
+    parser.add_argument('--dir', default='cvs', help='Directory of PDF/DOCX CVs')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Parser processes')
+    parser.add_argument('--out', default='cv_ingest.jsonl', help='JSONL output path')
+    parser.add_argument('--no-cache', action='store_true', help='Re-parse CVs already in the parsed CV cache')
+    parser.add_argument('--upsert', action='store_true', help='Bulk-load profiles into Appwrite afterwards')
+    args = parser.parse_args(argv)
+
+    print(f"Ingesting CVs from {args.dir} with {args.workers} workers -> {args.out}")
+    stats = ingest_directory(args.dir, args.out, workers=args.workers, use_cache=not args.no_cache)
+    print(f"✓ {stats.summary()}")
+
+    if args.upsert:
+        records = list(read_ingest_records(args.out))
+        started = time.time()
+        ok, failed = _bulk_upsert_profiles(records)
+        print(f"✓ Upserted {ok} profiles ({failed} failed) in {time.time() - started:.1f}s")
+    return 1 if stats.failed else 0
+
 # ==========================================
 # Main Execution Entry Point
 # ==========================================
 
 if __name__ == "__main__":
     # Check if arguments provided
-    if len(sys.argv) > 1:
+    if len(sys.argv) > 1 and sys.argv[1] == 'ingest':
+        sys.exit(run_ingest(sys.argv[2:]))
+    elif len(sys.argv) > 1:
         # CLI Mode
         parser = argparse.ArgumentParser(description='Job Application Pipeline')
         parser.add_argument('--cv', default=DEFAULT_CV_PATH, help='Path to CV PDF')
@@ -1859,5 +2433,6 @@ if __name__ == "__main__":
         # Server Mode (Default)
         print("Starting Job Market Agent API Server...")
         ensure_database_schema()
+        start_background_services()
         port = int(os.environ.get('PORT', 8000))
         app.run(host='0.0.0.0', port=port, debug=True)
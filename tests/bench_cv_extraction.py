@@ -0,0 +1,89 @@
+"""
+Benchmark CV PDF extraction modes on generated 2, 10 and 30 page CVs.
+
+    python tests/bench_cv_extraction.py [--engine pdfplumber] [--workers 4] [--repeat 3]
+
+Modes:
+    full      every page, serially (previous behaviour)
+    early     serial page ranges with page cap and early stop
+    parallel  page ranges over a process pool, no early stop
+    both      process pool with page cap and early stop
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from utils import cv_extraction
+from utils.cv_parser import profile_sections_complete
+
+FILLER = ("Published work on distributed systems, data pipelines and applied machine learning "
+          "in collaboration with industry partners and research groups.")
+
+
+def make_cv(path: str, pages: int):
+    """Write a CV whose profile sections sit on the first pages, followed by long appendices"""
+    c = canvas.Canvas(path, pagesize=A4)
+    layout = [
+        ["Jane Doe", "jane.doe@example.com | +27 82 123 4567", "PROFESSIONAL PROFILE",
+         "Researcher and software engineer.", "TECHNICAL SKILLS", "Languages: Python, SQL, R"],
+        ["EDUCATION", "PhD Computer Science", "University of Cape Town 2016 - 2020"],
+        ["WORK EXPERIENCE", "Senior Data Engineer", "Acme Corp | Jan 2021 - Present",
+         "• Built streaming pipelines processing 2M events per day"],
+    ]
+    for p in range(pages):
+        lines = layout[p] if p < len(layout) else [f"PUBLICATIONS (continued {p})"] + [FILLER] * 40
+        y = 800
+        for line in lines:
+            c.drawString(40, y, line[:110])
+            y -= 18
+        c.showPage()
+    c.save()
+
+
+def run_mode(path: str, engine: str, mode: str, workers: int) -> cv_extraction.ExtractedDocument:
+    early = mode in ('early', 'both')
+    cv_extraction.MAX_PAGES = 20 if early else 0
+    pool_workers = workers if mode in ('parallel', 'both') else 0
+    if mode == 'full':
+        cv_extraction.PAGE_RANGE_MIN_PAGES = 10 ** 6
+    else:
+        cv_extraction.PAGE_RANGE_MIN_PAGES = 4
+    return cv_extraction.extract_pdf(path, engine=engine,
+                                     stop_when=profile_sections_complete if early else None,
+                                     workers=pool_workers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--engine', default='pdfplumber', choices=cv_extraction.PDF_ENGINES)
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"engine={args.engine} workers={args.workers} repeat={args.repeat}")
+    print(f"{'pages':>5} {'mode':>9} {'median_s':>9} {'pages_read':>10} {'chars':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in (2, 10, 30):
+            path = os.path.join(tmp, f"cv_{pages}.pdf")
+            make_cv(path, pages)
+            for mode in ('full', 'early', 'parallel', 'both'):
+                run_mode(path, args.engine, mode, args.workers)  # warm up the pool
+                timings = []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    doc = run_mode(path, args.engine, mode, args.workers)
+                    timings.append(time.perf_counter() - started)
+                print(f"{pages:>5} {mode:>9} {statistics.median(timings):>9.3f} "
+                      f"{len(doc.pages):>10} {len(doc.raw_text):>7}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
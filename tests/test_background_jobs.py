@@ -0,0 +1,173 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from utils.background_jobs import BackgroundJobs, JobQueueFull
+from utils.cache import SQLiteCacheBackend, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class BackgroundJobsTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+
+    def jobs(self, **kwargs):
+        jobs = BackgroundJobs(clock=self.clock, **kwargs)
+        self.addCleanup(jobs.shutdown)
+        return jobs
+
+    def blocking_work(self, running=None):
+        def work(progress):
+            if running is not None:
+                running.append(threading.current_thread().name)
+            self.release.wait(5)
+            return {'success': True}, 200
+        return work
+
+    def test_pool_runs_at_most_workers_jobs(self):
+        jobs = self.jobs(workers=2, max_pending=10, name='analyze-test')
+        running = []
+        for _ in range(4):
+            jobs.submit('user-a', self.blocking_work(running))
+        self.assertTrue(wait_for(lambda: len(running) == 2))
+        time.sleep(0.1)
+        self.assertEqual(len(running), 2)
+        self.assertEqual(jobs.pending(), 4)
+        self.assertTrue(all(name.startswith('analyze-test') for name in running))
+        self.release.set()
+        self.assertTrue(wait_for(lambda: jobs.pending() == 0))
+        self.assertEqual(len(running), 4)
+
+    def test_rejects_past_max_pending(self):
+        jobs = self.jobs(workers=1, max_pending=2)
+        jobs.submit('user-a', self.blocking_work())
+        jobs.submit('user-a', self.blocking_work())
+        with self.assertRaises(JobQueueFull):
+            jobs.submit('user-b', self.blocking_work())
+        self.assertEqual(jobs.pending(), 2)
+        # Room again once the queue drains
+        self.release.set()
+        self.assertTrue(wait_for(lambda: jobs.pending() == 0))
+        jobs.submit('user-b', lambda progress: ({'success': True}, 200))
+
+    def test_status_polling(self):
+        jobs = self.jobs(workers=1)
+        parsed = threading.Event()
+
+        def work(progress):
+            progress('parsed', profile={'name': 'Ada'})
+            parsed.set()
+            self.release.wait(5)
+            return {'success': True, 'profile_id': 'p1'}, 200
+
+        job_id = jobs.submit('user-a', work, cv_filename='cv.pdf')
+        self.assertTrue(parsed.wait(5))
+        status = jobs.status(job_id, 'user-a')
+        self.assertEqual(status['status'], 'processing')
+        self.assertEqual(status['stage'], 'parsed')
+        self.assertEqual(status['profile'], {'name': 'Ada'})
+        self.assertEqual(status['cv_filename'], 'cv.pdf')
+        self.assertNotIn('user_id', status)
+
+        self.release.set()
+        self.assertTrue(wait_for(lambda: jobs.status(job_id, 'user-a')['status'] == 'done'))
+        status = jobs.status(job_id, 'user-a')
+        self.assertEqual(status['stage'], 'done')
+        self.assertEqual(status['http_status'], 200)
+        self.assertEqual(status['result'], {'success': True, 'profile_id': 'p1'})
+
+    def test_status_hidden_from_other_users(self):
+        jobs = self.jobs()
+        job_id = jobs.submit('user-a', lambda progress: ({'success': True}, 200))
+        self.assertIsNone(jobs.status(job_id, 'user-b'))
+        self.assertIsNone(jobs.status('missing', 'user-a'))
+        self.assertIsNone(jobs.status(None, 'user-a'))
+
+    def test_failures_reported(self):
+        jobs = self.jobs()
+
+        def boom(progress):
+            raise RuntimeError('parser crashed')
+
+        failed = jobs.submit('user-a', boom)
+        rejected = jobs.submit('user-a', lambda progress: ({'success': False, 'error': 'Image-only PDF'}, 422))
+        self.assertTrue(wait_for(lambda: jobs.pending() == 0))
+        status = jobs.status(failed, 'user-a')
+        self.assertEqual((status['status'], status['http_status'], status['error']), ('error', 500, 'parser crashed'))
+        status = jobs.status(rejected, 'user-a')
+        self.assertEqual((status['status'], status['http_status'], status['error']), ('error', 422, 'Image-only PDF'))
+
+    def test_processing_job_times_out(self):
+        jobs = self.jobs(timeout=300, timeout_error='Analysis timed out.')
+        job_id = jobs.submit('user-a', self.blocking_work())
+        self.assertEqual(jobs.status(job_id, 'user-a')['status'], 'processing')
+        self.clock.now += 301
+        status = jobs.status(job_id, 'user-a')
+        self.assertEqual((status['status'], status['error']), ('error', 'Analysis timed out.'))
+
+    def test_prune(self):
+        jobs = self.jobs()
+        old = jobs.submit('user-a', lambda progress: ({'success': True}, 200))
+        self.clock.now += 100
+        recent = jobs.submit('user-a', lambda progress: ({'success': True}, 200))
+        self.assertEqual(jobs.prune(50), 1)
+        self.assertIsNone(jobs.status(old, 'user-a'))
+        self.assertIsNotNone(jobs.status(recent, 'user-a'))
+
+
+    def test_status_shared_between_workers(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        db_path = os.path.join(tmpdir.name, 'cache.db')
+        # The submit and the polls land on different worker processes
+        worker_a, worker_b = (
+            self.jobs(store=TTLCache('analyze_jobs', maxsize=10, ttl=60, backend=SQLiteCacheBackend(db_path)))
+            for _ in range(2)
+        )
+        parsed = threading.Event()
+
+        def work(progress):
+            progress('parsed', profile={'name': 'Ada'})
+            parsed.set()
+            self.release.wait(5)
+            return {'success': True, 'profile_id': 'p1'}, 200
+
+        job_id = worker_a.submit('user-a', work, cv_filename='cv.pdf')
+        self.assertTrue(parsed.wait(5))
+        status = worker_b.status(job_id, 'user-a')
+        self.assertEqual((status['status'], status['stage'], status['profile']), ('processing', 'parsed', {'name': 'Ada'}))
+        self.assertIsNone(worker_b.status(job_id, 'user-b'))
+        # Only the worker running the job counts it against its pool
+        self.assertEqual((worker_a.pending(), worker_b.pending()), (1, 0))
+
+        self.release.set()
+        self.assertTrue(wait_for(lambda: worker_b.status(job_id, 'user-a')['status'] == 'done'))
+        self.assertEqual(worker_b.status(job_id, 'user-a')['result'], {'success': True, 'profile_id': 'p1'})
+        self.clock.now += 100
+        self.assertEqual(worker_a.prune(50), 1)
+        self.assertIsNone(worker_b.status(job_id, 'user-a'))
+
+if __name__ == '__main__':
+    unittest.main()
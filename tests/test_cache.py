@@ -0,0 +1,98 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from utils import cache as cache_module
+from utils.cache import TTLCache, MemoryCacheBackend, SQLiteCacheBackend, build_cache
+
+
+class TTLCacheTest(unittest.TestCase):
+    """Every check runs against each cache backend"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, 'cache.db')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def caches(self):
+        backends = {
+            'memory': MemoryCacheBackend(),
+            'sqlite': SQLiteCacheBackend(self.db_path),
+        }
+        for name, backend in backends.items():
+            with self.subTest(backend=name):
+                yield TTLCache(f'test_{name}', maxsize=2, ttl=60, backend=backend)
+
+    def test_lru_eviction(self):
+        for cache in self.caches():
+            cache.set('a', 1)
+            cache.set('b', 2)
+            cache.get('a')
+            cache.set('c', 3)
+            self.assertIsNone(cache.get('b'))
+            self.assertEqual(cache.get('a'), 1)
+            self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_ttl_expiry(self):
+        for cache in self.caches():
+            cache.set('a', 1, ttl=0.01)
+            time.sleep(0.02)
+            self.assertIsNone(cache.get('a'))
+            self.assertEqual(cache.expirations, 1)
+
+    def test_invalidate_user(self):
+        for cache in self.caches():
+            cache.set('k1', [1], user_id='u1')
+            cache.set('k2', [2], user_id='u2')
+            self.assertEqual(cache.invalidate_user('u1'), 1)
+            self.assertIsNone(cache.get('k1'))
+            self.assertEqual(cache.get('k2'), [2])
+
+    def test_hit_miss_counters(self):
+        for cache in self.caches():
+            cache.set('a', {'x': 1})
+            cache.get('a')
+            cache.get('missing')
+            stats = cache.stats()
+            self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_sqlite_shared_between_instances(self):
+        cache = TTLCache('test', maxsize=2, ttl=60, backend=SQLiteCacheBackend(self.db_path))
+        other = TTLCache('test', maxsize=2, ttl=60, backend=SQLiteCacheBackend(self.db_path))
+        cache.set('a', [1, 2], user_id='u1')
+        self.assertEqual(other.get('a'), [1, 2])
+        other.invalidate_user('u1')
+        self.assertIsNone(cache.get('a'))
+
+
+    def test_default_backend_shared_between_workers(self):
+        # Each gunicorn worker builds its own backend instance on the same file
+        env = {'CACHE_DB_PATH': self.db_path}
+        with mock.patch.dict(os.environ, env), mock.patch.object(cache_module, '_shared_backend', None):
+            os.environ.pop('CACHE_BACKEND', None)
+            worker_a = build_cache('profiles', maxsize=10, ttl=60)
+        with mock.patch.dict(os.environ, env), mock.patch.object(cache_module, '_shared_backend', None):
+            os.environ.pop('CACHE_BACKEND', None)
+            worker_b = build_cache('profiles', maxsize=10, ttl=60)
+        self.assertIsInstance(worker_a.backend, SQLiteCacheBackend)
+        self.assertIsNot(worker_a.backend, worker_b.backend)
+
+        worker_a.set('user-1', {'skills': ['Python']}, user_id='user-1')
+        self.assertEqual(worker_b.get('user-1'), {'skills': ['Python']})
+        # A profile update handled by worker B is seen by worker A
+        worker_b.set('user-1', {'skills': ['Python', 'SQL']}, user_id='user-1')
+        self.assertEqual(worker_a.get('user-1'), {'skills': ['Python', 'SQL']})
+        worker_b.invalidate_user('user-1')
+        self.assertIsNone(worker_a.get('user-1'))
+
+    def test_memory_backend_is_opt_in(self):
+        with mock.patch.dict(os.environ, {'CACHE_BACKEND': 'memory'}):
+            self.assertIsInstance(build_cache('profiles', maxsize=10, ttl=60).backend, MemoryCacheBackend)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from utils.cv_cache import ParsedCVCache, hash_cv_text
+from utils.cv_parser import CVParser, CVData, build_profile_from_cv_data
+
+
+CV_TEXT = """Jane Doe
+jane.doe@example.com
+TECHNICAL SKILLS
+Languages: Python, SQL
+EDUCATION
+BSc Computer Science
+University of Cape Town 2019 - 2022
+"""
+
+
+class ParsedCVCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = ParsedCVCache(db_path=os.path.join(self.tmpdir.name, 'cv_cache.db'))
+        self.cv_data = CVParser(raw_text=CV_TEXT).parse()
+        self.profile = build_profile_from_cv_data(self.cv_data)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        key = hash_cv_text(CV_TEXT)
+        self.cache.put(key, CV_TEXT, self.cv_data, self.profile)
+        cached = self.cache.get(key)
+        self.assertIsInstance(cached.cv_data, CVData)
+        self.assertEqual(cached.cv_data.to_dict(), self.cv_data.to_dict())
+        self.assertEqual(cached.profile, self.profile)
+        self.assertEqual(cached.cv_content, CV_TEXT)
+
+    def test_parser_version_bump_invalidates(self):
+        key = hash_cv_text(CV_TEXT)
+        self.cache.put(key, CV_TEXT, self.cv_data, self.profile)
+        with mock.patch('utils.cv_cache.PARSER_VERSION', 999):
+            self.assertIsNone(self.cache.get(key))
+
+    def test_miss(self):
+        self.assertIsNone(self.cache.get('unknown'))
+        self.assertIsNone(self.cache.get(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
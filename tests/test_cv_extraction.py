@@ -0,0 +1,118 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from utils import cv_extraction
+from utils.cv_extraction import ExtractedDocument, classify_pdf, extract_document, extract_pdf, get_pdf_engine_order
+from utils.cv_parser import CVParser, profile_sections_complete
+
+
+CV_TEXT = """Jane Doe
+jane.doe@example.com
+PROFESSIONAL PROFILE
+Aspiring software engineer with a passion for data.
+TECHNICAL SKILLS
+Languages: Python, JavaScript, SQL
+"""
+
+
+class ExtractionTest(unittest.TestCase):
+    def test_text_file_extracted_once(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cv.txt')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(CV_TEXT + "\n\n\n\n")
+            doc = extract_document(path)
+        self.assertEqual(doc.engine, 'text')
+        self.assertEqual(doc.text, CV_TEXT.strip())
+
+    def test_parser_uses_document_without_reopening(self):
+        doc = ExtractedDocument(raw_text=CV_TEXT, engine='pdfplumber', path='/missing/cv.pdf', page_count=1)
+        with mock.patch('utils.cv_parser.extract_pdf') as extract_pdf:
+            cv_data = CVParser(document=doc).parse()
+        extract_pdf.assert_not_called()
+        self.assertEqual(cv_data.contact_info.email, 'jane.doe@example.com')
+        self.assertIn('Python', cv_data.technical_skills.get('Languages', []))
+
+    def test_engine_order(self):
+        self.assertEqual(get_pdf_engine_order('pypdf'), ['pypdf', 'pdfplumber', 'pdfminer'])
+        self.assertEqual(get_pdf_engine_order('bogus')[0], 'pdfplumber')
+
+
+class EarlyStopTest(unittest.TestCase):
+    PAGES = [
+        "Jane Doe\nTECHNICAL SKILLS\nPython",
+        "EDUCATION\nBSc Computer Science",
+        "WORK EXPERIENCE\nData Engineer",
+        "• Built pipelines",
+        "PUBLICATIONS",
+    ]
+
+    def test_waits_for_page_after_last_section(self):
+        self.assertFalse(profile_sections_complete(self.PAGES[:2]))
+        self.assertFalse(profile_sections_complete(self.PAGES[:3]))
+        self.assertTrue(profile_sections_complete(self.PAGES[:4]))
+
+    def test_ignores_long_lines(self):
+        pages = ["My skills, education and experience are described at length in this sentence."] * 3
+        self.assertFalse(profile_sections_complete(pages))
+
+
+def write_pdf(path, page_kinds):
+    """PDF with a line of text or a full-page scan image per page"""
+    from PIL import Image
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfgen import canvas
+
+    scan = ImageReader(Image.new('RGB', (620, 877), 'white'))
+    c = canvas.Canvas(path, pagesize=A4)
+    for kind in page_kinds:
+        if kind == 'image':
+            c.drawImage(scan, 0, 0, *A4)
+        else:
+            c.drawString(40, 800, "Jane Doe - TECHNICAL SKILLS - Python, SQL")
+        c.showPage()
+    c.save()
+
+
+class ClassifyPDFTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def pdf(self, *page_kinds):
+        path = os.path.join(self.tmpdir.name, f"{'-'.join(page_kinds)}.pdf")
+        write_pdf(path, page_kinds)
+        return path
+
+    def test_classification(self):
+        self.assertEqual(classify_pdf(self.pdf('text', 'text')), 'text')
+        self.assertEqual(classify_pdf(self.pdf('text', 'image')), 'mixed')
+        self.assertEqual(classify_pdf(self.pdf('image', 'image')), 'image_only')
+        self.assertEqual(classify_pdf(os.path.join(self.tmpdir.name, 'missing.pdf')), 'unknown')
+
+    def test_scan_skips_text_engines(self):
+        path = self.pdf('image', 'image', 'image')
+        with mock.patch.object(cv_extraction, 'OCR_ENABLED', False), \
+                mock.patch.object(cv_extraction, '_read_pdf_pages') as read_pages:
+            doc = extract_pdf(path)
+        read_pages.assert_not_called()
+        self.assertTrue(doc.image_only)
+
+    def test_scan_uses_ocr_when_available(self):
+        path = self.pdf('image')
+        ocr_doc = ExtractedDocument("Jane Doe", cv_extraction.OCR_ENGINE, path, 1, ["Jane Doe"], 'image_only')
+        with mock.patch.object(cv_extraction, 'ocr_available', return_value=True), \
+                mock.patch.object(cv_extraction, 'ocr_pdf', return_value=ocr_doc):
+            doc = extract_pdf(path)
+        self.assertEqual(doc.engine, 'tesseract')
+        self.assertTrue(doc.is_pdf)
+        self.assertFalse(doc.image_only)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from utils.cv_cache import ParsedCVCache
+from utils.cv_extraction import ExtractedDocument
+from utils.cv_ingest import ingest_directory, parse_cv_file, read_ingest_records
+
+
+def write_cv_pdf(path, name, skills):
+    c = canvas.Canvas(path, pagesize=A4)
+    y = 800
+    for line in [name, f"{name.split()[0].lower()}@example.com", "TECHNICAL SKILLS",
+                 f"Languages: {skills}", "EDUCATION", "Bachelor of Science | University of Pretoria 2020",
+                 "WORK EXPERIENCE", "Software Engineer | Acme", "Jan 2021 - Present",
+                 "• Built data pipelines and internal APIs for the analytics team"]:
+        c.drawString(40, y, line)
+        y -= 18
+    c.showPage()
+    c.save()
+
+
+class IngestDirectoryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cv_dir = os.path.join(self.tmpdir.name, 'cvs')
+        os.makedirs(self.cv_dir)
+        write_cv_pdf(os.path.join(self.cv_dir, 'user-a.pdf'), 'Jane Doe', 'Python, SQL')
+        write_cv_pdf(os.path.join(self.cv_dir, 'user-b.pdf'), 'John Smith', 'Java, Go')
+        # Same content under another name is parsed once
+        shutil.copy(os.path.join(self.cv_dir, 'user-a.pdf'), os.path.join(self.cv_dir, 'user-c.pdf'))
+        with open(os.path.join(self.cv_dir, 'notes.txt'), 'w') as f:
+            f.write('not a CV')
+        self.out = os.path.join(self.tmpdir.name, 'out.jsonl')
+        cache = ParsedCVCache(db_path=os.path.join(self.tmpdir.name, 'cv_cache.db'))
+        self.patcher = mock.patch('utils.cv_ingest.get_parsed_cv_cache', return_value=cache)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.tmpdir.cleanup()
+
+    def test_parses_and_writes_jsonl(self):
+        stats = ingest_directory(self.cv_dir, self.out, workers=2)
+        self.assertEqual((stats.total, stats.parsed, stats.duplicates, stats.failed), (3, 2, 1, 0))
+        records = {r['user_id']: r for r in read_ingest_records(self.out)}
+        self.assertEqual(set(records), {'user-a', 'user-b', 'user-c'})
+        self.assertEqual(records['user-a']['profile']['email'], 'jane@example.com')
+        # The copy gets its own record built from the first parse
+        self.assertEqual(records['user-c']['profile'], records['user-a']['profile'])
+        self.assertTrue(records['user-c']['duplicate_of'].endswith('user-a.pdf'))
+        self.assertNotIn('duplicate_of', records['user-a'])
+        self.assertIn('Go', records['user-b']['cv_data']['technical_skills']['Languages'])
+
+    def test_progress_counts_files(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            ingest_directory(self.cv_dir, self.out, workers=0)
+        progress = [line.split()[0] for line in output.getvalue().splitlines()]
+        # user-a and its copy user-c finish together
+        self.assertEqual(progress, ['[2/3]', '[3/3]'])
+
+    def test_files_without_text_rejected(self):
+        documents = {
+            'user-a.pdf': ExtractedDocument(raw_text='', engine='pypdf', pdf_kind='image_only'),
+            'user-b.pdf': ExtractedDocument(raw_text=' \n ', engine='pypdf', pdf_kind='text'),
+        }
+        with mock.patch('utils.cv_ingest.extract_document', side_effect=lambda p: documents[os.path.basename(p)]):
+            self.assertIn('Scanned PDF', parse_cv_file(os.path.join(self.cv_dir, 'user-a.pdf'))['error'])
+            self.assertIn('No text', parse_cv_file(os.path.join(self.cv_dir, 'user-b.pdf'))['error'])
+            stats = ingest_directory(self.cv_dir, self.out, workers=0)
+        self.assertEqual((stats.parsed, stats.failed), (0, 3))
+        self.assertEqual(list(read_ingest_records(self.out)), [])
+        # Nothing empty was cached: a later run parses the real files
+        stats = ingest_directory(self.cv_dir, self.out, workers=0)
+        self.assertEqual((stats.parsed, stats.cached, stats.failed), (2, 0, 0))
+
+    def test_second_run_uses_cache(self):
+        ingest_directory(self.cv_dir, self.out, workers=0)
+        stats = ingest_directory(self.cv_dir, self.out, workers=0)
+        self.assertEqual((stats.parsed, stats.cached), (0, 2))
+        self.assertTrue(all(r['cached'] for r in read_ingest_records(self.out)))
+
+    def test_long_cv_text_keeps_pages_after_profile_sections(self):
+        # Profile sections are complete on page 1; later pages still belong to the CV
+        path = os.path.join(self.cv_dir, 'user-long.pdf')
+        c = canvas.Canvas(path, pagesize=A4)
+        for i, line in enumerate(["Long Writer", "TECHNICAL SKILLS", "Languages: Python", "EDUCATION",
+                                  "BSc | University of Cape Town 2019", "WORK EXPERIENCE", "Engineer | Acme"]):
+            c.drawString(40, 800 - 18 * i, line)
+        for page in range(6):
+            c.showPage()
+            c.drawString(40, 800, f"PUBLICATIONS page {page}" if page == 5 else f"Project notes {page}")
+        c.showPage()
+        c.save()
+        with mock.patch('utils.cv_extraction.PAGE_RANGE_MIN_PAGES', 2):
+            result = parse_cv_file(path)
+        self.assertIn('PUBLICATIONS page 5', result['cv_content'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from utils.cv_cache import ParsedCVCache, hash_cv_text
+from utils.cv_master import MasterCV, extract_cv_header
+from utils.cv_parser import CVParser
+
+CV_TEXT = """Ada Lovelace
+Data Analyst
+ada@example.com | +27 82 555 1234
+Location: Cape Town
+
+PROFESSIONAL EXPERIENCE
+Analyst, Acme (2021 - 2024)
+- Built SQL reporting pipelines
+
+EDUCATION
+BSc Mathematics, University of Cape Town (2020)
+
+SKILLS
+Python, SQL, Tableau
+"""
+
+
+class ExtractCVHeaderTest(unittest.TestCase):
+    def test_fields(self):
+        header = extract_cv_header(CV_TEXT)
+        self.assertEqual(header, {
+            'name': 'Ada Lovelace',
+            'title': 'Data Analyst',
+            'email': 'ada@example.com',
+            'phone': '+27 82 555 1234',
+            'location': 'Cape Town',
+        })
+
+    def test_empty(self):
+        self.assertEqual(extract_cv_header(None), {'name': '', 'title': '', 'email': '', 'phone': '', 'location': ''})
+
+
+class MasterCVTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = ParsedCVCache(db_path=os.path.join(self.tmpdir.name, 'cv_cache.db'))
+        patcher = mock.patch('utils.cv_master.get_parsed_cv_cache', return_value=self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_header_extracted_once(self):
+        master = MasterCV(CV_TEXT)
+        with mock.patch('utils.cv_master.extract_cv_header', wraps=extract_cv_header) as extract:
+            header = master.header_info()
+            header['name'] = 'changed by caller'
+            self.assertEqual(master.header_info()['name'], 'Ada Lovelace')
+        self.assertEqual(extract.call_count, 1)
+
+    def test_parsed_once_and_cached(self):
+        master = MasterCV(CV_TEXT)
+        with mock.patch('utils.cv_master.CVParser', wraps=CVParser) as parser:
+            first = master.parsed_cv_data()
+            self.assertIs(master.parsed_cv_data(), first)
+            # Another engine for the same text reads the parsed CV cache
+            self.assertIsNotNone(MasterCV(CV_TEXT).parsed_cv_data())
+        self.assertEqual(parser.call_count, 1)
+        self.assertIsNotNone(self.cache.get(hash_cv_text(CV_TEXT)))
+
+    def test_failed_parse_not_retried(self):
+        master = MasterCV(CV_TEXT)
+        with mock.patch('utils.cv_master.CVParser', side_effect=ValueError('bad CV')) as parser:
+            self.assertIsNone(master.parsed_cv_data())
+            self.assertIsNone(master.parsed_cv_data())
+        self.assertEqual(parser.call_count, 1)
+
+    def test_given_parse_skips_parser(self):
+        parsed = CVParser(raw_text=CV_TEXT).parse()
+        with mock.patch('utils.cv_master.CVParser') as parser:
+            self.assertIs(MasterCV(CV_TEXT, parsed).parsed_cv_data(), parsed)
+            self.assertIsNone(MasterCV('').parsed_cv_data())
+        parser.assert_not_called()
+
+    def test_sections_memoized_per_version_and_profile(self):
+        master = MasterCV(CV_TEXT)
+        derive = mock.Mock(side_effect=lambda cv_data: {'summary': cv_data['cv_content']})
+        version = {'cv_content': '# CV 1', 'sections': {'experience': ['Acme']}, 'job_keywords': ['sql']}
+        profile = {'skills': ['Python']}
+
+        sections = master.sections(version, profile, derive)
+        sections['summary'] = 'changed by caller'
+        self.assertEqual(master.sections(dict(version), profile, derive), {'summary': '# CV 1'})
+        self.assertEqual(derive.call_count, 1)
+
+        # Another version or an updated profile derives again
+        master.sections(dict(version, cv_content='# CV 2'), profile, derive)
+        master.sections(version, {'skills': ['Python', 'SQL']}, derive)
+        self.assertEqual(derive.call_count, 3)
+
+    def test_sections_memo_bounded(self):
+        master = MasterCV(CV_TEXT, sections_memo_size=2)
+        derive = mock.Mock(side_effect=lambda cv_data: {'summary': cv_data['cv_content']})
+        for n in range(3):
+            master.sections({'cv_content': f"# CV {n}"}, {}, derive)
+        self.assertEqual(len(master._sections_memo), 2)
+        # The oldest version was dropped, the newest are still memoized
+        master.sections({'cv_content': '# CV 2'}, {}, derive)
+        self.assertEqual(derive.call_count, 3)
+        master.sections({'cv_content': '# CV 0'}, {}, derive)
+        self.assertEqual(derive.call_count, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
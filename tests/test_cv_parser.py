@@ -0,0 +1,66 @@
+import unittest
+
+from utils.cv_parser import CVParser, classify_header, classify_line
+
+
+CV_TEXT = """Jane Doe
+jane.doe@example.com | +27 82 123 4567
+PROFESSIONAL PROFILE
+Backend developer focused on data platforms.
+TECHNICAL SKILLS
+Languages: Python, SQL, JavaScript
+EDUCATION
+Bachelor of Science | University of Cape Town 2019
+• Dean's list
+WORK EXPERIENCE
+Software Engineer | Acme Corp
+Jan 2020 - Present
+• Built APIs serving 2M requests a day
+PROJECTS
+Job Board | Scraper and matcher
+Built with: Flask, Redis
+"""
+
+
+class LineClassifierTest(unittest.TestCase):
+    def test_header_priority_follows_section_order(self):
+        # "details" (contact) outranks "experience" wherever it appears in the line
+        self.assertEqual(classify_header('Experience details'), 'contact')
+        self.assertEqual(classify_header('Technical Skills'), 'skills')
+        self.assertEqual(classify_header('Professional Experience'), 'experience')
+        self.assertIsNone(classify_header('Jane Doe'))
+
+    def test_line_labels(self):
+        label = classify_line('• Led migration in March 2021')
+        self.assertTrue(label.bullet)
+        self.assertTrue(label.date)
+        self.assertFalse(label.caps)
+        self.assertTrue(classify_line('github.com/jane').contact)
+        self.assertTrue(classify_line('Senior Data Engineer').job_title)
+        self.assertTrue(classify_line('Honours in Informatics').degree)
+        self.assertTrue(classify_line('WORK EXPERIENCE').caps)
+
+
+class ParserTest(unittest.TestCase):
+    def test_parse_sections(self):
+        parser = CVParser(raw_text=CV_TEXT)
+        cv_data = parser.parse()
+        self.assertEqual(cv_data.contact_info.name, 'Jane Doe')
+        self.assertEqual(list(parser.find_section_boundaries()),
+                         ['profile', 'skills', 'education', 'experience', 'projects'])
+        self.assertEqual(cv_data.education[0].institution, 'University of Cape Town 2019')
+        self.assertEqual(cv_data.education[0].details, ["Dean's list"])
+        self.assertEqual(cv_data.work_experience[0].company, 'Acme Corp')
+        self.assertEqual(cv_data.work_experience[0].duration, 'Jan 2020 - Present')
+        self.assertEqual(cv_data.projects[0].technologies, ['Flask', 'Redis'])
+
+    def test_labels_follow_lines(self):
+        parser = CVParser(raw_text="EDUCATION\nBSc 2019")
+        self.assertEqual(parser.labels[0].header, 'education')
+        parser.raw_text = "SKILLS\nPython"
+        parser.extract_text()
+        self.assertEqual([label.text for label in parser.labels], ['SKILLS', 'Python'])
+
+
+if __name__ == '__main__':
+    unittest.main()
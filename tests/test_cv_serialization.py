@@ -0,0 +1,78 @@
+import json
+import unittest
+from unittest import mock
+
+from utils import cv_parser
+from utils.cv_parser import (
+    CVData, ContactInfo, Education, Project, WorkExperience,
+    compact_cv_text, unpack_cv_text
+)
+
+
+def sample_cv_data(raw_text="Jane Doe\nTECHNICAL SKILLS\nPython, SQL\n" * 20) -> CVData:
+    return CVData(
+        contact_info=ContactInfo(name="Jane Doe", email="jane@example.com", github="github.com/jane"),
+        professional_profile="Backend developer – data platforms ✓",
+        technical_skills={"Languages": ["Python", "SQL"], "Cloud": []},
+        education=[Education("Bachelor of Science", "University of Cape Town", "2019", ["Dean's list"])],
+        work_experience=[WorkExperience("Software Engineer", "Acme", None, ["Built APIs"])],
+        projects=[Project("Job Board", "", ["Flask", "Redis"], [])],
+        raw_text=raw_text
+    )
+
+
+class BinarySerializationTest(unittest.TestCase):
+    def test_round_trip(self):
+        cv_data = sample_cv_data()
+        restored = CVData.from_bytes(cv_data.to_bytes())
+        self.assertEqual(restored, cv_data)
+        self.assertIsNone(restored.work_experience[0].duration)
+
+    def test_round_trip_without_raw_text(self):
+        cv_data = sample_cv_data()
+        restored = CVData.from_bytes(cv_data.to_bytes(include_raw_text=False))
+        self.assertEqual(restored.raw_text, "")
+        self.assertEqual(restored.to_dict(), cv_data.to_dict())
+
+    def test_smaller_than_json(self):
+        cv_data = sample_cv_data()
+        as_json = json.dumps(dict(cv_data.to_dict(), raw_text=cv_data.raw_text)).encode('utf-8')
+        self.assertLess(len(cv_data.to_bytes()), len(as_json))
+
+    def test_rejects_foreign_bytes(self):
+        with self.assertRaises(ValueError):
+            CVData.from_bytes(b'{"contact_info": {}}')
+
+    def test_models_are_slotted(self):
+        with self.assertRaises((AttributeError, TypeError)):
+            sample_cv_data().contact_info.nickname = "JD"
+
+
+class RawTextReleaseTest(unittest.TestCase):
+    def test_compress_keeps_text_recoverable(self):
+        cv_data = sample_cv_data()
+        original = cv_data.raw_text
+        cv_data.release_raw_text('compress')
+        self.assertEqual(cv_data.raw_text, "")
+        self.assertEqual(cv_data.get_raw_text(), original)
+        self.assertEqual(CVData.from_bytes(cv_data.to_bytes()).raw_text, original)
+
+    def test_drop(self):
+        cv_data = sample_cv_data()
+        cv_data.release_raw_text('drop')
+        self.assertEqual(cv_data.get_raw_text(), "")
+
+    def test_compact_cv_text(self):
+        text = "Jane Doe\nPython developer\n" * 50
+        with mock.patch.object(cv_parser, 'RAW_TEXT_MODE', 'keep'):
+            self.assertIs(compact_cv_text(text), text)
+        with mock.patch.object(cv_parser, 'RAW_TEXT_MODE', 'compress'):
+            packed = compact_cv_text(text)
+        self.assertIsInstance(packed, bytes)
+        self.assertLess(len(packed), len(text))
+        self.assertEqual(unpack_cv_text(packed), text)
+        self.assertEqual(unpack_cv_text(text), text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime
+
+from utils.cache import SQLiteCacheBackend, TTLCache
+from utils.cv_versions import CVVersionStore, new_version_id, pack_version, unpack_version
+
+
+def version(n):
+    return {
+        'cv_content': f"# CV {n}\n" + 'Experienced analyst. ' * 50,
+        'ats_score': n,
+        'job_keywords': ['sql', 'python'],
+        'created_at': datetime(2025, 1, 1, 9, n),
+        'company': f"Company {n}",
+        'job_match_score': 0,
+        'sections': {'summary': '', 'experience': [f"role {n}"]},
+    }
+
+
+class CVVersionStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.spill = TTLCache('cv_versions', maxsize=100, ttl=3600,
+                              backend=SQLiteCacheBackend(os.path.join(self.tmpdir.name, 'versions.db')))
+        self.store = CVVersionStore(memory_limit=2, spill=self.spill)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_spills_oldest_and_loads_lazily(self):
+        for n in range(5):
+            self.store[f"v{n}"] = version(n)
+        self.assertEqual(self.store.stats(), {'in_memory': 2, 'spilled': 3, 'memory_limit': 2})
+        self.assertEqual(self.store.keys(), ['v0', 'v1', 'v2', 'v3', 'v4'])
+        self.assertEqual(self.store.latest_version_id, 'v4')
+        self.assertIn('v0', self.store)
+        self.assertEqual(self.store['v0'], version(0))
+        self.assertIsNone(self.store.get('missing'))
+        with self.assertRaises(KeyError):
+            self.store['missing']
+
+    def test_spilled_version_gone_after_expiry(self):
+        for n in range(3):
+            self.store[f"v{n}"] = version(n)
+        self.spill.delete(f"{self.store._store_id}:v0")
+        self.assertNotIn('v0', self.store)
+        self.assertEqual(len(self.store), 2)
+
+    def test_stores_do_not_share_versions(self):
+        other = CVVersionStore(memory_limit=1, spill=self.spill)
+        for store in (self.store, other):
+            for n in range(3):
+                store[f"v{n}"] = version(n if store is self.store else n + 10)
+        self.assertEqual(self.store['v0']['ats_score'], 0)
+        self.assertEqual(other['v0']['ats_score'], 10)
+
+    def test_clear_drops_spilled(self):
+        for n in range(4):
+            self.store[f"v{n}"] = version(n)
+        self.store.clear()
+        self.assertEqual(len(self.store), 0)
+        self.assertEqual(len(self.spill), 0)
+        self.assertIsNone(self.store.latest_version_id)
+
+    def test_concurrent_writers_and_readers(self):
+        errors = []
+
+        def writer(worker):
+            try:
+                for n in range(20):
+                    self.store[f"w{worker}_{n}"] = version(n)
+            except Exception as e:
+                errors.append(e)
+
+        def reader():
+            try:
+                for _ in range(20):
+                    for version_id in self.store.keys():
+                        self.store.get(version_id)
+                    len(self.store)
+                    self.store.latest_version_id
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=writer, args=(w,)) for w in range(4)]
+        threads += [threading.Thread(target=reader) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.store), 80)
+        self.assertEqual(self.store.stats()['in_memory'], 2)
+        for w in range(4):
+            self.assertEqual(self.store[f"w{w}_5"], version(5))
+
+    def test_version_readable_while_being_spilled(self):
+        reading = threading.Event()
+        spill_set = self.spill.set
+
+        def slow_set(*args, **kwargs):
+            # A request reads the version while another one is spilling it
+            reading.wait(5)
+            time.sleep(0.05)
+            spill_set(*args, **kwargs)
+
+        self.store['v0'] = version(0)
+        self.store['v1'] = version(1)
+        self.spill.set = slow_set
+        writer = threading.Thread(target=self.store.__setitem__, args=('v2', version(2)))
+        writer.start()
+        time.sleep(0.05)
+        reading.set()
+        self.assertEqual(self.store.get('v0'), version(0))
+        writer.join()
+
+    def test_pack_round_trip_is_compact(self):
+        packed = pack_version(version(1))
+        self.assertEqual(unpack_version(packed), version(1))
+        self.assertLess(len(packed), len(version(1)['cv_content']))
+
+    def test_version_ids_unique(self):
+        ids = {new_version_id('Acme', 'Analyst') for _ in range(200)}
+        self.assertEqual(len(ids), 200)
+        self.assertTrue(next(iter(ids)).startswith('Acme_Analyst_'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import json
+import unittest
+from unittest import mock
+
+from utils.job_features import (
+    FEATURES_KEY, JobFeatures, get_job_features, job_json_default, jobs_with_features, restore_job_features
+)
+
+
+JOB = {
+    'title': 'Senior Python Developer',
+    'description': 'Build REST API services with Django, PostgreSQL and AWS.',
+    'company': 'Acme',
+    'salary_info': {'salary_min': 50000, 'salary_max': 70000},
+}
+
+
+class JobFeaturesTest(unittest.TestCase):
+    def test_built_once_and_reused(self):
+        job = dict(JOB)
+        features = get_job_features(job)
+        self.assertIs(get_job_features(job), features)
+        self.assertIn('python', features.title_tokens)
+        self.assertEqual(features.seniority, ['senior'])
+        self.assertIn('Django', features.skills)
+        self.assertEqual(features.salary['salary_min'], 50000)
+
+    def test_job_left_unmodified(self):
+        job = dict(JOB)
+        get_job_features(job)
+        self.assertEqual(job, JOB)
+        json.dumps(job)
+
+    def test_client_features_ignored(self):
+        job = dict(JOB, **{FEATURES_KEY: {'skills': ['Cobol'], 'title': 'forged', 'seniority': ['junior']}})
+        features = get_job_features(job)
+        self.assertNotIn('Cobol', features.skills)
+        self.assertEqual(features.seniority, ['senior'])
+
+    def test_changed_description_rebuilds(self):
+        job = dict(JOB)
+        features = get_job_features(job)
+        job['description'] = 'Kubernetes and Go platform work'
+        self.assertIsNot(get_job_features(job), features)
+        self.assertIn('Kubernetes', get_job_features(job).skills)
+
+    def test_cache_file_round_trip(self):
+        job = dict(JOB, title='Senior Python Developer (round trip)')
+        stored = json.loads(json.dumps(jobs_with_features([job]), default=job_json_default))
+        self.assertIsInstance(stored[0][FEATURES_KEY], dict)
+        self.assertNotIn(FEATURES_KEY, job)
+
+        loaded = restore_job_features(stored[0])
+        self.assertNotIn(FEATURES_KEY, loaded)
+        self.assertEqual(get_job_features(loaded), get_job_features(job))
+
+    def test_stale_stored_features_not_restored(self):
+        job = dict(JOB, title='Data Engineer (stale)')
+        stored = jobs_with_features([dict(job, description='Legacy Cobol')])[0]
+        stored['description'] = job['description']
+        with mock.patch('utils.job_features.JobFeatures.from_job', wraps=JobFeatures.from_job) as build:
+            features = get_job_features(restore_job_features(stored))
+        self.assertEqual(build.call_count, 1)
+        self.assertIn('Django', features.skills)
+
+    def test_missing_fields(self):
+        features = JobFeatures.from_job({'title': None, 'description': None})
+        self.assertEqual((features.title, features.skills), ('', []))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from utils.llm_cache import CachedResponse, LLMResponseCache, hash_job
+from utils.structured_output import TailoredCVOutput, parse_structured
+
+
+class FakeAgent:
+    def __init__(self, model_id='gemini-2.5-flash'):
+        self.model = SimpleNamespace(id=model_id)
+        self.calls = 0
+
+    def run(self, prompt, stream=False):
+        self.calls += 1
+        content = f"response {self.calls} to {prompt}"
+        if stream:
+            return iter([SimpleNamespace(content=content[:5]), SimpleNamespace(content=None),
+                         SimpleNamespace(content=content[5:])])
+        return SimpleNamespace(content=content)
+
+
+class LLMResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = LLMResponseCache(db_path=os.path.join(self.tmpdir.name, 'llm_cache.db'))
+        self.agent = FakeAgent()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_hit_skips_agent(self):
+        first = self.cache.run(self.agent, 'prompt', 'tailored_cv', cv='a', job='b', template='MODERN')
+        second = self.cache.run(self.agent, 'prompt', 'tailored_cv', cv='a', job='b', template='MODERN')
+        self.assertEqual(self.agent.calls, 1)
+        self.assertIsInstance(second, CachedResponse)
+        self.assertEqual(second.content, first.content)
+
+    def test_key_covers_inputs_and_model(self):
+        self.cache.run(self.agent, 'prompt', 'tailored_cv', cv='a', job='b', template='MODERN')
+        self.cache.run(self.agent, 'prompt', 'tailored_cv', cv='a', job='b', template='ACADEMIC')
+        self.cache.run(FakeAgent('gemini-2.5-pro'), 'prompt', 'tailored_cv', cv='a', job='b', template='MODERN')
+        self.cache.run(self.agent, 'prompt', 'cover_letter', cv='a', job='b', template='MODERN')
+        self.assertEqual(self.agent.calls, 3)
+
+    def test_regenerate_bypasses_and_replaces(self):
+        self.cache.run(self.agent, 'prompt', 'interview_prep', job='b')
+        fresh = self.cache.run(self.agent, 'prompt', 'interview_prep', regenerate=True, job='b')
+        self.assertEqual(self.agent.calls, 2)
+        self.assertEqual(self.cache.run(self.agent, 'prompt', 'interview_prep', job='b').content, fresh.content)
+
+    def test_streamed_response_is_cached(self):
+        chunks = []
+        streamed = self.cache.run(self.agent, 'prompt', 'tailored_cv', on_delta=chunks.append, cv='a')
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(''.join(chunks), streamed.content)
+        replay = []
+        cached = self.cache.run(self.agent, 'prompt', 'tailored_cv', on_delta=replay.append, cv='a')
+        self.assertEqual(self.agent.calls, 1)
+        self.assertEqual(replay, [streamed.content])
+        self.assertTrue(cached.cached)
+
+    def test_invalid_response_not_cached(self):
+        replies = iter(['not json at all', '{"cv_content": "# Ada Lovelace\\nAnalyst", "ats_score": 80}'])
+        agent = FakeAgent()
+        agent.run = lambda prompt, stream=False: SimpleNamespace(content=next(replies))
+        valid = lambda response: parse_structured(response, TailoredCVOutput) is not None
+
+        first = self.cache.run(agent, 'prompt', 'tailored_cv', validate=valid, cv='a')
+        self.assertEqual(first.content, 'not json at all')
+        second = self.cache.run(agent, 'prompt', 'tailored_cv', validate=valid, cv='a')
+        self.assertTrue(valid(second))
+        cached = self.cache.run(agent, 'prompt', 'tailored_cv', validate=valid, cv='a')
+        self.assertTrue(cached.cached)
+        self.assertEqual(cached.content, second.content)
+
+    def test_cached_response_failing_validation_is_regenerated(self):
+        self.cache.run(self.agent, 'prompt', 'tailored_cv', cv='a')
+        fresh = self.cache.run(self.agent, 'prompt', 'tailored_cv', validate=lambda r: '2' in r.content, cv='a')
+        self.assertEqual(self.agent.calls, 2)
+        self.assertFalse(getattr(fresh, 'cached', False))
+        self.assertEqual(self.cache.run(self.agent, 'prompt', 'tailored_cv', cv='a').content, fresh.content)
+
+    def test_disabled(self):
+        cache = LLMResponseCache(db_path=os.path.join(self.tmpdir.name, 'off.db'), enabled=False)
+        cache.run(self.agent, 'prompt', 'interview_prep', job='b')
+        cache.run(self.agent, 'prompt', 'interview_prep', job='b')
+        self.assertEqual(self.agent.calls, 2)
+
+    def test_job_hash_ignores_volatile_fields(self):
+        job = {'title': 'Data Analyst', 'company': 'Acme', 'description': 'SQL  and Python'}
+        self.assertEqual(hash_job(job), hash_job(dict(job, relevance_score=0.9, description='sql and python')))
+        self.assertNotEqual(hash_job(job), hash_job(dict(job, company='Other')))
+
+
+if __name__ == '__main__':
+    unittest.main()
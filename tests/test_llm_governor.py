@@ -0,0 +1,112 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from utils.llm_governor import GovernorTimeout, LLMGovernor, current_priority, llm_priority, retry_after_secs
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class LLMGovernorTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, 'governor.db')
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def governor(self, **kwargs):
+        return LLMGovernor(db_path=self.db_path, clock=self.clock, sleep=self.clock.sleep, **kwargs)
+
+    def test_in_flight_cap_and_timeout(self):
+        governor = self.governor(max_in_flight=1, timeout=2)
+        lease = governor.acquire()
+        with self.assertRaises(GovernorTimeout):
+            governor.acquire()
+        governor.release(lease)
+        governor.release(governor.acquire())
+        self.assertEqual(governor.stats()['in_flight'], 0)
+        self.assertEqual(governor.stats()['waiting'], {})
+
+    def test_rpm_waits_for_window(self):
+        governor = self.governor(rpm=2, timeout=120)
+        for _ in range(2):
+            governor.release(governor.acquire())
+        started = self.clock.now
+        governor.release(governor.acquire())
+        self.assertGreaterEqual(self.clock.now - started, 59)
+
+    def test_tpm_budget(self):
+        governor = self.governor(tpm=1000, timeout=5)
+        governor.release(governor.acquire(tokens=800))
+        with self.assertRaises(GovernorTimeout):
+            governor.acquire(tokens=300)
+        # A call larger than the budget still runs once the window is empty
+        self.clock.now += 61
+        governor.release(governor.acquire(tokens=5000))
+
+    def test_budget_shared_between_instances(self):
+        # Two workers on the same file share the in-flight cap
+        worker_a = self.governor(max_in_flight=1, timeout=1)
+        worker_b = self.governor(max_in_flight=1, timeout=1)
+        lease = worker_a.acquire()
+        with self.assertRaises(GovernorTimeout):
+            worker_b.acquire()
+        worker_a.release(lease)
+
+    def test_throttle_pauses_admission(self):
+        governor = self.governor(timeout=60)
+        governor.throttle(10)
+        started = self.clock.now
+        governor.release(governor.acquire())
+        self.assertGreaterEqual(self.clock.now - started, 10)
+
+    def test_priority_order(self):
+        governor = LLMGovernor(db_path=self.db_path, max_in_flight=1, poll_interval=0.01, timeout=10)
+        held = governor.acquire()
+        order = []
+
+        def call(priority):
+            with governor.slot(priority=priority):
+                order.append(priority)
+
+        background = threading.Thread(target=call, args=('background',))
+        background.start()
+        time.sleep(0.1)
+        interactive = threading.Thread(target=call, args=('interactive',))
+        interactive.start()
+        time.sleep(0.1)
+        governor.release(held)
+        background.join()
+        interactive.join()
+        self.assertEqual(order, ['interactive', 'background'])
+
+    def test_priority_context(self):
+        self.assertEqual(current_priority(), 'background')
+        with llm_priority('interactive'):
+            self.assertEqual(current_priority(), 'interactive')
+        self.assertEqual(current_priority(), 'background')
+        with self.assertRaises(ValueError):
+            with llm_priority('urgent'):
+                pass
+
+    def test_retry_after(self):
+        self.assertEqual(retry_after_secs(Exception("429 ... 'retryDelay': '23s'"), 5), 23)
+        self.assertEqual(retry_after_secs(Exception("Please retry in 7.5s"), 5), 7.5)
+        self.assertEqual(retry_after_secs(Exception("429 RESOURCE_EXHAUSTED"), 5), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
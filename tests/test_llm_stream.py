@@ -0,0 +1,37 @@
+import json
+import unittest
+
+from utils.llm_stream import JSONFieldStream, sse_event
+
+
+class JSONFieldStreamTest(unittest.TestCase):
+    def feed_all(self, stream, text, size):
+        return ''.join(stream.feed(text[i:i + size]) for i in range(0, len(text), size))
+
+    def test_decodes_field_across_chunk_boundaries(self):
+        value = '# Jane Doe\n\n**Skills:** Python, "SQL" \\ café ✓'
+        response = '```json\n' + json.dumps({'cv_content': value, 'ats_score': 90}, ensure_ascii=True) + '\n```'
+        for size in (1, 2, 3, 7, 50):
+            stream = JSONFieldStream('cv_content')
+            self.assertEqual(self.feed_all(stream, response, size), value)
+            self.assertTrue(stream.done)
+            self.assertEqual(stream.text, value)
+
+    def test_stops_at_end_of_field(self):
+        stream = JSONFieldStream('cv_content')
+        self.assertEqual(stream.feed('{"cv_content": "abc", "summary": "xyz"}'), 'abc')
+        self.assertEqual(stream.feed(' more'), '')
+
+    def test_plain_text_passes_through(self):
+        stream = JSONFieldStream('cv_content')
+        self.assertEqual(stream.feed('# Jane'), '# Jane')
+        self.assertEqual(stream.feed(' Doe'), ' Doe')
+        self.assertEqual(stream.text, '# Jane Doe')
+
+    def test_sse_event(self):
+        self.assertEqual(sse_event('done', {'preview_token': 'abc'}),
+                         'event: done\ndata: {"preview_token": "abc"}\n\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
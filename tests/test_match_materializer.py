@@ -0,0 +1,91 @@
+import time
+import unittest
+
+from utils.match_materializer import MatchMaterializer, normalize_location
+
+
+def score(job, profile_data):
+    skills = {s.lower() for s in profile_data.get('skills', [])}
+    return {'job': job, 'match_score': sum(10 for s in job.get('skills', []) if s.lower() in skills)}
+
+
+class MatchMaterializerTest(unittest.TestCase):
+    def setUp(self):
+        self.profiles = {'alice': {'skills': ['Python', 'SQL']}, 'bob': {'skills': ['Excel']}}
+        self.written = []
+        self.materializer = MatchMaterializer(
+            score_fn=score,
+            profile_provider=self.profiles.get,
+            writer=lambda user_id, location, matches: self.written.append((user_id, location, matches)),
+            max_matches=2
+        )
+
+    def jobs(self, *specs):
+        return [{'id': job_id, 'skills': skills} for job_id, skills in specs]
+
+    def test_notify_rescores_and_writes(self):
+        self.materializer.subscribe('alice', 'Cape Town ')
+        self.materializer.start()
+        self.materializer.notify('python', 'cape town', self.jobs(('j1', ['Python']), ('j2', ['Python', 'SQL'])))
+        self.materializer._queue.join()
+
+        self.assertEqual(len(self.written), 1)
+        user_id, location, matches = self.written[0]
+        self.assertEqual(user_id, 'alice')
+        self.assertEqual([m['job']['id'] for m in matches], ['j2', 'j1'])
+        self.assertEqual(self.materializer.get('alice', 'CAPE TOWN'), matches)
+
+    def test_notify_skips_users_who_scored_the_jobs(self):
+        for user_id in ('alice', 'bob'):
+            self.materializer.subscribe(user_id, 'Durban')
+        self.materializer.notify('python', 'Durban', self.jobs(('j1', ['Python'])), skip_users={'alice', 'bob'})
+        self.assertTrue(self.materializer._queue.empty())
+
+        self.materializer.start()
+        self.materializer.notify('python', 'Durban', self.jobs(('j1', ['Python'])), skip_users={'alice'})
+        self.materializer._queue.join()
+        self.assertEqual([user_id for user_id, _, _ in self.written], ['bob'])
+        self.assertIsNone(self.materializer.get('alice', 'Durban'))
+
+    def test_notify_without_subscribers_queues_nothing(self):
+        self.materializer.notify('python', 'Durban', self.jobs(('j1', ['Python'])))
+        self.assertTrue(self.materializer._queue.empty())
+
+    def test_merge_keeps_best_per_job(self):
+        self.materializer.subscribe('alice', 'Durban')
+        self.materializer.materialize('Durban', self.jobs(('j1', ['Python']), ('j2', [])))
+        self.materializer.materialize('Durban', self.jobs(('j1', ['Python', 'SQL']), ('j3', ['SQL'])))
+        matches = self.materializer.get('alice', 'Durban')
+        self.assertEqual([(m['job']['id'], m['match_score']) for m in matches], [('j1', 20), ('j3', 10)])
+
+    def test_users_without_profile_are_skipped(self):
+        self.materializer.subscribe('carol', 'Durban')
+        self.assertEqual(self.materializer.materialize('Durban', self.jobs(('j1', ['Python']))), 0)
+        self.assertEqual(self.written, [])
+
+    def test_unsubscribe_drops_subscriptions_and_results(self):
+        for user_id in ('alice', 'bob'):
+            self.materializer.subscribe(user_id, 'Durban')
+            self.materializer.subscribe(user_id, 'Pretoria')
+        self.materializer.materialize('Durban', self.jobs(('j1', ['Python'])))
+        self.materializer.unsubscribe_user('alice')
+
+        self.assertEqual(self.materializer.subscribers('Durban'), ['bob'])
+        self.assertEqual(self.materializer.subscribers('Pretoria'), ['bob'])
+        self.assertIsNone(self.materializer.get('alice', 'Durban'))
+        self.assertIsNotNone(self.materializer.get('bob', 'Durban'))
+
+    def test_results_expire(self):
+        self.materializer.result_ttl_secs = 0
+        self.materializer.subscribe('alice', 'Durban')
+        self.materializer.materialize('Durban', self.jobs(('j1', ['Python'])))
+        time.sleep(0.01)
+        self.assertIsNone(self.materializer.get('alice', 'Durban'))
+
+    def test_normalize_location(self):
+        self.assertEqual(normalize_location('  Cape   Town '), 'cape town')
+        self.assertEqual(normalize_location(None), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+from utils.matching import score_job_match, score_matrix
+
+
+JOBS = [
+    {'title': 'Senior Python Developer', 'description': 'Django, SQL and AWS', 'company': 'Acme'},
+    {'title': 'Junior Data Analyst', 'description': 'Entry level role using Excel', 'company': 'Beta'},
+    {'title': 'Designer', 'description': None, 'company': 'Gamma'},
+]
+
+PROFILES = [
+    {'skills': ['Python', 'SQL', 'python'], 'experience_level': 'Senior'},
+    {'skills': ['Data Analysis', 'Excel'], 'experience_level': 'Junior'},
+    {'skills': [], 'experience_level': ''},
+]
+
+
+class ScoreMatrixTest(unittest.TestCase):
+    def test_matches_pairwise_scores(self):
+        matrix = score_matrix(JOBS, PROFILES)
+        self.assertEqual(matrix.shape, (3, 3))
+        for j, job in enumerate(JOBS):
+            for p, profile in enumerate(PROFILES):
+                expected = score_job_match(job, {'profile_data': profile})['score']
+                self.assertEqual(int(matrix[j, p]), expected)
+
+    def test_score_is_capped(self):
+        profile = {'skills': ['python'] * 10, 'experience_level': 'senior'}
+        self.assertEqual(int(score_matrix(JOBS[:1], [profile])[0, 0]), 100)
+
+    def test_empty_inputs(self):
+        self.assertEqual(score_matrix([], PROFILES).shape, (0, 3))
+        self.assertEqual(score_matrix(JOBS, []).shape, (3, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from utils.llm_governor import LLMGovernor
+from utils.model_router import (
+    FakeClock, FakeProvider, ModelRouter, ModelUnavailableError, RoutedAgent, is_capacity_error
+)
+
+TIERS = {'standard': ['primary', 'secondary'], 'fast': ['lite', 'primary']}
+CLASSES = {'tailoring': 'standard', 'description': 'fast'}
+
+
+class ModelRouterTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.provider = FakeProvider({'primary': 2.0, 'secondary': 0.5, 'lite': 0.2}, clock=self.clock)
+        self.router = ModelRouter(TIERS, CLASSES, provider=self.provider, failure_threshold=2,
+                                  cooldown=10, max_cooldown=30, clock=self.clock)
+
+    def test_routes_to_fastest_measured_model(self):
+        # Unmeasured models are tried in tier order until both have samples
+        self.router.generate('tailoring', 'a')
+        self.router.generate('tailoring', 'b')
+        self.assertEqual(self.provider.calls, ['primary', 'secondary'])
+        self.assertEqual(self.router.generate('tailoring', 'c'), '[secondary] c')
+        self.assertEqual(self.router.candidates('tailoring'), ['secondary', 'primary'])
+
+    def test_falls_over_and_opens_circuit_on_capacity_errors(self):
+        self.provider.fail('primary', Exception('429 RESOURCE_EXHAUSTED'), times=2)
+        self.assertEqual(self.router.generate('tailoring', 'a'), '[secondary] a')
+        self.assertEqual(self.router.stats()['primary']['state'], 'closed')
+        # The failing model is only tried after healthy ones
+        self.assertEqual(self.router.candidates('tailoring'), ['secondary', 'primary'])
+
+        self.provider.fail('secondary', Exception('503 UNAVAILABLE'))
+        with self.assertRaises(ModelUnavailableError):
+            self.router.generate('tailoring', 'b')
+        self.assertEqual(self.router.stats()['primary']['state'], 'open')
+        self.assertEqual(self.router.candidates('tailoring'), ['secondary'])
+
+    def test_half_open_trial_reopens_with_longer_cooldown(self):
+        self.router = ModelRouter({'standard': ['primary']}, CLASSES, provider=self.provider,
+                                  failure_threshold=2, cooldown=10, max_cooldown=30, clock=self.clock)
+
+        def call_primary():
+            self.router.generate('tailoring', 'x')
+
+        self.provider.fail('primary', Exception('429'), times=3)
+        for _ in range(2):
+            with self.assertRaises(ModelUnavailableError):
+                call_primary()
+        self.assertEqual(self.router.stats()['primary']['state'], 'open')
+
+        self.clock.advance(11)
+        self.assertEqual(self.router.stats()['primary']['state'], 'half_open')
+        with self.assertRaises(ModelUnavailableError):
+            call_primary()
+        self.assertEqual(self.router.stats()['primary']['state'], 'open')
+        self.assertEqual(self.router._health['primary'].cooldown, 20)
+
+        self.clock.advance(21)
+        call_primary()
+        self.assertEqual(self.router.stats()['primary']['state'], 'closed')
+        self.assertEqual(self.router._health['primary'].cooldown, 10)
+
+    def test_other_errors_fall_over_without_opening_circuit(self):
+        self.provider.fail('primary', ValueError('bad request'), times=5)
+        for _ in range(5):
+            self.router.generate('tailoring', 'x')
+        stats = self.router.stats()['primary']
+        self.assertEqual(stats['state'], 'closed')
+        self.assertGreater(stats['error_rate'], 0)
+
+    def test_raises_when_every_model_fails(self):
+        self.provider.fail('lite', Exception('503'))
+        self.provider.fail('primary', Exception('503'))
+        with self.assertRaises(ModelUnavailableError):
+            self.router.generate('description', 'x')
+
+    def test_capacity_error_detection(self):
+        self.assertTrue(is_capacity_error(SimpleNamespace(code=429)))
+        self.assertTrue(is_capacity_error(Exception('Model is overloaded')))
+        self.assertFalse(is_capacity_error(ValueError('invalid JSON')))
+
+    def test_capacity_error_pauses_governor(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            governor = LLMGovernor(db_path=os.path.join(tmpdir, 'governor.db'))
+            self.router.governor = governor
+            self.provider.fail('primary', Exception("429 'retryDelay': '12s'"))
+            self.assertEqual(self.router.generate('tailoring', 'a'), '[secondary] a')
+            stats = governor.stats()
+            self.assertGreater(stats['paused_for'], 10)
+            self.assertEqual(stats['requests_last_minute'], 1)
+            self.assertEqual(stats['in_flight'], 0)
+
+
+class RoutedAgentTest(unittest.TestCase):
+    def test_runs_on_variant_and_keeps_primary_model_id(self):
+        router = ModelRouter(TIERS, CLASSES, clock=FakeClock())
+        used = []
+
+        def variant(agent, model_id):
+            def run(prompt, stream=False):
+                used.append(model_id)
+                if model_id == 'primary':
+                    raise Exception('429')
+                return iter(['a', 'b']) if stream else SimpleNamespace(content=prompt)
+            return SimpleNamespace(run=run)
+
+        agent = RoutedAgent(SimpleNamespace(name='writer'), 'tailoring', router, variant)
+        self.assertEqual(agent.model.id, 'primary')
+        self.assertEqual(agent.run('hi').content, 'hi')
+        self.assertEqual(list(agent.run('hi', stream=True)), ['a', 'b'])
+        self.assertEqual(used, ['primary', 'secondary', 'secondary'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime
+
+from utils.preview_store import PreviewStore
+
+JOB = {'title': 'Data Analyst', 'company': 'Acme', 'description': 'SQL and Python'}
+CV_VERSION = {
+    'cv_content': '# Ada Lovelace\nAnalyst',
+    'ats_score': 81,
+    'created_at': datetime(2025, 1, 1, 9, 30),
+    'sections': {'summary': 'Analyst', 'experience': ['Acme']},
+}
+
+
+class PreviewStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, 'previews.db')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def store(self, **kwargs):
+        return PreviewStore(db_path=self.db_path, **kwargs)
+
+    def save(self, store, user_id='user-a'):
+        return store.save(user_id, JOB, 'modern', 'Acme_Data_Analyst_1', CV_VERSION, 'Dear hiring manager')
+
+    def test_round_trip(self):
+        store = self.store()
+        preview = store.get(self.save(store), 'user-a')
+        self.assertEqual(preview['job'], JOB)
+        self.assertEqual(preview['template'], 'modern')
+        self.assertEqual(preview['version_id'], 'Acme_Data_Analyst_1')
+        self.assertEqual(preview['cv_version'], CV_VERSION)
+        self.assertEqual(preview['cover_letter_markdown'], 'Dear hiring manager')
+
+    def test_shared_between_workers(self):
+        # The preview request and the apply-job request land on different workers
+        token = self.save(self.store())
+        preview = self.store().get(token, 'user-a')
+        self.assertIsNotNone(preview)
+        self.assertEqual(preview['cv_version']['created_at'], CV_VERSION['created_at'])
+
+    def test_other_user_and_unknown_token(self):
+        store = self.store()
+        token = self.save(store)
+        self.assertIsNone(store.get(token, 'user-b'))
+        self.assertIsNone(store.get('missing', 'user-a'))
+        self.assertIsNone(store.get(None, 'user-a'))
+        # A lookup by the wrong user does not consume the preview
+        self.assertIsNotNone(store.get(token, 'user-a'))
+
+    def test_token_kept_until_apply_succeeds(self):
+        worker_a, worker_b = self.store(), self.store()
+        token = self.save(worker_a)
+        # First apply fails (render or upload error): the token still works
+        self.assertIsNotNone(worker_b.get(token, 'user-a'))
+        self.assertIsNotNone(worker_a.get(token, 'user-a'))
+        # Retry succeeds and drops the preview for every worker
+        self.assertTrue(worker_b.discard(token))
+        self.assertIsNone(worker_a.get(token, 'user-a'))
+        self.assertFalse(worker_a.discard(token))
+        self.assertFalse(worker_a.discard(None))
+
+    def test_expiry(self):
+        store = self.store(ttl=0.01)
+        token = self.save(store)
+        time.sleep(0.02)
+        self.assertIsNone(store.get(token, 'user-a'))
+
+    def test_unreadable_entry_discarded(self):
+        store = self.store()
+        token = self.save(store)
+        entry = store._cache.get(token)
+        store._cache.set(token, dict(entry, cv_version='not packed'), user_id='user-a')
+        self.assertIsNone(store.get(token, 'user-a'))
+        self.assertIsNone(store._cache.get(token))
+
+
+if __name__ == '__main__':
+    unittest.main()
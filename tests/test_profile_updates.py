@@ -0,0 +1,117 @@
+import os
+import tempfile
+import unittest
+
+from utils.cache import SQLiteCacheBackend, TTLCache
+from utils.profile_updates import (
+    ProfileRevisions, affected_results, apply_profile_diff, diff_profile, structured_profile_from_doc
+)
+
+
+class ProfileDiffTest(unittest.TestCase):
+    def setUp(self):
+        self.profile = {
+            'name': 'Jane Doe',
+            'skills': ['Python', 'SQL'],
+            'experience_level': 'Junior',
+            'education': 'BSc Computer Science',
+            'strengths': ['Teamwork'],
+            'career_goals': 'Backend developer',
+        }
+
+    def test_unchanged_fields_are_ignored(self):
+        changed = diff_profile(self.profile, {
+            'skills': ['sql ', 'python'],
+            'experience_level': 'Junior',
+            'career_goals': 'Backend developer',
+        })
+        self.assertEqual(changed, {})
+        self.assertEqual(affected_results(changed), set())
+
+    def test_dependencies_per_field(self):
+        self.assertEqual(affected_results(diff_profile(self.profile, {'career_goals': 'Data engineer'})), {'queries'})
+        self.assertEqual(affected_results(diff_profile(self.profile, {'skills': ['Python', 'Go']})), {'matches', 'queries'})
+        self.assertEqual(affected_results(diff_profile(self.profile, {'notification_threshold': 80})), set())
+        self.assertEqual(affected_results(diff_profile(self.profile, {'strengths': ['Mentoring']})), set())
+
+    def test_applies_in_place(self):
+        engine_profile = self.profile
+        changed = diff_profile(self.profile, {'skills': ['Python', 'Go'], 'notification_enabled': True})
+        self.assertTrue(apply_profile_diff(self.profile, changed))
+        self.assertIs(engine_profile, self.profile)
+        self.assertEqual(engine_profile['skills'], ['Python', 'Go'])
+        # Notification settings are not part of the parsed profile
+        self.assertNotIn('notification_enabled', engine_profile)
+        self.assertEqual(engine_profile['name'], 'Jane Doe')
+
+    def test_non_dict_profile_left_alone(self):
+        self.assertFalse(apply_profile_diff('raw profile text', {'skills': ['Go']}))
+
+
+class StructuredProfileTest(unittest.TestCase):
+    DOC = {
+        '$id': 'doc-1',
+        'skills': '["Python", "SQL"]',
+        'experience_level': 'Junior',
+        'education': None,
+        'strengths': '',
+        'career_goals': 'Backend developer',
+        'notification_threshold': None,
+    }
+
+    def test_fields_decoded(self):
+        self.assertEqual(structured_profile_from_doc(self.DOC), {
+            'skills': ['Python', 'SQL'],
+            'experience_level': 'Junior',
+            'education': '',
+            'strengths': [],
+            'career_goals': 'Backend developer',
+            'notification_enabled': False,
+            'notification_threshold': 70,
+        })
+
+    def test_diff_against_document(self):
+        # A PUT that only changes career goals reports only that field
+        updates = dict(structured_profile_from_doc(self.DOC), career_goals='Data engineer')
+        changed = diff_profile(structured_profile_from_doc(self.DOC), updates)
+        self.assertEqual(changed, {'career_goals': 'Data engineer'})
+        self.assertEqual(affected_results(changed), {'queries'})
+
+
+class ProfileRevisionsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        db_path = os.path.join(self.tmpdir.name, 'cache.db')
+        # Two workers, each with its own backend instance on the shared file
+        self.worker_a, self.worker_b = (
+            ProfileRevisions(TTLCache('profile_revisions', maxsize=10, ttl=60, backend=SQLiteCacheBackend(db_path)))
+            for _ in range(2)
+        )
+
+    def test_edit_reaches_other_worker_once(self):
+        self.worker_a.publish('user-a', {'skills': ['Go']})
+        self.assertIsNone(self.worker_a.pull('user-a'))
+        self.assertEqual(self.worker_b.pull('user-a'), {'skills': ['Go']})
+        self.assertIsNone(self.worker_b.pull('user-a'))
+        self.assertIsNone(self.worker_b.pull('user-b'))
+
+        self.worker_b.publish('user-a', {'skills': ['Rust']})
+        self.assertEqual(self.worker_a.pull('user-a'), {'skills': ['Rust']})
+
+    def test_reload_and_clear(self):
+        self.worker_a.publish('user-a', {'skills': ['Go']})
+        self.assertIsNotNone(self.worker_b.pull('user-a'))
+        # Worker B rebuilt the profile from the CV: the edit applies again
+        self.worker_b.reload('user-a')
+        self.assertEqual(self.worker_b.pull('user-a'), {'skills': ['Go']})
+        # A new CV drops the edit for every worker
+        self.worker_a.publish('user-a', {'skills': ['Rust']})
+        self.worker_b.clear('user-a')
+        self.assertIsNone(self.worker_a.pull('user-a'))
+        self.worker_a.reload('user-a')
+        self.assertIsNone(self.worker_a.pull('user-a'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+from utils.prompt_builder import (
+    PromptBuilder, estimate_tokens, format_job, format_profile, truncate_to_tokens
+)
+
+
+class PromptBuilderTest(unittest.TestCase):
+    def test_format_job_drops_enrichment_and_repeats(self):
+        job = {
+            'title': 'Data Analyst',
+            'company': 'Acme',
+            'description': 'Build dashboards.\nWork with SQL.\n\n\nBuild dashboards.',
+            'salary_info': {'salary_min': 1000},
+            'processed_at': '2024-01-01T00:00:00',
+            'relevance_score': 0.8,
+        }
+        text = format_job(job)
+        self.assertIn('Title: Data Analyst', text)
+        self.assertEqual(text.count('Build dashboards.'), 1)
+        self.assertNotIn('salary', text)
+        self.assertNotIn('processed_at', text)
+
+    def test_format_profile_skips_skills_in_cv(self):
+        profile = {'name': 'Jane', 'skills': ['Python', 'Tableau'], 'career_goals': 'Analyst role'}
+        text = format_profile(profile, cv_text='Skills: Python, SQL')
+        self.assertIn('Skills: Tableau', text)
+        self.assertNotIn('Python', text)
+        self.assertNotIn('Jane', text)
+
+    def test_format_profile_matches_whole_skills(self):
+        profile = {'skills': ['R', 'Go', 'C', 'C++', 'SQL']}
+        text = format_profile(profile, cv_text='Reporting in Google Sheets with C++ and SQL.')
+        self.assertIn('Skills: R, Go, C', text)
+        self.assertNotIn('C++', text)
+        self.assertNotIn('SQL', text)
+        self.assertNotIn('R', format_profile({'skills': ['R']}, cv_text='Skills: R, Python'))
+
+    def test_truncate_respects_budget(self):
+        text = '\n'.join(f"Line {i} with some words in it." for i in range(500))
+        cut = truncate_to_tokens(text, 200)
+        self.assertLessEqual(estimate_tokens(cut), 200)
+        self.assertTrue(cut.endswith('…'))
+        self.assertEqual(truncate_to_tokens('short', 200), 'short')
+
+    def test_build_reports_section_sizes(self):
+        prompt = (PromptBuilder('test')
+                  .add('Master CV', 'word ' * 1000, 100)
+                  .add('Job Posting', 'Title: Analyst', 100)
+                  .add('Empty', '   ')
+                  .instructions("""
+            Do the thing.
+                Indented detail.
+            """)
+                  .build())
+        self.assertEqual(prompt.truncated, ['Master CV'])
+        self.assertEqual(set(prompt.section_tokens), {'Master CV', 'Job Posting', 'instructions'})
+        self.assertLessEqual(prompt.section_tokens['Master CV'], 100)
+        self.assertIn('Job Posting: Title: Analyst', prompt.text)
+        self.assertTrue(prompt.text.endswith('Do the thing.\n    Indented detail.'))
+        self.assertEqual(prompt.tokens, estimate_tokens(prompt.text))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import time
+import unittest
+
+from utils.query_planner import plan_queries, run_queries, FALLBACK_QUERY
+
+
+class PlanQueriesTest(unittest.TestCase):
+    def test_title_phrase_ranked_first(self):
+        profile = {
+            'career_goals': 'Aspiring Data Analyst and future software engineer',
+            'skills': ['Python', 'React'],
+            'experience_level': 'Junior'
+        }
+        queries = plan_queries(profile)
+        self.assertEqual(queries[0], 'software engineer')
+        self.assertIn('Junior Web Developer', queries)
+        self.assertEqual(len(queries), 3)
+
+    def test_fallback(self):
+        self.assertEqual(plan_queries({}), [FALLBACK_QUERY])
+
+
+class RunQueriesTest(unittest.TestCase):
+    def test_merges_and_dedupes_in_rank_order(self):
+        results = {'a': [{'job_hash': '1'}, {'job_hash': '2'}], 'b': [{'job_hash': '2'}, {'job_hash': '3'}]}
+        jobs = run_queries(lambda q: results[q], ['a', 'b'])
+        self.assertEqual([j['job_hash'] for j in jobs], ['1', '2', '3'])
+
+    def test_deadline_skips_slow_queries(self):
+        def search(q):
+            time.sleep(1 if q == 'slow' else 0.01)
+            return [{'job_hash': q}]
+        started = time.time()
+        jobs = run_queries(search, ['fast', 'slow'], deadline_secs=0.2)
+        self.assertLess(time.time() - started, 0.9)
+        self.assertEqual([j['job_hash'] for j in jobs], ['fast'])
+
+    def test_failed_query_is_ignored(self):
+        def search(q):
+            if q == 'bad':
+                raise RuntimeError('blocked')
+            return [{'job_hash': q}]
+        self.assertEqual(len(run_queries(search, ['bad', 'ok'])), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import contextvars
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.stage_runner import StageRunner
+
+request_priority = contextvars.ContextVar('request_priority', default='background')
+
+
+class StageRunnerTest(unittest.TestCase):
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(self.executor.shutdown)
+        self.calls = []
+
+    def stage(self, name, seconds=0.0, value=None):
+        def run(*args):
+            self.calls.append((name, threading.current_thread().name))
+            time.sleep(seconds)
+            return value if value is not None else name
+        return run
+
+    def application(self, stages):
+        """The stage layout of generate_application_package"""
+        stages.start('cover_letter', stages.timed, 'cover_letter', self.stage('cover_letter', 0.2))
+        stages.start('interview_prep', stages.timed, 'interview_prep', self.stage('interview_prep', 0.2))
+        cv = stages.timed('tailored_cv', self.stage('tailored_cv', 0.2))
+        letter = stages.result('cover_letter', stages.timed, 'cover_letter', self.stage('cover_letter', 0.2), cv)
+        prep = stages.result('interview_prep', stages.timed, 'interview_prep', self.stage('interview_prep', 0.2))
+        return (cv, letter, prep), stages.finish()
+
+    def test_concurrent_stages_overlap(self):
+        results, timings = self.application(StageRunner(self.executor))
+        self.assertEqual(results, ('tailored_cv', 'cover_letter', 'interview_prep'))
+        self.assertEqual(sorted(name for name, _ in self.calls), ['cover_letter', 'interview_prep', 'tailored_cv'])
+        self.assertLess(timings['total'], 0.5)
+        self.assertNotEqual(dict(self.calls)['cover_letter'], threading.current_thread().name)
+
+    def test_sequential_stages_run_inline_in_order(self):
+        stages = StageRunner(None)
+        self.assertFalse(stages.concurrent)
+        results, timings = self.application(stages)
+        self.assertEqual(results, ('tailored_cv', 'cover_letter', 'interview_prep'))
+        self.assertEqual([name for name, _ in self.calls], ['tailored_cv', 'cover_letter', 'interview_prep'])
+        self.assertTrue(all(thread == threading.current_thread().name for _, thread in self.calls))
+        self.assertGreaterEqual(timings['total'], 0.6)
+
+    def test_timings_payload(self):
+        for executor in (self.executor, None):
+            with self.subTest(concurrent=executor is not None):
+                _, timings = self.application(StageRunner(executor))
+                self.assertEqual(set(timings), {'tailored_cv', 'cover_letter', 'interview_prep', 'total'})
+                for stage in ('tailored_cv', 'cover_letter', 'interview_prep'):
+                    self.assertGreaterEqual(timings[stage], 0.19)
+                    self.assertLessEqual(timings[stage], timings['total'])
+
+    def test_background_stage_keeps_caller_context(self):
+        stages = StageRunner(self.executor)
+        token = request_priority.set('apply')
+        try:
+            stages.start('priority', request_priority.get)
+        finally:
+            request_priority.reset(token)
+        self.assertEqual(stages.result('priority', request_priority.get), 'apply')
+
+    def test_result_errors_propagate(self):
+        def boom():
+            raise ValueError('render failed')
+
+        stages = StageRunner(self.executor)
+        stages.start('cover_letter', boom)
+        with self.assertRaises(ValueError):
+            stages.result('cover_letter', boom)
+
+    def test_cancel_after_failure_stops_background_stages(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+        running = threading.Event()
+        written = []
+
+        def write_pdf(name, seconds):
+            running.set()
+            time.sleep(seconds)
+            written.append(name)
+
+        stages = StageRunner(executor)
+        stages.start('cover_letter', write_pdf, 'cover_letter.pdf', 0.2)
+        stages.start('interview_prep', write_pdf, 'interview_prep.pdf', 0)
+        self.assertTrue(running.wait(5))
+        # CV tailoring fails while the cover letter is still being written
+        self.assertEqual(stages.cancel(), 1)
+        # The running stage finished before cancel() returned; the queued one never ran
+        self.assertEqual(written, ['cover_letter.pdf'])
+        time.sleep(0.05)
+        self.assertEqual(written, ['cover_letter.pdf'])
+        self.assertEqual(stages.cancel(), 0)
+
+    def test_cancel_swallows_stage_errors(self):
+        def boom():
+            raise RuntimeError('upload failed')
+
+        stages = StageRunner(self.executor)
+        stages.start('upload', boom)
+        with self.assertLogs('utils.stage_runner', level='WARNING'):
+            stages.cancel()
+
+
+if __name__ == '__main__':
+    unittest.main()
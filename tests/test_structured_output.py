@@ -0,0 +1,58 @@
+import json
+import unittest
+from types import SimpleNamespace
+
+from utils.structured_output import (
+    ProfileOutput, TailoredCVOutput, extract_json, parse_structured, repair_json
+)
+
+
+class RepairJSONTest(unittest.TestCase):
+    def assertRepairs(self, text, expected):
+        self.assertEqual(json.loads(repair_json(text)), expected)
+
+    def test_fenced_with_backticks_inside_value(self):
+        # Splitting on ``` used to cut the object at the fence inside cv_content
+        text = 'Here you go:\n```json\n{"cv_content": "# CV\\n```code```", "ats_score": 80}\n```\nThanks'
+        self.assertRepairs(text, {'cv_content': '# CV\n```code```', 'ats_score': 80})
+
+    def test_raw_newlines_and_bad_escapes_in_strings(self):
+        self.assertRepairs('{"cv_content": "# Jane\n\tC:\\path \\d"}', {'cv_content': '# Jane\n\tC:\\path \\d'})
+
+    def test_python_literals_and_trailing_commas(self):
+        self.assertRepairs("{'skills': ['R', 'SQL',], 'remote': True, 'note': None,}",
+                           {'skills': ['R', 'SQL'], 'remote': True, 'note': None})
+
+    def test_truncated_output_is_closed(self):
+        self.assertRepairs('{"cv_content": "# Jane", "experience": ["Built APIs", "Led',
+                           {'cv_content': '# Jane', 'experience': ['Built APIs', 'Led']})
+        self.assertRepairs('{"cv_content": "# Jane", "summary":', {'cv_content': '# Jane', 'summary': None})
+
+    def test_no_object(self):
+        self.assertIsNone(repair_json('no json here'))
+        self.assertIsNone(extract_json('no json here'))
+
+
+class ParseStructuredTest(unittest.TestCase):
+    def test_tailored_cv_coercion(self):
+        response = SimpleNamespace(content='```json\n{"optimized_cv": "# Jane Doe\n- Python", "ats_score": "87/100", '
+                                           '"experience": "Built APIs\nLed team", "summary": null}\n```')
+        output = parse_structured(response, TailoredCVOutput)
+        self.assertEqual(output.cv_content, '# Jane Doe\n- Python')
+        self.assertEqual(output.ats_score, 87)
+        self.assertEqual(output.experience, ['Built APIs', 'Led team'])
+        self.assertEqual(output.summary, '')
+        self.assertEqual(output.ats_analysis, 'Analysis not available')
+
+    def test_missing_cv_content_fails_validation(self):
+        self.assertIsNone(parse_structured('{"cv_content": "  ", "ats_score": 90}', TailoredCVOutput))
+        self.assertIsNone(parse_structured('{"ats_score": 90}', TailoredCVOutput))
+
+    def test_profile(self):
+        output = parse_structured('{"name": "Jane", "skills": "Python, SQL", "links": {"github": null}}', ProfileOutput)
+        self.assertEqual(output.skills, ['Python', 'SQL'])
+        self.assertEqual(output.links, {'github': ''})
+
+
+if __name__ == '__main__':
+    unittest.main()
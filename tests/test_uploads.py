@@ -0,0 +1,54 @@
+import hashlib
+import io
+import os
+import tempfile
+import unittest
+
+from utils.uploads import HashingUploadFile, UploadTooLarge, stream_to_tempfile, upload_suffix
+
+
+class StreamToTempfileTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_hashes_while_writing(self):
+        data = os.urandom(300 * 1024)
+        upload = stream_to_tempfile(io.BytesIO(data), self.tmpdir.name, '.pdf', max_bytes=1024 * 1024)
+        self.assertEqual(upload.sha256, hashlib.sha256(data).hexdigest())
+        self.assertEqual(upload.size, len(data))
+        self.assertTrue(upload.path.endswith('.pdf'))
+        with open(upload.path, 'rb') as f:
+            self.assertEqual(f.read(), data)
+
+    def test_size_limit_removes_partial_file(self):
+        with self.assertRaises(UploadTooLarge):
+            stream_to_tempfile(io.BytesIO(b'x' * 5000), self.tmpdir.name, max_bytes=4096)
+        self.assertEqual(os.listdir(self.tmpdir.name), [])
+
+    def test_readable_after_write(self):
+        # werkzeug writes the part, seeks back and reads it through the same object
+        upload = HashingUploadFile(self.tmpdir.name, '.docx', max_bytes=None)
+        upload.write(b'abc')
+        upload.write(b'def')
+        upload.seek(0)
+        self.assertEqual(upload.read(), b'abcdef')
+        upload.discard()
+        self.assertFalse(os.path.exists(upload.path))
+
+    def test_discard_twice_leaves_no_file(self):
+        # Analyze handlers discard the upload and then the request's other files
+        upload = stream_to_tempfile(io.BytesIO(b'%PDF-1.4'), self.tmpdir.name, '.pdf')
+        upload.discard()
+        upload.discard()
+        self.assertEqual(os.listdir(self.tmpdir.name), [])
+
+    def test_upload_suffix(self):
+        self.assertEqual(upload_suffix('My CV.PDF'), '.pdf')
+        self.assertEqual(upload_suffix(None), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+"""
+Background Jobs
+Runs request work (e.g. CV analysis) in a bounded thread pool and keeps a
+per-job status record that the owning user can poll. Records live in a
+TTLCache; on the SQLite backend a job started by one worker process can be
+polled through any other. New jobs are refused once too many are still
+processing in this worker's pool, instead of queueing without bound.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFull(Exception):
+    """Raised by submit() when max_pending jobs are already processing"""
+
+
+class BackgroundJobs:
+    """
+    Bounded pool plus job status store.
+
+    Example:
+        job_id = jobs.submit(user_id, lambda progress: analyze(..., progress=progress))
+        jobs.status(job_id, user_id)  # {'status': 'processing', 'stage': 'queued', ...}
+
+    Args:
+        workers: Jobs run at once
+        max_pending: Processing (running or queued) jobs before submit() refuses
+        timeout: Seconds after which a job still processing is reported as failed
+        name: Thread name prefix
+        timeout_error: Error reported for a timed-out job
+        store: Job records by job ID (default: a process-local TTLCache); pass
+            one on the shared backend when several workers serve the polls
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 20, timeout: float = 300,
+                 name: str = 'job', timeout_error: str = 'Job timed out. Please try again.',
+                 clock: Callable[[], float] = time.time, store: Optional[TTLCache] = None):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.timeout_error = timeout_error
+        self.clock = clock
+        self._store = store if store is not None else TTLCache(name)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        # Jobs submitted by this process (creation time) and those still processing here
+        self._created: Dict[str, float] = {}
+        self._processing: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def pending(self) -> int:
+        """Jobs running or queued in this process's pool"""
+        with self._lock:
+            return len(self._processing)
+
+    def _update(self, job_id: str, user_id: str, **fields):
+        # Only this process writes the job's record, so read-modify-write under the local lock is enough
+        info = self._store.get(job_id) or {'created_at': self.clock(), 'user_id': user_id}
+        info.update(fields)
+        self._store.set(job_id, info, user_id=user_id)
+
+    def submit(self, user_id: str, work: Callable[[Callable[..., None]], Tuple[Dict[str, Any], int]],
+               **fields) -> str:
+        """
+        Queue work(progress) for user_id and return the job ID. work returns
+        (payload, http_status); progress(stage, **partial) publishes
+        intermediate results to the status. Extra fields are stored on the job.
+
+        Raises:
+            JobQueueFull: max_pending jobs are already processing
+        """
+        job_id = str(uuid.uuid4())
+        with self._lock:
+            if len(self._processing) >= self.max_pending:
+                raise JobQueueFull(f"{self.max_pending} jobs already processing")
+            created_at = self.clock()
+            self._processing.add(job_id)
+            self._created[job_id] = created_at
+            self._store.set(job_id, dict(fields, status='processing', stage='queued',
+                                         user_id=user_id, created_at=created_at), user_id=user_id)
+
+        def progress(stage: str, **partial):
+            with self._lock:
+                if job_id in self._processing:
+                    self._update(job_id, user_id, stage=stage, **partial)
+
+        def runner():
+            try:
+                payload, status = work(progress)
+            except Exception as e:
+                logger.error(f"Background job {job_id} failed: {e}")
+                payload, status = {'success': False, 'error': str(e)}, 500
+            outcome = dict(status='done' if payload.get('success') else 'error',
+                           stage='done', http_status=status, result=payload)
+            if not payload.get('success'):
+                outcome['error'] = payload.get('error')
+            with self._lock:
+                self._update(job_id, user_id, **outcome)
+                self._processing.discard(job_id)
+
+        try:
+            self._executor.submit(runner)
+        except Exception:
+            with self._lock:
+                self._processing.discard(job_id)
+                self._created.pop(job_id, None)
+                self._store.delete(job_id)
+            raise
+        return job_id
+
+    def status(self, job_id: Optional[str], user_id: str) -> Optional[Dict[str, Any]]:
+        """Snapshot of the job for its owner (None if unknown or another user's)"""
+        if not job_id:
+            return None
+        info = dict(self._store.get(job_id) or {})
+        if not info or info.get('user_id') != user_id:
+            return None
+        if info.get('status') == 'processing' and self.clock() - info.get('created_at', self.clock()) > self.timeout:
+            info.update(status='error', error=self.timeout_error)
+        info.pop('user_id', None)
+        return info
+
+    def prune(self, max_age: float) -> int:
+        """Drop jobs this process created more than max_age seconds ago; returns how many"""
+        now = self.clock()
+        with self._lock:
+            stale = [jid for jid, created_at in self._created.items() if now - created_at > max_age]
+            for jid in stale:
+                del self._created[jid]
+                self._store.delete(jid)
+        return len(stale)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,292 @@
+"""
+Bounded TTL caches for API results (profiles, matches, ...)
+
+Entries are evicted least-recently-used once a cache is full and expire after
+a fixed TTL. Every entry can be tagged with a user id so all of a user's
+entries can be invalidated at once. The default backend lives in process
+memory; the SQLite backend is shared by every worker process on the host.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCacheBackend:
+    """Process-local LRU store with per-user secondary index"""
+
+    def __init__(self):
+        self._entries: "OrderedDict[str, Tuple[float, Optional[str], Any]]" = OrderedDict()
+        self._by_user: Dict[str, set] = {}
+        self._lock = threading.Lock()
+
+    def get(self, cache_name: str, key: str) -> Tuple[bool, Any, bool]:
+        """Return (found, value, expired)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None, False
+            expires_at, user_id, value = entry
+            if expires_at <= time.time():
+                self._remove(key)
+                return False, None, True
+            self._entries.move_to_end(key)
+            return True, value, False
+
+    def set(self, cache_name: str, key: str, value: Any, ttl: float, maxsize: int, user_id: Optional[str] = None) -> int:
+        """Store a value and return the number of entries evicted to make room"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.time() + ttl, user_id, value)
+            if user_id:
+                self._by_user.setdefault(user_id, set()).add(key)
+            evicted = 0
+            while len(self._entries) > maxsize:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                evicted += 1
+            return evicted
+
+    def delete(self, cache_name: str, key: str) -> bool:
+        with self._lock:
+            return self._remove(key)
+
+    def invalidate_user(self, cache_name: str, user_id: str) -> int:
+        with self._lock:
+            keys = list(self._by_user.get(user_id, ()))
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self, cache_name: str):
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def size(self, cache_name: str) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        user_id = entry[1]
+        if user_id and user_id in self._by_user:
+            self._by_user[user_id].discard(key)
+            if not self._by_user[user_id]:
+                del self._by_user[user_id]
+        return True
+
+
+class SQLiteCacheBackend:
+    """
+    Host-local store shared by all worker processes (e.g. gunicorn workers).
+    Values are stored as JSON, so only JSON-serializable values are supported.
+    """
+
+    def __init__(self, db_path: str = "api_cache.db"):
+        self.db_path = db_path
+        self._init_db()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS cache_entries (
+            cache TEXT NOT NULL,
+            key TEXT NOT NULL,
+            user_id TEXT,
+            value TEXT,
+            expires_at REAL,
+            accessed_at REAL,
+            PRIMARY KEY (cache, key)
+        )
+        ''')
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_user ON cache_entries (cache, user_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_lru ON cache_entries (cache, accessed_at)")
+        conn.commit()
+        conn.close()
+
+    def get(self, cache_name: str, key: str) -> Tuple[bool, Any, bool]:
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE cache = ? AND key = ?",
+                (cache_name, key)
+            ).fetchone()
+            if row is None:
+                return False, None, False
+            now = time.time()
+            if row[1] <= now:
+                conn.execute("DELETE FROM cache_entries WHERE cache = ? AND key = ?", (cache_name, key))
+                conn.commit()
+                return False, None, True
+            conn.execute(
+                "UPDATE cache_entries SET accessed_at = ? WHERE cache = ? AND key = ?",
+                (now, cache_name, key)
+            )
+            conn.commit()
+            return True, json.loads(row[0]), False
+        finally:
+            conn.close()
+
+    def set(self, cache_name: str, key: str, value: Any, ttl: float, maxsize: int, user_id: Optional[str] = None) -> int:
+        conn = self._connect()
+        try:
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (cache, key, user_id, value, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (cache_name, key, user_id, json.dumps(value, default=str), now + ttl, now)
+            )
+            # Drop expired rows first, then least-recently-used rows over the bound
+            conn.execute("DELETE FROM cache_entries WHERE cache = ? AND expires_at <= ?", (cache_name, now))
+            cursor = conn.execute('''
+            DELETE FROM cache_entries WHERE cache = ? AND key IN (
+                SELECT key FROM cache_entries WHERE cache = ?
+                ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+            )
+            ''', (cache_name, cache_name, maxsize))
+            conn.commit()
+            return max(cursor.rowcount, 0)
+        finally:
+            conn.close()
+
+    def delete(self, cache_name: str, key: str) -> bool:
+        conn = self._connect()
+        try:
+            cursor = conn.execute("DELETE FROM cache_entries WHERE cache = ? AND key = ?", (cache_name, key))
+            conn.commit()
+            return cursor.rowcount > 0
+        finally:
+            conn.close()
+
+    def invalidate_user(self, cache_name: str, user_id: str) -> int:
+        conn = self._connect()
+        try:
+            cursor = conn.execute("DELETE FROM cache_entries WHERE cache = ? AND user_id = ?", (cache_name, user_id))
+            conn.commit()
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+    def clear(self, cache_name: str):
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM cache_entries WHERE cache = ?", (cache_name,))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def size(self, cache_name: str) -> int:
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM cache_entries WHERE cache = ?", (cache_name,)).fetchone()[0]
+        finally:
+            conn.close()
+
+
+class TTLCache:
+    """
+    Size-bounded LRU cache with TTL expiry, per-user invalidation and
+    hit/miss/eviction counters.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 3600, backend=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.backend = backend or MemoryCacheBackend()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            found, value, expired = self.backend.get(self.name, key)
+        except Exception as e:
+            logger.warning(f"Cache '{self.name}' read failed: {e}")
+            found, value, expired = False, None, False
+        if expired:
+            self.expirations += 1
+        if not found:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, user_id: Optional[str] = None, ttl: Optional[float] = None):
+        try:
+            self.evictions += self.backend.set(self.name, key, value, ttl or self.ttl, self.maxsize, user_id)
+        except Exception as e:
+            logger.warning(f"Cache '{self.name}' write failed: {e}")
+
+    def delete(self, key: str) -> bool:
+        try:
+            return self.backend.delete(self.name, key)
+        except Exception as e:
+            logger.warning(f"Cache '{self.name}' delete failed: {e}")
+            return False
+
+    def invalidate_user(self, user_id: str) -> int:
+        """Remove every entry tagged with user_id; returns the number removed"""
+        try:
+            return self.backend.invalidate_user(self.name, user_id)
+        except Exception as e:
+            logger.warning(f"Cache '{self.name}' invalidation failed: {e}")
+            return 0
+
+    def clear(self):
+        self.backend.clear(self.name)
+
+    def __len__(self):
+        return self.backend.size(self.name)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'name': self.name,
+            'backend': type(self.backend).__name__,
+            'size': len(self),
+            'maxsize': self.maxsize,
+            'ttl_seconds': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
+
+
+_shared_backend = None
+
+
+def get_cache_backend():
+    """
+    Backend selected by CACHE_BACKEND ('sqlite' or 'memory').
+    The default SQLite backend is shared by all workers via CACHE_DB_PATH;
+    'memory' keeps a copy per process and only suits a single worker.
+    """
+    global _shared_backend
+    if os.getenv('CACHE_BACKEND', 'sqlite').lower() == 'memory':
+        return MemoryCacheBackend()
+    if _shared_backend is None:
+        _shared_backend = SQLiteCacheBackend(os.getenv('CACHE_DB_PATH', 'api_cache.db'))
+    return _shared_backend
+
+
+def build_cache(name: str, maxsize: int, ttl: float) -> TTLCache:
+    """Create a TTLCache on the configured backend"""
+    return TTLCache(name, maxsize=maxsize, ttl=ttl, backend=get_cache_backend())
@@ -0,0 +1,101 @@
+"""
+Parsed CV Cache
+Content-addressed, persistent cache from a CV's SHA-256 to its extracted
+text, parsed CVData and derived profile. Re-uploads, pipeline rehydration
+and the CVBuilder fallback reuse earlier parses instead of re-running the
+extractor and parser.
+"""
+
+import hashlib
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from .cache import TTLCache, SQLiteCacheBackend
+from .cv_parser import CVData, PARSER_VERSION
+
+logger = logging.getLogger(__name__)
+
+
+def hash_cv_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_cv_file(path: str) -> str:
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def hash_cv_text(text: str) -> str:
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+
+@dataclass
+class ParsedCV:
+    """A cached parse result"""
+    cv_content: str
+    cv_data: CVData
+    profile: Dict[str, Any]
+
+
+class ParsedCVCache:
+    """
+    Parse results keyed by content hash and PARSER_VERSION; entries written by
+    an older parser version are never returned and age out of the store.
+    Backed by SQLite so every worker process shares it.
+    """
+
+    def __init__(self, db_path: str = "cv_cache.db", maxsize: int = 2000, ttl: float = 30 * 24 * 3600):
+        self._cache = TTLCache('parsed_cv', maxsize=maxsize, ttl=ttl, backend=SQLiteCacheBackend(db_path))
+
+    @staticmethod
+    def _key(cv_hash: str) -> str:
+        return f"v{PARSER_VERSION}:{cv_hash}"
+
+    def get(self, cv_hash: str) -> Optional[ParsedCV]:
+        if not cv_hash:
+            return None
+        entry = self._cache.get(self._key(cv_hash))
+        if not entry:
+            return None
+        try:
+            return ParsedCV(
+                cv_content=entry['cv_content'],
+                cv_data=CVData.from_dict(entry['cv_data']),
+                profile=entry['profile']
+            )
+        except Exception as e:
+            logger.warning(f"Discarding unreadable parsed CV cache entry: {e}")
+            self._cache.delete(self._key(cv_hash))
+            return None
+
+    def put(self, cv_hash: str, cv_content: str, cv_data: CVData, profile: Dict[str, Any]):
+        if not cv_hash:
+            return
+        self._cache.set(self._key(cv_hash), {
+            'cv_content': cv_content,
+            'cv_data': cv_data.to_dict(),
+            'profile': profile
+        })
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+_parsed_cv_cache = None
+
+
+def get_parsed_cv_cache() -> ParsedCVCache:
+    """Shared cache configured by CV_CACHE_DB_PATH, CV_CACHE_MAX_ENTRIES and CV_CACHE_TTL_DAYS"""
+    global _parsed_cv_cache
+    if _parsed_cv_cache is None:
+        _parsed_cv_cache = ParsedCVCache(
+            db_path=os.getenv('CV_CACHE_DB_PATH', 'cv_cache.db'),
+            maxsize=int(os.getenv('CV_CACHE_MAX_ENTRIES', '2000')),
+            ttl=float(os.getenv('CV_CACHE_TTL_DAYS', '30')) * 24 * 3600
+        )
+    return _parsed_cv_cache
@@ -0,0 +1,375 @@
+"""
+CV Text Extraction
+Decodes an uploaded CV once and shares the result between the pipeline
+(normalized text for the AI agents) and CVParser, which builds its line
+structure from the same raw text instead of reopening the file.
+"""
+
+import logging
+import math
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import cached_property
+from pathlib import Path
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+PDF_ENGINES = ('pdfplumber', 'pypdf', 'pdfminer')
+# Below this many characters an engine's output is treated as a failed extraction
+MIN_PDF_TEXT_CHARS = 200
+
+
+def get_pdf_engine_order(preferred: Optional[str] = None) -> List[str]:
+    """PDF engines to try, preferred engine (CV_EXTRACTION_ENGINE) first"""
+    preferred = (preferred or os.getenv('CV_EXTRACTION_ENGINE', 'pdfplumber')).lower()
+    if preferred not in PDF_ENGINES:
+        logger.warning(f"Unknown CV_EXTRACTION_ENGINE '{preferred}', using pdfplumber")
+        preferred = 'pdfplumber'
+    return [preferred] + [e for e in PDF_ENGINES if e != preferred]
+
+
+def normalize_cv_text(text: str) -> str:
+    try:
+        # Fix hyphenated line breaks: devel-\nopment -> development
+        text = re.sub(r"(\w)-\n(\w)", r"\1\2", text)
+        # Collapse excessive whitespace
+        text = re.sub(r"[ \t]+", " ", text)
+        text = re.sub(r"\n{3,}", "\n\n", text)
+        # Remove common placeholder artifacts
+        text = text.replace("\x0c", "\n").strip()
+    except Exception:
+        pass
+    return text
+
+
+class ImageOnlyPDFError(ValueError):
+    """A scanned (image-only) PDF with no extractable text and no OCR available"""
+
+
+@dataclass
+class ExtractedDocument:
+    """Text of a CV as decoded by a single extraction engine"""
+    raw_text: str
+    engine: str
+    path: Optional[str] = None
+    page_count: int = 0
+    pages: List[str] = field(default_factory=list, repr=False)
+    # classify_pdf result for PDFs: text, mixed, image_only or unknown
+    pdf_kind: Optional[str] = None
+
+    @cached_property
+    def text(self) -> str:
+        """Normalized text handed to the AI agents and stored with the profile"""
+        return normalize_cv_text(self.raw_text)
+
+    @property
+    def is_pdf(self) -> bool:
+        return self.engine in PDF_ENGINES or self.engine == OCR_ENGINE
+
+    @property
+    def image_only(self) -> bool:
+        return self.pdf_kind == 'image_only' and not self.raw_text.strip()
+
+
+# ------------------------------------------------------------------
+# Scanned PDF detection and optional OCR
+# ------------------------------------------------------------------
+
+OCR_ENGINE = 'tesseract'
+CLASSIFY_SAMPLE_PAGES = int(os.getenv('CV_CLASSIFY_SAMPLE_PAGES', '3'))
+OCR_ENABLED = os.getenv('CV_OCR_ENABLED', 'false').lower() == 'true'
+OCR_MAX_PAGES = int(os.getenv('CV_OCR_MAX_PAGES', '3'))
+
+# Text-showing operators (Tj, TJ, ', ") after a string or array operand
+_TEXT_OPERATOR_RE = re.compile(rb"[)\]>]\s*(?:Tj|TJ|'|\")")
+
+
+def _page_kind(page) -> str:
+    """text, image or other for one pypdf page, from its resources and content stream"""
+    resources = page.get('/Resources')
+    resources = resources.get_object() if resources is not None else {}
+    xobjects = resources.get('/XObject')
+    xobjects = xobjects.get_object() if xobjects is not None else {}
+    subtypes = {xobjects[name].get_object().get('/Subtype') for name in xobjects}
+
+    contents = page.get_contents()
+    data = contents.get_data() if contents is not None else b''
+    if '/Font' in resources and _TEXT_OPERATOR_RE.search(data):
+        return 'text'
+    # Text may sit inside form XObjects; only pure image pages count as scanned
+    if '/Image' in subtypes and '/Form' not in subtypes:
+        return 'image'
+    return 'other'
+
+
+def classify_pdf(path: str, sample_pages: int = CLASSIFY_SAMPLE_PAGES) -> str:
+    """
+    Classify a PDF as text, mixed, image_only or unknown from its first pages,
+    without extracting any text (milliseconds, even for long scans).
+    """
+    started = time.perf_counter()
+    try:
+        import pypdf
+        reader = pypdf.PdfReader(path)
+        kinds = [_page_kind(page) for page in reader.pages[:sample_pages]]
+    except Exception as e:
+        logger.warning(f"PDF classification failed, extracting normally: {e}")
+        return 'unknown'
+    if not kinds:
+        kind = 'unknown'
+    elif all(k == 'image' for k in kinds):
+        kind = 'image_only'
+    elif 'image' in kinds:
+        kind = 'mixed'
+    else:
+        kind = 'text'
+    logger.info(f"PDF classified as {kind} in {(time.perf_counter() - started) * 1000:.1f}ms")
+    return kind
+
+
+def ocr_available() -> bool:
+    if not OCR_ENABLED:
+        return False
+    try:
+        import pytesseract  # type: ignore
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+
+def ocr_pdf(path: str, max_pages: int = OCR_MAX_PAGES) -> ExtractedDocument:
+    """OCR the page images of a scanned PDF with local Tesseract (CV_OCR_ENABLED=true)"""
+    import pypdf
+    import pytesseract  # type: ignore
+    reader = pypdf.PdfReader(path)
+    pages = []
+    for page in reader.pages[:max_pages]:
+        pages.append("\n".join(pytesseract.image_to_string(image.image) for image in page.images))
+    return ExtractedDocument(
+        raw_text="\n".join(p for p in pages if p),
+        engine=OCR_ENGINE,
+        path=path,
+        page_count=len(reader.pages),
+        pages=pages,
+        pdf_kind='image_only'
+    )
+
+
+def _iter_pdfplumber(path: str, start: int, end: int):
+    import pdfplumber
+    with pdfplumber.open(path) as pdf:
+        for page in pdf.pages[start:end]:
+            # Extract text with layout preservation
+            yield page.extract_text() or ""
+
+
+def _iter_pypdf(path: str, start: int, end: int):
+    import pypdf
+    reader = pypdf.PdfReader(path)
+    for page in reader.pages[start:end]:
+        yield page.extract_text() or ""
+
+
+def _iter_pdfminer(path: str, start: int, end: int):
+    from pdfminer.high_level import extract_text as _pdfminer_extract_text  # type: ignore
+    page_numbers = list(range(start, end)) if end is not None else None
+    text = _pdfminer_extract_text(path, page_numbers=page_numbers) or ""
+    yield from text.split("\x0c")[:end - start if end is not None else None]
+
+
+_PDF_PAGE_ITERATORS = {
+    'pdfplumber': _iter_pdfplumber,
+    'pypdf': _iter_pypdf,
+    'pdfminer': _iter_pdfminer,
+}
+
+
+def _count_pdf_pages(path: str) -> Optional[int]:
+    try:
+        import pypdf
+        return len(pypdf.PdfReader(path).pages)
+    except Exception:
+        pass
+    try:
+        import pdfplumber
+        with pdfplumber.open(path) as pdf:
+            return len(pdf.pages)
+    except Exception:
+        return None
+
+
+def _extract_page_range(engine: str, path: str, start: int, end: Optional[int]) -> List[str]:
+    """Pages [start, end) of a PDF; runs in a pool worker in parallel mode"""
+    return list(_PDF_PAGE_ITERATORS[engine](path, start, end))
+
+
+# ------------------------------------------------------------------
+# Page-range mode for long PDFs
+# ------------------------------------------------------------------
+
+# PDFs with more pages than this are read in page ranges, capped and with early stop
+PAGE_RANGE_MIN_PAGES = int(os.getenv('CV_EXTRACTION_PAGE_RANGE_MIN_PAGES', '4'))
+MAX_PAGES = int(os.getenv('CV_EXTRACTION_MAX_PAGES', '20'))
+# >1 spreads page ranges over a process pool; 0/1 reads them serially in-process
+EXTRACTION_WORKERS = int(os.getenv('CV_EXTRACTION_WORKERS', '0'))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers)
+        return _pool
+
+
+def _extract_serial(engine: str, path: str, limit: int, stop_when) -> List[str]:
+    pages = []
+    for text in _PDF_PAGE_ITERATORS[engine](path, 0, limit):
+        pages.append(text)
+        if stop_when and stop_when(pages):
+            break
+    return pages
+
+
+def _extract_parallel(engine: str, path: str, limit: int, stop_when, workers: int) -> List[str]:
+    """Split [0, limit) into page ranges across the pool and reassemble them in order"""
+    chunk = max(2, math.ceil(limit / (workers * 2)))
+    pool = _get_pool(workers)
+    futures = [pool.submit(_extract_page_range, engine, path, start, min(start + chunk, limit))
+               for start in range(0, limit, chunk)]
+    pages = []
+    try:
+        for future in futures:
+            pages.extend(future.result())
+            if stop_when and stop_when(pages):
+                break
+    finally:
+        for future in futures:
+            future.cancel()
+    return pages
+
+
+def _read_pdf_pages(engine: str, path: str, stop_when=None, workers: Optional[int] = None):
+    """Return (pages, total_page_count) for one engine"""
+    total = _count_pdf_pages(path)
+    if total is None or total <= PAGE_RANGE_MIN_PAGES:
+        pages = _extract_page_range(engine, path, 0, total if total is not None else None)
+        return pages, len(pages)
+
+    limit = min(total, MAX_PAGES) if MAX_PAGES > 0 else total
+    workers = EXTRACTION_WORKERS if workers is None else workers
+    if workers > 1:
+        pages = _extract_parallel(engine, path, limit, stop_when, workers)
+    else:
+        pages = _extract_serial(engine, path, limit, stop_when)
+    if len(pages) < total:
+        logger.info(f"Read {len(pages)}/{total} PDF pages ({'early stop' if len(pages) < limit else 'page cap'})")
+    return pages, total
+
+
+def extract_pdf(path: str, engine: Optional[str] = None, stop_when=None,
+                workers: Optional[int] = None) -> ExtractedDocument:
+    """
+    Extract a PDF with the preferred engine, falling back to the others on weak output.
+
+    Scanned (image-only) PDFs skip the text engines: they are OCRed when
+    CV_OCR_ENABLED and Tesseract are available, otherwise an empty document
+    with pdf_kind='image_only' is returned.
+
+    Long PDFs (more than CV_EXTRACTION_PAGE_RANGE_MIN_PAGES pages) are read in
+    page order up to CV_EXTRACTION_MAX_PAGES, over a process pool when
+    CV_EXTRACTION_WORKERS > 1. Reading stops early once stop_when(pages) is true,
+    which also cuts document.text: pass it only when the text is just parsed,
+    never when it is kept as the CV.
+    """
+    kind = classify_pdf(path)
+    if kind == 'image_only':
+        # Every text engine would fail on a scan; OCR it or report it straight away
+        if ocr_available():
+            try:
+                return ocr_pdf(path)
+            except Exception as e:
+                logger.warning(f"OCR failed: {e}")
+        return ExtractedDocument(raw_text="", engine=get_pdf_engine_order(engine)[0], path=path, pdf_kind=kind)
+
+    best = ExtractedDocument(raw_text="", engine=get_pdf_engine_order(engine)[0], path=path, pdf_kind=kind)
+    for name in get_pdf_engine_order(engine):
+        try:
+            pages, total = _read_pdf_pages(name, path, stop_when, workers)
+        except Exception as e:
+            logger.warning(f"{name} extraction unavailable/failed: {e}")
+            continue
+        doc = ExtractedDocument(
+            raw_text="\n".join(p for p in pages if p),
+            engine=name,
+            path=path,
+            page_count=total,
+            pages=pages,
+            pdf_kind=kind
+        )
+        if len(doc.raw_text.strip()) >= MIN_PDF_TEXT_CHARS:
+            return doc
+        if len(doc.raw_text.strip()) > len(best.raw_text.strip()):
+            best = doc
+    return best
+
+
+def extract_docx(path: str) -> ExtractedDocument:
+    try:
+        import docx  # type: ignore
+        doc = docx.Document(path)
+        return ExtractedDocument("\n".join([p.text for p in doc.paragraphs]), 'docx', path)
+    except Exception as e:
+        logger.warning(f"python-docx extraction failed: {e}")
+        try:
+            import zipfile
+            with zipfile.ZipFile(path) as z:
+                xml = z.read("word/document.xml").decode("utf-8", errors="ignore")
+                xml = re.sub(r"<(.|\n)*?>", "\n", xml)
+                text = "\n".join([l.strip() for l in xml.splitlines() if l.strip()])
+                return ExtractedDocument(text, 'docx-xml', path)
+        except Exception as e2:
+            logger.warning(f"zip/docx fallback failed: {e2}")
+    return ExtractedDocument("", 'docx', path)
+
+
+def extract_doc(path: str) -> ExtractedDocument:
+    try:
+        import textract  # type: ignore
+        return ExtractedDocument(textract.process(path).decode("utf-8", errors="ignore"), 'textract', path)
+    except Exception as e:
+        logger.warning(f"textract .doc extraction unavailable/failed: {e}")
+    return ExtractedDocument("", 'textract', path)
+
+
+def extract_document(path: str, engine: Optional[str] = None, stop_when=None) -> ExtractedDocument:
+    """
+    Decode a CV file once.
+
+    Args:
+        path: Path to a .pdf, .docx, .doc or plain text file
+        engine: PDF engine override (defaults to CV_EXTRACTION_ENGINE)
+        stop_when: Optional callable(pages) -> bool ending long-PDF reads early
+            (truncates the text; only for parse-only callers)
+
+    Returns:
+        ExtractedDocument with the raw and normalized text
+    """
+    ext = Path(path).suffix.lower()
+    if ext == ".pdf":
+        return extract_pdf(path, engine, stop_when)
+    if ext == ".docx":
+        return extract_docx(path)
+    if ext == ".doc":
+        return extract_doc(path)
+    with open(path, "r", encoding="utf-8") as f:
+        return ExtractedDocument(f.read(), 'text', path)
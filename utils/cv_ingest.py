@@ -0,0 +1,190 @@
+"""
+Bulk CV Ingestion
+Parses a directory of CVs in a process pool and writes one JSON line per CV
+(parsed CVData and derived profile). CVs already in the parsed CV cache are
+emitted from the cache without re-parsing. Used by `python main.py ingest`.
+"""
+
+import json
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from . import cv_extraction
+from .cv_cache import get_parsed_cv_cache, hash_cv_file
+from .cv_extraction import extract_document
+from .cv_parser import CVData, CVParser, build_profile_from_cv_data
+
+logger = logging.getLogger(__name__)
+
+INGEST_EXTENSIONS = ('.pdf', '.docx')
+
+
+@dataclass
+class IngestStats:
+    total: int = 0
+    parsed: int = 0
+    cached: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
+    @property
+    def files_per_sec(self) -> float:
+        done = self.parsed + self.cached
+        return done / self.seconds if self.seconds > 0 else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.total} files: {self.parsed} parsed, {self.cached} from cache, "
+                f"{self.duplicates} duplicates, {self.failed} failed in {self.seconds:.1f}s "
+                f"({self.files_per_sec:.1f} files/s)")
+
+
+def find_cv_files(directory: str) -> List[Path]:
+    """PDF and DOCX files under directory, in path order"""
+    return sorted(p for p in Path(directory).rglob('*')
+                  if p.is_file() and p.suffix.lower() in INGEST_EXTENSIONS)
+
+
+def _init_worker():
+    # Pool workers are daemonic and cannot start the page-range pool of their own
+    cv_extraction.EXTRACTION_WORKERS = 0
+
+
+def parse_cv_file(path: str) -> Dict[str, Any]:
+    """
+    Extract and parse one CV; runs in a pool worker. Scans without OCR and
+    files without text give an error record instead of an empty profile.
+    """
+    started = time.perf_counter()
+    try:
+        # No early stop: the text is cached as the master CV for tailoring
+        document = extract_document(path)
+        if document.image_only:
+            return {'file': path, 'error': 'Scanned PDF with no selectable text (OCR not available)'}
+        if not document.text.strip():
+            return {'file': path, 'error': 'No text could be extracted'}
+        if document.is_pdf:
+            parser = CVParser(document=document)
+        else:
+            parser = CVParser(raw_text=document.text)
+        cv_data = parser.parse()
+        return {
+            'file': path,
+            'cv_content': document.text,
+            'cv_data': cv_data.to_dict(),
+            'profile': build_profile_from_cv_data(cv_data),
+            'engine': document.engine,
+            'seconds': round(time.perf_counter() - started, 3),
+        }
+    except Exception as e:
+        return {'file': path, 'error': str(e)}
+
+
+def _record(path: Path, cv_hash: str, cv_data: Dict[str, Any], profile: Dict[str, Any],
+            cached: bool, engine: Optional[str] = None, duplicate_of: Optional[Path] = None) -> Dict[str, Any]:
+    record = {
+        'file': str(path),
+        'user_id': path.stem,
+        'cv_hash': cv_hash,
+        'cached': cached,
+        'engine': engine,
+        'profile': profile,
+        'cv_data': cv_data,
+    }
+    if duplicate_of is not None:
+        record['duplicate_of'] = str(duplicate_of)
+    return record
+
+
+def ingest_directory(directory: str, out_path: str, workers: int = 0,
+                     use_cache: bool = True) -> IngestStats:
+    """
+    Parse every CV under directory into out_path (JSONL).
+
+    Args:
+        directory: Folder searched recursively for .pdf/.docx files
+        out_path: JSONL file to write, one record per file (files with
+            identical content share one parse)
+        workers: Pool size; 0/1 parses in-process
+        use_cache: Skip parsing for CVs already in the parsed CV cache
+
+    Returns:
+        IngestStats with counts and throughput
+    """
+    stats = IngestStats()
+    started = time.perf_counter()
+    cache = get_parsed_cv_cache()
+    files = find_cv_files(directory)
+    stats.total = len(files)
+
+    with open(out_path, 'w', encoding='utf-8') as out:
+        def write_group(paths, cv_hash, cv_data, profile, cached, engine=None):
+            # Every file gets a record (its user needs a profile); copies reuse the first parse
+            for i, path in enumerate(paths):
+                record = _record(path, cv_hash, cv_data, profile, cached=cached, engine=engine,
+                                 duplicate_of=paths[0] if i else None)
+                out.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+        # Hash first: identical files are parsed once, cached ones not at all
+        groups: Dict[str, List[Path]] = {}
+        for path in files:
+            try:
+                cv_hash = hash_cv_file(str(path))
+            except OSError as e:
+                logger.warning(f"Cannot read {path}: {e}")
+                stats.failed += 1
+                continue
+            if cv_hash in groups:
+                stats.duplicates += 1
+            groups.setdefault(cv_hash, []).append(path)
+
+        pending = {}
+        pending_files = 0
+        files_done = 0
+        for cv_hash, paths in groups.items():
+            hit = cache.get(cv_hash) if use_cache else None
+            if hit:
+                write_group(paths, cv_hash, hit.cv_data.to_dict(), hit.profile, cached=True)
+                stats.cached += 1
+            else:
+                pending[str(paths[0])] = (paths, cv_hash)
+                pending_files += len(paths)
+
+        def collect(result):
+            nonlocal files_done
+            paths, cv_hash = pending[result['file']]
+            path = paths[0]
+            # Progress counts files; a group of identical files is done at once
+            files_done += len(paths)
+            if 'error' in result:
+                logger.warning(f"Failed to parse {path}: {result['error']}")
+                stats.failed += len(paths)
+                print(f"  [{files_done}/{pending_files}] {path.name} failed")
+                return
+            cache.put(cv_hash, result['cv_content'], CVData.from_dict(result['cv_data']), result['profile'])
+            write_group(paths, cv_hash, result['cv_data'], result['profile'], cached=False, engine=result['engine'])
+            stats.parsed += 1
+            print(f"  [{files_done}/{pending_files}] {path.name} ({result['seconds']}s)")
+
+        if workers > 1 and len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                futures = [pool.submit(parse_cv_file, p) for p in pending]
+                for future in as_completed(futures):
+                    collect(future.result())
+        else:
+            for p in pending:
+                collect(parse_cv_file(p))
+
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+def read_ingest_records(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
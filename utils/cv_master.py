@@ -0,0 +1,135 @@
+"""
+Master CV
+The master CV text of a tailoring engine and what is derived from it once
+per engine instead of on every preview, PDF or cover letter: the header
+fields, the parsed CVData (via the parsed CV cache) and the rendered HTML
+sections of each tailored version.
+"""
+
+import json
+import logging
+import re
+from typing import Any, Callable, Dict, Optional
+
+from .cv_cache import get_parsed_cv_cache, hash_cv_text
+from .cv_parser import CVData, CVParser, build_profile_from_cv_data
+from .llm_cache import hash_profile, hash_text
+
+logger = logging.getLogger(__name__)
+
+# CV versions whose rendered sections are kept per engine
+SECTIONS_MEMO_SIZE = 32
+
+_SA_LOCATIONS = re.compile(r"\b(Cape Town|Johannesburg|Pretoria|Durban|Sandton|South Africa|Gauteng|Western Cape)\b",
+                           re.IGNORECASE)
+
+
+def extract_cv_header(text: str) -> Dict[str, str]:
+    """Name, title, email, phone and location found near the top of a CV"""
+    text = text or ''
+    lines = [l.strip() for l in text.splitlines() if l.strip()]
+    name = ''
+    if lines:
+        candidates = []
+        for l in lines[:5]:
+            ll = l.lower()
+            if '@' in l or 'linkedin' in ll or 'github' in ll or 'curriculum vitae' in ll:
+                continue
+            if len(l.split()) <= 5:
+                candidates.append(l)
+        if candidates:
+            name = candidates[0]
+    email_match = re.search(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", text)
+    email = email_match.group(0) if email_match else ''
+    phone_match = re.search(r"(\+?\d[\d\s\-]{7,}\d)", text)
+    phone = phone_match.group(0) if phone_match else ''
+    loc_match = None
+    for l in lines[:15]:
+        ll = l.lower()
+        if ll.startswith('location:') or ll.startswith('address:'):
+            loc_match = l.split(':', 1)[1].strip()
+            break
+        if _SA_LOCATIONS.search(l):
+            loc_match = l.strip()
+            break
+    location = loc_match or ''
+    title = ''
+    if len(lines) > 1:
+        for l in lines[1:6]:
+            if '@' in l:
+                continue
+            if len(l.split()) <= 6:
+                title = l
+                break
+    return {
+        'name': name,
+        'title': title,
+        'email': email,
+        'phone': phone,
+        'location': location
+    }
+
+
+class MasterCV:
+    """
+    Memoized derivations of one master CV text.
+
+    Args:
+        text: Master CV text
+        parsed_cv_data: CVData already parsed from text (skips parsing)
+        sections_memo_size: Tailored versions whose sections are kept
+    """
+
+    def __init__(self, text: str, parsed_cv_data: Optional[CVData] = None,
+                 sections_memo_size: int = SECTIONS_MEMO_SIZE):
+        self.text = text
+        self._parsed = parsed_cv_data
+        self._parse_attempted = parsed_cv_data is not None
+        self._header: Optional[Dict[str, str]] = None
+        self._sections_memo: Dict[str, Dict[str, Any]] = {}
+        self.sections_memo_size = max(1, sections_memo_size)
+
+    def header_info(self) -> Dict[str, str]:
+        """Header fields, extracted on first use; callers get a copy"""
+        if self._header is None:
+            self._header = extract_cv_header(self.text)
+        return dict(self._header)
+
+    def parsed_cv_data(self) -> Optional[CVData]:
+        """
+        Parsed master CV, looked up in the parsed CV cache by text hash before
+        falling back to parsing. The result (or a failed parse) is kept, so
+        the CV is parsed at most once.
+        """
+        if self._parsed is not None or self._parse_attempted or not self.text:
+            return self._parsed
+        self._parse_attempted = True
+        try:
+            cache = get_parsed_cv_cache()
+            text_hash = hash_cv_text(self.text)
+            cached = cache.get(text_hash)
+            if cached:
+                self._parsed = cached.cv_data
+            else:
+                self._parsed = CVParser(raw_text=self.text).parse()
+                cache.put(text_hash, self.text, self._parsed, build_profile_from_cv_data(self._parsed))
+        except Exception as e:
+            logger.warning(f"Could not parse master CV: {e}")
+        return self._parsed
+
+    def sections(self, cv_data: Dict[str, Any], profile: Any,
+                 derive: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        derive(cv_data), memoized per version content and profile so previews,
+        PDFs and applications of one version share it; callers get a copy
+        """
+        key = hash_text(json.dumps(
+            [cv_data.get(k) for k in ('cv_content', 'sections', 'job_keywords')], sort_keys=True, default=str
+        )) + hash_profile(profile)
+        sections = self._sections_memo.get(key)
+        if sections is None:
+            sections = derive(cv_data)
+            if len(self._sections_memo) >= self.sections_memo_size:
+                self._sections_memo.pop(next(iter(self._sections_memo)), None)
+            self._sections_memo[key] = sections
+        return dict(sections)
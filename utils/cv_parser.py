@@ -4,13 +4,24 @@ Extracts structured information using pattern matching and section identificatio
 """
 
 import re
-import pdfplumber
+import struct
+import zlib
 from typing import Dict, List, Optional, Union
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 import json
 import os
 
-@dataclass
+from .cv_extraction import ExtractedDocument, extract_pdf
+
+# Bump whenever extraction, parsing or the profile mapping changes output,
+# so cached parse results from older versions are ignored.
+PARSER_VERSION = 1
+
+# What parsed CVs keep of their source text once parsing is done:
+# keep (default), compress (zlib, decompressed on demand) or drop
+RAW_TEXT_MODE = os.getenv('CV_RAW_TEXT_MODE', 'keep').lower()
+
+@dataclass(slots=True)
 class ContactInfo:
     """Contact information structure"""
     name: Optional[str] = None
@@ -22,7 +33,7 @@ class ContactInfo:
     github: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Education:
     """Education entry structure"""
     degree: str
@@ -35,7 +46,7 @@ class Education:
             self.details = []
 
 
-@dataclass
+@dataclass(slots=True)
 class WorkExperience:
     """Work experience entry structure"""
     title: str
@@ -48,7 +59,7 @@ class WorkExperience:
             self.responsibilities = []
 
 
-@dataclass
+@dataclass(slots=True)
 class Project:
     """Project entry structure"""
     name: str
@@ -63,7 +74,7 @@ class Project:
             self.details = []
 
 
-@dataclass
+@dataclass(slots=True)
 class CVData:
     """Complete CV data structure"""
     contact_info: ContactInfo
@@ -73,6 +84,7 @@ class CVData:
     work_experience: List[WorkExperience] = None
     projects: List[Project] = None
     raw_text: str = ""
+    raw_text_z: Optional[bytes] = field(default=None, repr=False, compare=False)
     
     def __post_init__(self):
         if self.technical_skills is None:
@@ -84,28 +96,356 @@ class CVData:
         if self.projects is None:
             self.projects = []
 
+    def to_dict(self) -> dict:
+        """Structured fields as plain data (raw text excluded)"""
+        return {
+            'contact_info': asdict(self.contact_info),
+            'professional_profile': self.professional_profile,
+            'technical_skills': self.technical_skills,
+            'education': [asdict(edu) for edu in self.education],
+            'work_experience': [asdict(exp) for exp in self.work_experience],
+            'projects': [asdict(proj) for proj in self.projects],
+        }
+
+    def get_raw_text(self) -> str:
+        """Source text, decompressed if release_raw_text compressed it"""
+        if self.raw_text_z is not None:
+            return zlib.decompress(self.raw_text_z).decode('utf-8')
+        return self.raw_text
+
+    def release_raw_text(self, mode: str = None):
+        """Compress or drop the source text (mode defaults to CV_RAW_TEXT_MODE)"""
+        mode = mode or RAW_TEXT_MODE
+        if mode == 'compress' and self.raw_text:
+            self.raw_text_z = pack_cv_text(self.raw_text)
+            self.raw_text = ""
+        elif mode == 'drop':
+            self.raw_text = ""
+            self.raw_text_z = None
+
+    def to_bytes(self, include_raw_text: bool = True) -> bytes:
+        """Compact struct-packed encoding; the raw text, if kept, is zlib-compressed"""
+        out = [_CV_BYTES_MAGIC]
+        c = self.contact_info
+        for value in (c.name, c.phone, c.email, c.address, c.linkedin, c.portfolio, c.github,
+                      self.professional_profile):
+            _pack_str(out, value)
+        _pack_count(out, self.technical_skills)
+        for category, skills in self.technical_skills.items():
+            _pack_str(out, category)
+            _pack_strs(out, skills)
+        _pack_count(out, self.education)
+        for edu in self.education:
+            for value in (edu.degree, edu.institution, edu.year):
+                _pack_str(out, value)
+            _pack_strs(out, edu.details)
+        _pack_count(out, self.work_experience)
+        for exp in self.work_experience:
+            for value in (exp.title, exp.company, exp.duration):
+                _pack_str(out, value)
+            _pack_strs(out, exp.responsibilities)
+        _pack_count(out, self.projects)
+        for proj in self.projects:
+            _pack_str(out, proj.name)
+            _pack_str(out, proj.description)
+            _pack_strs(out, proj.technologies)
+            _pack_strs(out, proj.details)
+        raw = b''
+        if include_raw_text:
+            raw = self.raw_text_z if self.raw_text_z is not None else pack_cv_text(self.raw_text)
+        out.append(struct.pack('<I', len(raw)))
+        out.append(raw)
+        return b''.join(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'CVData':
+        """Rebuild CVData from to_bytes output"""
+        if not data.startswith(_CV_BYTES_MAGIC):
+            raise ValueError("Not a serialized CVData (bad header)")
+        r = _Unpacker(data, len(_CV_BYTES_MAGIC))
+        contact = ContactInfo(*(r.read_str() for _ in range(7)))
+        profile = r.read_str()
+        skills = {}
+        for _ in range(r.read_count()):
+            category = r.read_str()
+            skills[category] = r.read_strs()
+        education = [Education(r.read_str(), r.read_str(), r.read_str(), r.read_strs()) for _ in range(r.read_count())]
+        experience = [WorkExperience(r.read_str(), r.read_str(), r.read_str(), r.read_strs()) for _ in range(r.read_count())]
+        projects = [Project(r.read_str(), r.read_str(), r.read_strs(), r.read_strs()) for _ in range(r.read_count())]
+        raw = r.read_bytes()
+        return cls(
+            contact_info=contact,
+            professional_profile=profile,
+            technical_skills=skills,
+            education=education,
+            work_experience=experience,
+            projects=projects,
+            raw_text=unpack_cv_text(raw) if raw else ""
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'CVData':
+        """Rebuild CVData from to_dict output"""
+        return cls(
+            contact_info=ContactInfo(**(data.get('contact_info') or {})),
+            professional_profile=data.get('professional_profile'),
+            technical_skills=data.get('technical_skills') or {},
+            education=[Education(**e) for e in data.get('education') or []],
+            work_experience=[WorkExperience(**w) for w in data.get('work_experience') or []],
+            projects=[Project(**p) for p in data.get('projects') or []],
+            raw_text=data.get('raw_text', '')
+        )
+
+
+# ------------------------------------------------------------------
+# Binary encoding helpers for CVData.to_bytes / from_bytes
+# ------------------------------------------------------------------
+
+_CV_BYTES_MAGIC = b'CVD\x01'
+_NONE_LEN = 0xFFFFFFFF
+
+
+def _pack_count(out: list, items):
+    out.append(struct.pack('<I', len(items)))
+
+
+def _pack_str(out: list, value: Optional[str]):
+    if value is None:
+        out.append(struct.pack('<I', _NONE_LEN))
+        return
+    encoded = str(value).encode('utf-8')
+    out.append(struct.pack('<I', len(encoded)))
+    out.append(encoded)
+
+
+def _pack_strs(out: list, values: Optional[List[str]]):
+    values = values or []
+    _pack_count(out, values)
+    for value in values:
+        _pack_str(out, value)
+
+
+class _Unpacker:
+    def __init__(self, data: bytes, offset: int = 0):
+        self.data = data
+        self.offset = offset
+
+    def read_count(self) -> int:
+        (n,) = struct.unpack_from('<I', self.data, self.offset)
+        self.offset += 4
+        return n
+
+    def read_bytes(self) -> bytes:
+        n = self.read_count()
+        value = self.data[self.offset:self.offset + n]
+        self.offset += n
+        return value
+
+    def read_str(self) -> Optional[str]:
+        n = self.read_count()
+        if n == _NONE_LEN:
+            return None
+        value = self.data[self.offset:self.offset + n].decode('utf-8')
+        self.offset += n
+        return value
+
+    def read_strs(self) -> List[str]:
+        return [self.read_str() for _ in range(self.read_count())]
+
+
+def pack_cv_text(text: str) -> bytes:
+    return zlib.compress((text or '').encode('utf-8'), 6)
+
+
+def unpack_cv_text(value: Union[str, bytes, None]) -> str:
+    """CV text as stored by pack_cv_text, or plain text passed through"""
+    if isinstance(value, (bytes, bytearray)):
+        return zlib.decompress(value).decode('utf-8')
+    return value or ""
+
+
+def compact_cv_text(text: str) -> Union[str, bytes]:
+    """
+    CV text for long-lived per-user stores: zlib-compressed unless
+    CV_RAW_TEXT_MODE is keep. Read it back with unpack_cv_text.
+    """
+    if RAW_TEXT_MODE == 'keep' or not text:
+        return text
+    return pack_cv_text(text)
+
+
+def build_profile_from_cv_data(cv_data: CVData) -> dict:
+    """Map parsed CV data to the flat candidate profile used across the app"""
+    skills = []
+    if cv_data.technical_skills:
+        for cat, s_list in cv_data.technical_skills.items():
+            skills.extend(s_list)
+
+    # Education
+    education_str = "Not specified"
+    if cv_data.education:
+        top_edu = cv_data.education[0]
+        education_str = top_edu.degree
+        if top_edu.institution:
+            education_str += f" at {top_edu.institution}"
+
+    # Experience Level Heuristic from work experience
+    exp_level = "Entry Level"
+    if cv_data.work_experience:
+        years_of_exp = len(cv_data.work_experience) * 1.5 # Rough estimate
+        if any('senior' in exp.title.lower() for exp in cv_data.work_experience):
+            exp_level = "Senior"
+        elif years_of_exp > 5:
+            exp_level = "Senior"
+        elif years_of_exp > 2:
+            exp_level = "Mid Level"
+
+    return {
+        "name": cv_data.contact_info.name or "Unknown",
+        "email": cv_data.contact_info.email or "",
+        "phone": cv_data.contact_info.phone or "",
+        "location": cv_data.contact_info.address or "",
+        "skills": list(set(skills)), # Unique skills
+        "experience_level": exp_level,
+        "education": education_str,
+        "strengths": skills[:5], # Use top skills as strengths
+        "career_goals": cv_data.professional_profile or "To leverage my skills in a challenging role."
+    }
+
+
+# Section header keywords, in priority order: a line naming several sections
+# is labelled with the first of them.
+SECTION_KEYWORDS = {
+    'contact': r'contact|personal|details|information',
+    'profile': r'professional\s+profile|profile|summary|objective|about\s+me',
+    'skills': r'technical\s+skills|skills|core\s+competencies|expertise|tools|technologies',
+    'education': r'education|academic|qualifications|studies',
+    'experience': r'work\s+experience|experience|employment|professional\s+experience|history',
+    'projects': r'projects|key\s+projects|portfolio',
+}
+
+SECTION_PATTERNS = {name: rf'(?i).*({keywords}).*' for name, keywords in SECTION_KEYWORDS.items()}
+
+CONTACT_PATTERNS = {
+    'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
+    'phone': r'(?:\+?27|0)[\s\-]?\d{2,3}[\s\-]?\d{3}[\s\-]?\d{4}|\d{10}|\+\d{1,3}[\s\-]?\d{2,4}[\s\-]?\d{3,4}[\s\-]?\d{3,4}',
+    'linkedin': r'(?:https?://)?(?:www\.)?linkedin\.com/in/[\w\-]+/?',
+    'github': r'(?:https?://)?(?:www\.)?github\.com/[\w\-]+/?',
+    'portfolio': r'(?:https?://)?[\w\-]+\.(?:vercel\.app|netlify\.app|herokuapp\.com|github\.io)[\w\-/]*',
+    'url': r'https?://[^\s]+',
+}
+
+DEGREE_KEYWORDS = ['BACHELOR', 'MASTER', 'DIPLOMA', 'CERTIFICATE', 'PHD', 'DOCTORATE', 'B.SC', 'M.SC', 'DEGREE', 'HONOURS', 'MATRIC']
+
+# Compiled once; every line is lowercased and classified in a single pass
+# (see classify_line). Case-sensitive patterns over the lowercased line are
+# several times faster than re.IGNORECASE.
+_SECTION_RE = re.compile('|'.join(f'(?P<{name}>{keywords})' for name, keywords in SECTION_KEYWORDS.items()))
+_SECTION_NAME_RES = {name: re.compile(keywords) for name, keywords in SECTION_KEYWORDS.items()}
+_CAPS_RE = re.compile(r'^[A-Z\s]{3,}$')
+_DATE_RE = re.compile(r'\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec|january|february|march|april|may|june|july|august|september|october|november|december)\b')
+_JOB_TITLE_RE = re.compile(r'\b(intern|developer|engineer|manager|analyst|consultant|specialist|lead|architect|designer)\b')
+_EMAIL_RE = re.compile(CONTACT_PATTERNS['email'])
+_PHONE_RE = re.compile(CONTACT_PATTERNS['phone'])
+_DIGIT_RE = re.compile(r'\d')
+_DEGREE_RE = re.compile('|'.join(re.escape(k.lower()) for k in DEGREE_KEYWORDS))
+_CONTACT_RES = {name: re.compile(pattern) for name, pattern in CONTACT_PATTERNS.items()}
+_ADDRESS_CITY_RE = re.compile(r'\b(?:johannesburg|pretoria|cape town|durban|midrand|sandton|london|new york|berlin|remote)\b', re.IGNORECASE)
+_STREET_ADDRESS_RE = re.compile(r'\d+.*(?:street|road|avenue|drive|st\.|rd\.)|\b\d{4,}\b', re.IGNORECASE)
+_NAME_LOCATION_RE = re.compile(r'\b(?:johannesburg|pretoria|cape town|durban|midrand|sandton|london|new york|berlin|remote|noordwyk|centurion|randburg|soweto|kempton)\b', re.IGNORECASE)
+_NAME_WORD_RE = re.compile(r"^[A-Za-z\-\'\.]+$")
+_YEAR_RE = re.compile(r'\b(19|20)\d{2}\b')
+_EDUCATION_SEPARATORS = [re.compile(sep) for sep in (
+    r'\s{2,}', # Multiple spaces
+    r'\s*\|\s*', # Pipe
+    r'\s+at\s+', # " at "
+    r'\s+from\s+', # " from "
+    r'\s*-\s*', # Dash
+    r',\s*' # Comma (risky, but common)
+)]
+
+
+def classify_header(line: str) -> Optional[str]:
+    """Section a (stripped) line names as a header candidate, or None"""
+    lower = line.lower()
+    match = _SECTION_RE.search(lower)
+    if match is None:
+        return None
+    # A line may name several sections; the first in SECTION_KEYWORDS order wins
+    for name, pattern in _SECTION_NAME_RES.items():
+        if name == match.lastgroup or pattern.search(lower):
+            return name
+    return match.lastgroup
+
+
+def _is_contact_line(lower: str) -> bool:
+    """Email, phone or profile URL; cheap substring checks before the regexes"""
+    if '://' in lower or 'linkedin' in lower or 'github' in lower or 'www.' in lower:
+        return True
+    if '@' in lower and _EMAIL_RE.search(lower):
+        return True
+    return _DIGIT_RE.search(lower) is not None and _PHONE_RE.search(lower) is not None
+
+
+@dataclass
+class LineLabel:
+    """What a single CV line looks like; computed once per line"""
+    text: str
+    header: Optional[str] = None  # section keyword the line contains
+    bullet: bool = False          # starts with •
+    caps: bool = False            # all-caps line (e.g. an unrecognised header)
+    date: bool = False            # mentions a month
+    contact: bool = False         # email, phone or profile URL
+    job_title: bool = False       # contains a common job title word
+    degree: bool = False          # contains a qualification keyword
+
+
+def classify_line(line: str) -> LineLabel:
+    lower = line.lower()
+    return LineLabel(
+        text=line,
+        header=classify_header(line),
+        bullet=line.startswith('•'),
+        caps=_CAPS_RE.match(line) is not None,
+        date=_DATE_RE.search(lower) is not None,
+        contact=_is_contact_line(lower),
+        job_title=_JOB_TITLE_RE.search(lower) is not None,
+        degree=_DEGREE_RE.search(lower) is not None,
+    )
+
+
+# Sections build_profile_from_cv_data depends on
+PROFILE_SECTIONS = ('skills', 'education', 'experience')
+
+
+def profile_sections_complete(pages: List[str]) -> bool:
+    """
+    Early-stop check for long PDFs: True once the skills, education and
+    experience headers have all appeared and the page after the last of
+    them has been read (so that section's content is in).
+    """
+    first_seen = {}
+    for page_no, text in enumerate(pages):
+        for line in text.split('\n'):
+            line = line.strip()
+            # Same header heuristic as CVParser.find_section_boundaries
+            if not line or len(line) >= 50:
+                continue
+            section_name = classify_header(line)
+            if section_name in PROFILE_SECTIONS:
+                first_seen.setdefault(section_name, page_no)
+    if len(first_seen) < len(PROFILE_SECTIONS):
+        return False
+    return len(pages) > max(first_seen.values()) + 1
+
 
 class CVParser:
     """Rule-based CV parser"""
     
     # Common section headers in CVs
-    SECTION_PATTERNS = {
-        'contact': r'(?i).*(contact|personal|details|information).*',
-        'profile': r'(?i).*(professional\s+profile|profile|summary|objective|about\s+me).*',
-        'skills': r'(?i).*(technical\s+skills|skills|core\s+competencies|expertise|tools|technologies).*',
-        'education': r'(?i).*(education|academic|qualifications|studies).*',
-        'experience': r'(?i).*(work\s+experience|experience|employment|professional\s+experience|history).*',
-        'projects': r'(?i).*(projects|key\s+projects|portfolio).*',
-    }
+    SECTION_PATTERNS = SECTION_PATTERNS
     
-    CONTACT_PATTERNS = {
-        'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-        'phone': r'(?:\+?27|0)[\s\-]?\d{2,3}[\s\-]?\d{3}[\s\-]?\d{4}|\d{10}|\+\d{1,3}[\s\-]?\d{2,4}[\s\-]?\d{3,4}[\s\-]?\d{3,4}',
-        'linkedin': r'(?:https?://)?(?:www\.)?linkedin\.com/in/[\w\-]+/?',
-        'github': r'(?:https?://)?(?:www\.)?github\.com/[\w\-]+/?',
-        'portfolio': r'(?:https?://)?[\w\-]+\.(?:vercel\.app|netlify\.app|herokuapp\.com|github\.io)[\w\-/]*',
-        'url': r'https?://[^\s]+',
-    }
+    CONTACT_PATTERNS = CONTACT_PATTERNS
     
     # Headers that should NOT be treated as names
     SKIP_AS_NAME = [
@@ -139,13 +479,24 @@ class CVParser:
         'react native', 'flutter', 'ionic', 'electron', 'unity', 'unreal'
     ]
     
-    def __init__(self, file_path: str = None, raw_text: str = None):
-        """Initialize parser with PDF path or raw text"""
-        self.file_path = file_path
+    def __init__(self, file_path: str = None, raw_text: str = None, document: Optional[ExtractedDocument] = None):
+        """Initialize parser with PDF path, raw text, or an already extracted document"""
+        self.document = document
+        self.file_path = file_path or (document.path if document else None)
         self.raw_text = raw_text or ""
         self.lines = []
-        if self.raw_text:
+        if self.raw_text and document is None:
              self.lines = [line.strip() for line in self.raw_text.split('\n') if line.strip()]
+        self._labels = []
+        self._labels_for = None
+
+    @property
+    def labels(self) -> List[LineLabel]:
+        """One LineLabel per entry in self.lines, classified once per text"""
+        if self._labels_for is not self.lines:
+            self._labels = [classify_line(line) for line in self.lines]
+            self._labels_for = self.lines
+        return self._labels
     
     def _sanitize_pdf_text(self, text: str) -> str:
         """Clean up common PDF extraction artifacts"""
@@ -196,24 +547,20 @@ class CVParser:
         
     def extract_text(self) -> str:
         """Extract text from PDF preserving structure, or return provided raw text"""
-        if self.raw_text and not self.file_path:
+        if self.document is not None:
+            # Already decoded by the extraction service; don't open the file again
+            self.raw_text = self.document.raw_text
+        elif self.raw_text and not self.file_path:
             # Sanitize provided raw text too
             self.raw_text = self._sanitize_pdf_text(self.raw_text)
             self.lines = [line.strip() for line in self.raw_text.split('\n') if line.strip()]
             return self.raw_text
-
-        if self.file_path and self.file_path.lower().endswith('.pdf'):
-            text_parts = []
-            try:
-                with pdfplumber.open(self.file_path) as pdf:
-                    for page in pdf.pages:
-                        # Extract text with layout preservation
-                        page_text = page.extract_text()
-                        if page_text:
-                            text_parts.append(page_text)
-                self.raw_text = "\n".join(text_parts)
-            except Exception as e:
-                print(f"pdfplumber extraction failed: {e}")
+        elif self.file_path and self.file_path.lower().endswith('.pdf'):
+            self.document = extract_pdf(self.file_path, stop_when=profile_sections_complete)
+            if self.document.raw_text:
+                self.raw_text = self.document.raw_text
+            else:
+                print(f"PDF extraction failed for {self.file_path}")
                 # Fallback handled by caller or kept empty if raw_text was provided
         
         # Sanitize the extracted text
@@ -231,27 +578,27 @@ class CVParser:
         search_text = "\n".join(self.lines[:30])
         
         # Extract email first (needed for name fallback)
-        email_match = re.search(self.CONTACT_PATTERNS['email'], search_text)
+        email_match = _CONTACT_RES['email'].search(search_text)
         if email_match:
             contact.email = email_match.group(0)
         
         # Extract phone
-        phone_match = re.search(self.CONTACT_PATTERNS['phone'], search_text)
+        phone_match = _CONTACT_RES['phone'].search(search_text)
         if phone_match:
             contact.phone = phone_match.group(0)
         
         # Extract LinkedIn
-        linkedin_match = re.search(self.CONTACT_PATTERNS['linkedin'], search_text)
+        linkedin_match = _CONTACT_RES['linkedin'].search(search_text)
         if linkedin_match:
             contact.linkedin = linkedin_match.group(0)
         
         # Extract GitHub
-        github_match = re.search(self.CONTACT_PATTERNS['github'], search_text)
+        github_match = _CONTACT_RES['github'].search(search_text)
         if github_match:
             contact.github = github_match.group(0)
         
         # Extract portfolio
-        portfolio_match = re.search(self.CONTACT_PATTERNS['portfolio'], search_text)
+        portfolio_match = _CONTACT_RES['portfolio'].search(search_text)
         if portfolio_match:
             contact.portfolio = portfolio_match.group(0)
         
@@ -261,7 +608,7 @@ class CVParser:
                 contact.address = line.split(':', 1)[1].strip() if ':' in line else line
                 break
             # Look for city/area names
-            elif re.search(r'\b(?:johannesburg|pretoria|cape town|durban|midrand|sandton|london|new york|berlin|remote)\b', line, re.I):
+            elif _ADDRESS_CITY_RE.search(line):
                 if not any(x in line.lower() for x in ['phone', 'email', 'http', '.com']):
                     contact.address = line
                     break
@@ -275,7 +622,8 @@ class CVParser:
         """Extract name using multiple strategies"""
         # Strategy 1: Look for the first line that looks like a name
         # (not a section header, not an email, not a phone, etc.)
-        for i, line in enumerate(self.lines[:15]):
+        for label in self.labels[:15]:
+            line = label.text
             line_lower = line.lower().strip()
             
             # Skip if it's a common section header
@@ -283,28 +631,22 @@ class CVParser:
                 continue
             
             # Skip if it contains email, phone, or URL patterns
-            if re.search(self.CONTACT_PATTERNS['email'], line):
-                continue
-            if re.search(self.CONTACT_PATTERNS['phone'], line):
-                continue
-            if re.search(r'https?://', line):
-                continue
-            if re.search(r'linkedin|github|www\.', line, re.I):
+            if label.contact:
                 continue
             
             # Skip if it looks like an address (contains numbers with other chars)
-            if re.search(r'\d+.*(?:street|road|avenue|drive|st\.|rd\.)|\b\d{4,}\b', line, re.I):
+            if _STREET_ADDRESS_RE.search(line):
                 continue
             
             # Skip if it looks like a location (contains city names)
-            if re.search(r'\b(?:johannesburg|pretoria|cape town|durban|midrand|sandton|london|new york|berlin|remote|noordwyk|centurion|randburg|soweto|kempton)\b', line, re.I):
+            if _NAME_LOCATION_RE.search(line):
                 continue
             
             # Check if it looks like a name (2-5 words, mostly letters)
             words = line.split()
             if 1 <= len(words) <= 5:
                 # Name words should be mostly alphabetic
-                alpha_words = sum(1 for w in words if re.match(r'^[A-Za-z\-\'\.]+$', w))
+                alpha_words = sum(1 for w in words if _NAME_WORD_RE.match(w))
                 if alpha_words >= len(words) * 0.5:
                     # Capitalize each word properly
                     name_parts = []
@@ -317,7 +659,7 @@ class CVParser:
         
         # Strategy 2: Extract from email prefix
         search_text = "\n".join(self.lines[:30])
-        email_match = re.search(self.CONTACT_PATTERNS['email'], search_text)
+        email_match = _CONTACT_RES['email'].search(search_text)
         if email_match:
             email = email_match.group(0)
             prefix = email.split('@')[0]
@@ -339,19 +681,16 @@ class CVParser:
         current_section = None
         section_start = 0
         
-        for i, line in enumerate(self.lines):
+        for i, label in enumerate(self.labels):
             # Check if line matches any section pattern
             # Heuristic: Section headers are usually short and distinct
-            if len(line) < 50: 
-                for section_name, pattern in self.SECTION_PATTERNS.items():
-                    if re.match(pattern, line.strip()):
-                        # Save previous section if exists
-                        if current_section:
-                            sections[current_section] = (section_start, i)
-                        
-                        current_section = section_name
-                        section_start = i + 1
-                        break
+            if label.header and len(label.text) < 50:
+                # Save previous section if exists
+                if current_section:
+                    sections[current_section] = (section_start, i)
+                
+                current_section = label.header
+                section_start = i + 1
         
         # Add last section
         if current_section:
@@ -365,14 +704,7 @@ class CVParser:
             return None
         
         start, end = sections['profile']
-        profile_lines = []
-        
-        for line in self.lines[start:end]:
-            # Stop at next section or bullet points
-            if re.match(r'^[A-Z\s]{3,}$', line) and len(line) < 40 and " " not in line.strip():  
-                 pass
-
-            profile_lines.append(line)
+        profile_lines = [label.text for label in self.labels[start:end]]
         
         return " ".join(profile_lines).strip()
 
@@ -384,9 +716,9 @@ class CVParser:
             start, end = sections['skills']
             current_category = "General"
             
-            for line in self.lines[start:end]:
+            for label in self.labels[start:end]:
                 # Clean the line first
-                line = self._sanitize_pdf_text(line)
+                line = self._sanitize_pdf_text(label.text)
                 
                 if ':' in line:
                     parts = line.split(':', 1)
@@ -399,7 +731,7 @@ class CVParser:
                         skills[category] = parsed_skills
                         current_category = category
                 
-                elif current_category and line and not re.match(r'^[A-Z\s]{3,}$', line):
+                elif current_category and line and not label.caps:
                     # Split and clean additional skills
                     parsed_skills = self._split_concatenated_skills(line)
                     if parsed_skills:
@@ -467,15 +799,16 @@ class CVParser:
         education_list = []
         current_entry = None
         
-        for line in self.lines[start:end]:
+        for label in self.labels[start:end]:
+            line = label.text
             # Look for degree indicators
-            if any(keyword in line.upper() for keyword in ['BACHELOR', 'MASTER', 'DIPLOMA', 'CERTIFICATE', 'PHD', 'DOCTORATE', 'B.SC', 'M.SC', 'DEGREE', 'HONOURS', 'MATRIC']):
+            if label.degree:
                 # Save previous entry
                 if current_entry:
                     education_list.append(current_entry)
                 
                 # Extract year if present
-                year_match = re.search(r'\b(19|20)\d{2}\b', line)
+                year_match = _YEAR_RE.search(line)
                 year = year_match.group(0) if year_match else None
                 
                 # Try smarter extraction of Degree vs Institution
@@ -483,17 +816,8 @@ class CVParser:
                 institution = ""
                 
                 # Common separators
-                separators = [
-                    r'\s{2,}', # Multiple spaces
-                    r'\s*\|\s*', # Pipe
-                    r'\s+at\s+', # " at "
-                    r'\s+from\s+', # " from "
-                    r'\s*-\s*', # Dash
-                    r',\s*' # Comma (risky, but common)
-                ]
-                
-                for sep in separators:
-                    parts = re.split(sep, line)
+                for sep in _EDUCATION_SEPARATORS:
+                    parts = sep.split(line)
                     if len(parts) > 1 and len(parts[0]) > 3: # Ensure split parts aren't tiny
                         degree = parts[0].strip()
                         institution = parts[1].strip()
@@ -509,14 +833,11 @@ class CVParser:
                 )
             
             # Bullet points or details for current entry
-            elif current_entry and line.startswith('•'):
+            elif current_entry and label.bullet:
                 current_entry.details.append(line[1:].strip())
-            elif current_entry and line and not re.match(r'^[A-Z\s]{3,}$', line):
+            elif current_entry and line and not label.caps:
                  # Verify it's not a section match before appending
-                 is_section = False
-                 if len(line) < 40:
-                     for p in self.SECTION_PATTERNS.values():
-                         if re.match(p, line): is_section = True; break
+                 is_section = len(line) < 40 and label.header is not None
                  if not is_section:
                      current_entry.details.append(line)
         
@@ -535,12 +856,13 @@ class CVParser:
         experiences = []
         current_entry = None
         
-        for line in self.lines[start:end]:
+        for label in self.labels[start:end]:
+            line = label.text
             # Look for job title pattern (ends with pipe or followed by company)
             # Heuristic: Contains common job words
-            if '|' in line or re.search(r'\b(intern|developer|engineer|manager|analyst|consultant|specialist|lead|architect|designer)\b', line, re.I):
+            if '|' in line or label.job_title:
                 # Check if this looks like a title line
-                if not line.startswith('•'):
+                if not label.bullet:
                     # Save previous entry
                     if current_entry:
                         experiences.append(current_entry)
@@ -561,14 +883,14 @@ class CVParser:
                     )
             
             # Look for date ranges
-            elif current_entry and re.search(r'\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec|january|february|march|april|may|june|july|august|september|october|november|december)\b', line, re.I):
+            elif current_entry and label.date:
                  # Matches lines with dates
                  current_entry.duration = line
             
             # Bullet points for responsibilities
-            elif current_entry and line.startswith('•'):
+            elif current_entry and label.bullet:
                 current_entry.responsibilities.append(line[1:].strip())
-            elif current_entry and line and not re.match(r'^[A-Z\s]{3,}$', line):
+            elif current_entry and line and not label.caps:
                 # Additional details
                 if len(line) > 20:  # Avoid capturing section headers
                     current_entry.responsibilities.append(line)
@@ -588,7 +910,8 @@ class CVParser:
         projects = []
         current_project = None
         
-        for line in self.lines[start:end]:
+        for label in self.labels[start:end]:
+            line = label.text
             # Look for project name (usually bold or first line)
             if '|' in line:
                 # Save previous project
@@ -613,9 +936,9 @@ class CVParser:
                 current_project.technologies = [t.strip() for t in techs if t.strip()]
             
             # Bullet points for project details
-            elif current_project and line.startswith('•'):
+            elif current_project and label.bullet:
                 current_project.details.append(line[1:].strip())
-            elif current_project and line and not re.match(r'^[A-Z\s]{3,}$', line):
+            elif current_project and line and not label.caps:
                 if len(line) > 15:
                     current_project.details.append(line)
         
@@ -654,20 +977,13 @@ class CVParser:
             projects=projects,
             raw_text=self.raw_text
         )
+        cv_data.release_raw_text()
         
         return cv_data
     
     def to_dict(self, cv_data: CVData) -> dict:
         """Convert CV data to dictionary"""
-        result = {
-            'contact_info': asdict(cv_data.contact_info),
-            'professional_profile': cv_data.professional_profile,
-            'technical_skills': cv_data.technical_skills,
-            'education': [asdict(edu) for edu in cv_data.education],
-            'work_experience': [asdict(exp) for exp in cv_data.work_experience],
-            'projects': [asdict(proj) for proj in cv_data.projects],
-        }
-        return result
+        return cv_data.to_dict()
     
     def to_json(self, cv_data: CVData, indent: int = 2) -> str:
         """Convert CV data to JSON string"""
@@ -6,10 +6,18 @@ With robust fallback using CVBuilder when AI fails
 
 import os
 from datetime import datetime
-from .scraping import extract_job_keywords
-from agents import application_writer
+from .job_features import get_job_features
+from agents import application_writer, routed_agent
 from .cv_templates import CVTemplates, CVBuilder
 from .pdf_generator import PDFGenerator
+from .cv_versions import CVVersionStore, new_version_id
+from .cv_master import MasterCV
+from .llm_cache import get_llm_cache, hash_job, hash_profile, hash_text
+from .structured_output import TailoredCVOutput, extract_json, parse_structured
+from .prompt_builder import (
+    PromptBuilder, format_job, format_keywords, format_profile,
+    CV_TOKEN_BUDGET, JOB_TOKEN_BUDGET, KEYWORDS_TOKEN_BUDGET, PROFILE_TOKEN_BUDGET
+)
 
 class CVTailoringEngine:
     """
@@ -28,7 +36,19 @@ class CVTailoringEngine:
         self.master_cv = master_cv
         self.profile = student_profile
         self.parsed_cv_data = parsed_cv_data
-        self.cv_versions = {}
+        # Recent versions in memory, older ones spilled to disk
+        self.cv_versions = CVVersionStore()
+        # Header, parsed data and rendered sections derived from master_cv once per engine
+        self._master = MasterCV(master_cv, parsed_cv_data)
+
+    def _get_parsed_cv_data(self):
+        """
+        Parsed master CV (from the parsed CV cache or parsed once per engine,
+        see MasterCV.parsed_cv_data)
+        """
+        if not self.parsed_cv_data:
+            self.parsed_cv_data = self._master.parsed_cv_data()
+        return self.parsed_cv_data
 
     def _build_cv_from_parsed_data(self, job_posting: dict, template_type: str = 'modern') -> str:
         """
@@ -43,15 +63,7 @@ class CVTailoringEngine:
             Formatted CV content as markdown string
         """
         # Try to get parsed CV data - if not provided, try to parse master_cv
-        cv_data = self.parsed_cv_data
-        if not cv_data and self.master_cv:
-            try:
-                from .cv_parser import CVParser
-                parser = CVParser(raw_text=self.master_cv)
-                cv_data = parser.parse()
-            except Exception as e:
-                print(f"Could not parse master CV: {e}")
-                cv_data = None
+        cv_data = self._get_parsed_cv_data()
         
         # Create CVBuilder with available data
         builder = CVBuilder(
@@ -72,14 +84,7 @@ class CVTailoringEngine:
         """
         Build a structured cover letter using CVBuilder from parsed CV data.
         """
-        cv_data = self.parsed_cv_data
-        if not cv_data and self.master_cv:
-            try:
-                from .cv_parser import CVParser
-                parser = CVParser(raw_text=self.master_cv)
-                cv_data = parser.parse()
-            except Exception:
-                cv_data = None
+        cv_data = self._get_parsed_cv_data()
         
         builder = CVBuilder(
             cv_data=cv_data,
@@ -90,35 +95,10 @@ class CVTailoringEngine:
 
     def _extract_json_from_text(self, text):
         """
-        Robustly extract JSON from text, handling code blocks and raw JSON
+        Robustly extract JSON from text, handling code blocks, raw JSON and
+        near-miss JSON (see utils.structured_output.repair_json)
         """
-        try:
-            import json
-            content = text.content if hasattr(text, 'content') else str(text)
-            
-            # Remove markdown code blocks if present
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0].strip()
-            elif "```" in content: # Generic code block
-                 parts = content.split("```")
-                 if len(parts) >= 2:
-                    content = parts[1].strip()
-
-            # Attempt to find JSON object structure
-            if "{" in content and "}" in content:
-                start = content.find("{")
-                end = content.rfind("}") + 1
-                candidate = content[start:end]
-                try:
-                    return json.loads(candidate)
-                except json.JSONDecodeError:
-                    pass # Continue to try raw content if this fails
-            
-            # Try to parse the cleaned content directly
-            return json.loads(content)
-        except Exception as e:
-            # print(f"JSON extraction failed: {e}")
-            return None
+        return extract_json(text)
 
     def _sanitize_filename(self, name):
         """
@@ -133,18 +113,22 @@ class CVTailoringEngine:
         name = re.sub(r'\s+', '_', name)
         return name.strip('_')
 
-    def generate_tailored_cv(self, job_posting, template_type=None):
+    def generate_tailored_cv(self, job_posting, template_type=None, regenerate=False, on_delta=None):
         """
-        Create customized CV for specific job application
+        Create customized CV for specific job application.
+        The AI response is cached per CV, job, template and profile;
+        regenerate=True asks the model again. on_delta receives the raw
+        response text as it streams in.
+
+        Returns:
+            (cv_content, ats_analysis, version_id) of the version created by
+            this call; version_id is None if no version could be generated
         """
         try:
-            # Extract job requirements
-            job_description = job_posting.get('description', '')
-            if not job_description:
+            # Job requirements come from the job's memoized features
+            if not job_posting.get('description'):
                 print("⚠️ No job description available for CV tailoring")
-                job_description = f"{job_posting.get('title', 'Position')} at {job_posting.get('company', 'Company')}"
-            
-            job_keywords = extract_job_keywords(job_description)
+            job_features = get_job_features(job_posting)
             
             # Determine template if not provided
             if not template_type:
@@ -158,17 +142,14 @@ class CVTailoringEngine:
             
             selected_template = CVTemplates.get_template(template_type)
 
-            # Use consolidated application_writer for both ATS optimization and CV rewriting
-            tailored_result = application_writer.run(f"""
+            prompt = (PromptBuilder('tailored_cv')
+                      .add('Master CV', self.master_cv, CV_TOKEN_BUDGET)
+                      .add('Job Posting', format_job(job_posting), JOB_TOKEN_BUDGET)
+                      .add('Job Keywords', format_keywords(job_features.skills), KEYWORDS_TOKEN_BUDGET)
+                      .add('Student Profile', format_profile(self.profile, self.master_cv), PROFILE_TOKEN_BUDGET)
+                      .add('REQUIRED STRUCTURE (Follow this strictly)', selected_template)
+                      .instructions("""
             Create an optimized CV package for this job using the specified structure.
-            
-            Master CV: {self.master_cv}
-            Job Posting: {job_posting}
-            Job Keywords: {job_keywords}
-            Student Profile: {self.profile}
-            
-            REQUIRED STRUCTURE (Follow this strictly):
-            {selected_template}
 
             Instructions:
             1. Optimize for ATS compatibility (score 85+)
@@ -179,7 +160,7 @@ class CVTailoringEngine:
             6. Add relevant projects/coursework if needed
             
             Return the response in strict JSON format with the following structure:
-            {{
+            {
                 "cv_content": "Full markdown of the CV",
                 "ats_analysis": "Brief ATS analysis",
                 "ats_score": 0,
@@ -187,44 +168,37 @@ class CVTailoringEngine:
                 "experience": ["Bullet points for roles/projects"],
                 "projects": ["Bullet points for projects"],
                 "education": ["Bullet points for education"]
-            }}
+            }
             """)
+                      .build())
+
+            # Use consolidated application_writer for both ATS optimization and CV rewriting
+            # The model is constrained to the TailoredCVOutput schema; replies are
+            # still validated (and repaired if needed) before use. The model router
+            # picks the fastest healthy model of the tailoring tier
+            writer = routed_agent(application_writer, 'tailoring', schema=TailoredCVOutput)
+            tailored_result = get_llm_cache().run(writer, prompt.text,
+                'tailored_cv', regenerate=regenerate, on_delta=on_delta,
+                validate=lambda response: parse_structured(response, TailoredCVOutput) is not None,
+                cv=hash_text(self.master_cv), job=hash_job(job_posting),
+                template=str(template_type).upper(), profile=hash_profile(self.profile))
 
             # Parse the response
-            parsed_result = self._extract_json_from_text(tailored_result)
+            output = parse_structured(tailored_result, TailoredCVOutput)
             header = self._extract_header_info()
             
-            try:
-                if not parsed_result:
-                     raise ValueError("Failed to extract JSON from response")
-
-                cv_content = (
-                    parsed_result.get('cv_content')
-                    or parsed_result.get('optimized_cv')
-                    or parsed_result.get('cv_markdown')
-                    or parsed_result.get('cv')
-                )
-                
-                # Fallback if cv_content is still None but we parsed something
-                if not cv_content:
-                     # Try to use the raw content if JSON didn't contain the key
-                     # This happens if the model returns just the CV text in strict mode sometimes
-                     content_str = tailored_result.content if hasattr(tailored_result, 'content') else str(tailored_result)
-                     if "```" not in content_str and len(content_str) > 100:
-                         cv_content = content_str
-                     else:
-                         cv_content = ""
-
-                ats_analysis = parsed_result.get('ats_analysis', "Analysis not available")
-                ats_score = parsed_result.get('ats_score')
+            if output:
+                cv_content = output.cv_content
+                ats_analysis = output.ats_analysis
+                ats_score = output.ats_score
                 sections = {
-                    'summary': parsed_result.get('summary') or '',
-                    'experience': parsed_result.get('experience') or [],
-                    'projects': parsed_result.get('projects') or [],
-                    'education': parsed_result.get('education') or []
+                    'summary': output.summary,
+                    'experience': output.experience,
+                    'projects': output.projects,
+                    'education': output.education
                 }
-            except Exception as e:
-                print(f"Error parsing AI response: {e}")
+            else:
+                print("AI response did not match the tailored CV schema")
                 # Fallback: treat the whole response as CV content if parsing fails
                 cv_content = tailored_result.content if hasattr(tailored_result, 'content') else str(tailored_result)
                 ats_analysis = "Parsing failed"
@@ -237,7 +211,7 @@ class CVTailoringEngine:
             # Generate version ID
             company_name = self._sanitize_filename(job_posting.get('company', 'Unknown'))
             role_name = self._sanitize_filename(job_posting.get('title', 'Position'))
-            version_id = f"{company_name}_{role_name}_{datetime.now().strftime('%Y%m%d_%H%M')}"
+            version_id = new_version_id(company_name, role_name)
 
             # Ensure non-empty content by using CVBuilder fallback if needed
             if not cv_content or len(cv_content.strip()) < 50:
@@ -245,15 +219,15 @@ class CVTailoringEngine:
                 cv_content = self._build_cv_from_parsed_data(job_posting, template_type or 'modern')
                 ats_analysis = ats_analysis or "CV generated using structured builder from parsed data."
             if ats_score is None:
-                ats_score = self._estimate_ats_score(job_keywords, sections, cv_content)
+                ats_score = self._estimate_ats_score(job_features.skills, sections, cv_content)
                 ats_analysis = ats_analysis or "Estimated ATS score based on content analysis."
 
-            self.cv_versions[version_id] = {
+            version = {
                 'cv_content': cv_content,
                 'ats_analysis': ats_analysis,
                 'ats_score': ats_score,
                 'job_match_score': job_posting.get('match_score', 0),
-                'job_keywords': job_keywords,
+                'job_keywords': job_features.skills,
                 'created_at': datetime.now(),
                 'job_url': job_posting.get('url', ''),
                 'job_title': job_posting.get('title', ''),
@@ -261,29 +235,30 @@ class CVTailoringEngine:
                 'template_type': template_type.lower(),
                 'sections': sections
             }
-
-            return self.cv_versions[version_id]['cv_content'], self.cv_versions[version_id]['ats_analysis']
+            self.cv_versions[version_id] = version
+            return version['cv_content'], version['ats_analysis'], version_id
         except Exception as e:
             print(f"Error generating tailored CV: {e}")
             try:
                 # Last-resort fallback: minimal CV using master_cv content
                 company_name = self._sanitize_filename(job_posting.get('company', 'Unknown'))
                 role_name = self._sanitize_filename(job_posting.get('title', 'Position'))
-                version_id = f"{company_name}_{role_name}_{datetime.now().strftime('%Y%m%d_%H%M')}"
+                version_id = new_version_id(company_name, role_name)
                 
                 # Use CVBuilder for robust fallback content
                 content = self._build_cv_from_parsed_data(job_posting, template_type or 'modern')
+                job_skills = get_job_features(job_posting).skills
                 
-                self.cv_versions[version_id] = {
+                version = {
                     'cv_content': content,
                     'ats_analysis': 'Generated using CVBuilder fallback.',
                     'ats_score': self._estimate_ats_score(
-                        extract_job_keywords(job_posting.get('description','') or ''),
+                        job_skills,
                         {'summary': '', 'experience': [], 'projects': [], 'education': []},
                         content
                     ),
                     'job_match_score': job_posting.get('match_score', 0),
-                    'job_keywords': extract_job_keywords(job_posting.get('description','') or ''),
+                    'job_keywords': job_skills,
                     'created_at': datetime.now(),
                     'job_url': job_posting.get('url', ''),
                     'job_title': job_posting.get('title', ''),
@@ -291,10 +266,11 @@ class CVTailoringEngine:
                     'template_type': (template_type or 'professional').lower(),
                     'sections': {'summary': '', 'experience': [], 'projects': [], 'education': []}
                 }
-                return self.cv_versions[version_id]['cv_content'], self.cv_versions[version_id]['ats_analysis']
+                self.cv_versions[version_id] = version
+                return version['cv_content'], version['ats_analysis'], version_id
             except Exception as inner_e:
                 print(f"CVBuilder fallback also failed: {inner_e}")
-                return None, f"Error: {e}"
+                return None, f"Error: {e}", None
 
     def get_cv_version(self, version_id):
         """
@@ -302,6 +278,14 @@ class CVTailoringEngine:
         """
         return self.cv_versions.get(version_id)
 
+    def restore_cv_version(self, version_id, cv_version):
+        """
+        Register a CV version generated earlier (e.g. by a preview) so it can
+        be exported without tailoring again
+        """
+        self.cv_versions[version_id] = dict(cv_version)
+        return self.cv_versions[version_id]
+
     def list_cv_versions(self):
         """
         List all generated CV versions
@@ -405,50 +389,20 @@ class CVTailoringEngine:
         else:
             raise Exception("PDF generation failed")
 
+    def _master_header_info(self):
+        """
+        Name, title, email, phone and location found in the master CV.
+        Extracted once per engine; callers get a copy.
+        """
+        return self._master.header_info()
+
     def _extract_header_info(self):
-        text = self.master_cv or ''
-        lines = [l.strip() for l in text.splitlines() if l.strip()]
-        name = ''
-        if lines:
-            candidates = []
-            for l in lines[:5]:
-                ll = l.lower()
-                if '@' in l or 'linkedin' in ll or 'github' in ll or 'curriculum vitae' in ll:
-                    continue
-                if len(l.split()) <= 5:
-                    candidates.append(l)
-            if candidates:
-                name = candidates[0]
-        import re
-        email_match = re.search(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", text)
-        email = email_match.group(0) if email_match else ''
-        phone_match = re.search(r"(\+?\d[\d\s\-]{7,}\d)", text)
-        phone = phone_match.group(0) if phone_match else ''
-        loc_match = None
-        for l in lines[:15]:
-            ll = l.lower()
-            if ll.startswith('location:') or ll.startswith('address:'):
-                loc_match = l.split(':', 1)[1].strip()
-                break
-            if re.search(r"\b(Cape Town|Johannesburg|Pretoria|Durban|Sandton|South Africa|Gauteng|Western Cape)\b", l, re.IGNORECASE):
-                loc_match = l.strip()
-                break
-        location = loc_match or ''
-        title = ''
-        if len(lines) > 1:
-            for l in lines[1:6]:
-                if '@' in l:
-                    continue
-                if len(l.split()) <= 6:
-                    title = l
-                    break
-        header = {
-            'name': name,
-            'title': title,
-            'email': email,
-            'phone': phone,
-            'location': location
-        }
+        """
+        Header for rendered documents: the master CV's contact details plus
+        links from the current profile (read on every call since profile
+        updates change them in place)
+        """
+        header = self._master_header_info()
         try:
             prof = self.profile
             import json
@@ -535,18 +489,29 @@ class CVTailoringEngine:
 
         return comparison
 
-    def generate_cover_letter(self, job_posting, tailored_cv=None, output_dir='tailored_cvs'):
+    def generate_cover_letter(self, job_posting, tailored_cv=None, output_dir='tailored_cvs', regenerate=False):
         """
         Create job-specific cover letter
         """
         try:
             # Use the consolidated markdown generation method
-            content = self._generate_cover_letter_markdown(job_posting, tailored_cv)
-            
-            # Save as PDF
+            content = self._generate_cover_letter_markdown(job_posting, tailored_cv, regenerate=regenerate)
+            pdf_path = self.save_cover_letter(job_posting, content, output_dir)
+            if pdf_path:
+                return pdf_path
+        except Exception as e:
+            print(f"Error generating cover letter: {e}")
+            return self._generate_cover_letter_fallback(job_posting, tailored_cv)
+
+    def save_cover_letter(self, job_posting, content, output_dir='tailored_cvs'):
+        """
+        Render cover letter markdown (generated or previewed) to PDF.
+        Returns the PDF path, or None if rendering failed.
+        """
+        try:
             company_name = self._sanitize_filename(job_posting.get('company', 'Unknown'))
             role_name = self._sanitize_filename(job_posting.get('title', 'Position'))
-            version_id = f"CL_{company_name}_{role_name}_{datetime.now().strftime('%Y%m%d_%H%M')}"
+            version_id = new_version_id('CL', company_name, role_name)
             
             os.makedirs(output_dir, exist_ok=True)
             pdf_path = f"{output_dir}/{version_id}.pdf"
@@ -580,10 +545,17 @@ class CVTailoringEngine:
             except Exception:
                 pass
         except Exception as e:
-            print(f"Error generating cover letter: {e}")
-            return self._generate_cover_letter_fallback(job_posting, tailored_cv)
+            print(f"Error saving cover letter: {e}")
+        return None
 
     def _build_sections(self, cv_data):
+        """
+        HTML sections for a CV version, memoized per version content and
+        profile so previews, PDFs and applications of one version share them
+        """
+        return self._master.sections(cv_data, self.profile, self._derive_sections)
+
+    def _derive_sections(self, cv_data):
         skills = []
         prof = self.profile
         try:
@@ -645,12 +617,15 @@ class CVTailoringEngine:
             'education_html': education_html
         }
 
-    def _generate_cover_letter_markdown(self, job_posting, tailored_cv=None):
+    def _generate_cover_letter_markdown(self, job_posting, tailored_cv=None, regenerate=False, on_delta=None):
         try:
             company_research = self._research_company(job_posting['company'])
             cv_content = tailored_cv if tailored_cv else self.master_cv
             prompt = self._build_cover_letter_prompt(job_posting, cv_content, company_research)
-            cover_letter = application_writer.run(prompt)
+            cover_letter = get_llm_cache().run(
+                routed_agent(application_writer, 'tailoring'), prompt, 'cover_letter', regenerate=regenerate, on_delta=on_delta,
+                cv=hash_text(cv_content), job=hash_job(job_posting), profile=hash_profile(self.profile)
+            )
             content = self._extract_content(cover_letter)
             content = self._extract_content(cover_letter)
             
@@ -668,13 +643,13 @@ class CVTailoringEngine:
         """
         Build the prompt for cover letter generation
         """
-        return f"""
-        Create cover letter for:
-
-        Student Profile: {self.profile}
-        CV Content: {cv_content}
-        Job Posting: {job_posting}
-        Company Research: {company_research}
+        return (PromptBuilder('cover_letter')
+                .add('Student Profile', format_profile(self.profile, cv_content), PROFILE_TOKEN_BUDGET)
+                .add('CV Content', cv_content, CV_TOKEN_BUDGET)
+                .add('Job Posting', format_job(job_posting), JOB_TOKEN_BUDGET)
+                .add('Company Research', company_research)
+                .instructions("""
+        Create cover letter for the job above.
 
         Ensure letter is:
         - Tailored to specific role and company
@@ -684,7 +659,8 @@ class CVTailoringEngine:
         - 250-400 words
         - Uses STAR method for examples
         - Format as Markdown with bolding for emphasis
-        """
+        """)
+                .build().text)
 
     def _extract_content(self, response):
         """
@@ -0,0 +1,176 @@
+"""
+CV Version Store
+Tailored CV versions of one engine: the most recent ones stay in memory,
+older ones are spilled as compressed JSON to a SQLite store shared by the
+worker processes and loaded back on demand. Version IDs are unique even for
+several applications to the same job within a second.
+"""
+
+import base64
+import json
+import logging
+import os
+import threading
+import uuid
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from .cache import TTLCache, SQLiteCacheBackend
+
+logger = logging.getLogger(__name__)
+
+CV_VERSIONS_IN_MEMORY = int(os.getenv('CV_VERSIONS_IN_MEMORY', '5'))
+
+_DATETIME_FIELDS = ('created_at',)
+
+
+def new_version_id(*parts: str) -> str:
+    """'<part>_<part>_<YYYYmmdd_HHMMSS>_<random>', e.g. Acme_Data_Analyst_20250101_093000_1a2b3c"""
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return '_'.join([p for p in parts if p] + [stamp, uuid.uuid4().hex[:6]])
+
+
+def pack_version(version: Dict[str, Any]) -> str:
+    """Compact text form of a version (zlib-compressed JSON, base64)"""
+    data = dict(version)
+    for name in _DATETIME_FIELDS:
+        if isinstance(data.get(name), datetime):
+            data[name] = data[name].isoformat()
+    raw = json.dumps(data, default=str, separators=(',', ':')).encode('utf-8')
+    return base64.b64encode(zlib.compress(raw, 6)).decode('ascii')
+
+
+def unpack_version(packed: str) -> Dict[str, Any]:
+    data = json.loads(zlib.decompress(base64.b64decode(packed)).decode('utf-8'))
+    for name in _DATETIME_FIELDS:
+        if isinstance(data.get(name), str):
+            try:
+                data[name] = datetime.fromisoformat(data[name])
+            except ValueError:
+                pass
+    return data
+
+
+class CVVersionStore:
+    """
+    Dict-like mapping of version ID to CV version (insertion ordered).
+    Safe to share between threads (one engine serves concurrent requests).
+
+    Args:
+        memory_limit: Versions kept in memory; older ones are spilled
+        spill: TTLCache receiving spilled versions (default: the shared
+            on-disk store); spilled versions past its TTL or size bound are gone
+    """
+
+    def __init__(self, memory_limit: int = CV_VERSIONS_IN_MEMORY, spill: Optional[TTLCache] = None):
+        self.memory_limit = max(1, memory_limit)
+        self._spill = spill
+        self._store_id = uuid.uuid4().hex
+        self._memory: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._spilled: 'OrderedDict[str, None]' = OrderedDict()
+        self._lock = threading.RLock()
+
+    @property
+    def spill(self) -> TTLCache:
+        if self._spill is None:
+            self._spill = get_cv_version_spill()
+        return self._spill
+
+    def _spill_key(self, version_id: str) -> str:
+        return f"{self._store_id}:{version_id}"
+
+    def __setitem__(self, version_id: str, version: Dict[str, Any]):
+        with self._lock:
+            self._spilled.pop(version_id, None)
+            self._memory.pop(version_id, None)
+            self._memory[version_id] = version
+            # Spilled under the lock so a version is always in memory or in _spilled
+            while len(self._memory) > self.memory_limit:
+                old_id, old_version = self._memory.popitem(last=False)
+                try:
+                    self.spill.set(self._spill_key(old_id), pack_version(old_version), user_id=self._store_id)
+                    self._spilled[old_id] = None
+                except Exception as e:
+                    logger.warning(f"Could not spill CV version {old_id}: {e}")
+
+    def get(self, version_id: str, default: Any = None) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            version = self._memory.get(version_id)
+            if version is not None:
+                return version
+            if version_id not in self._spilled:
+                return default
+            packed = self.spill.get(self._spill_key(version_id))
+            if packed is None:
+                # Expired or evicted from the spill store
+                self._spilled.pop(version_id, None)
+                return default
+        try:
+            return unpack_version(packed)
+        except Exception as e:
+            logger.warning(f"Could not load CV version {version_id}: {e}")
+            return default
+
+    def __getitem__(self, version_id: str) -> Dict[str, Any]:
+        version = self.get(version_id)
+        if version is None:
+            raise KeyError(version_id)
+        return version
+
+    def __contains__(self, version_id) -> bool:
+        with self._lock:
+            if version_id in self._memory:
+                return True
+        return self.get(version_id) is not None
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._spilled) + list(self._memory)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._spilled) + len(self._memory)
+
+    @property
+    def latest_version_id(self) -> Optional[str]:
+        """
+        ID of the most recently added version (by any thread; callers of
+        generate_tailored_cv use the version ID it returns instead)
+        """
+        with self._lock:
+            return next(reversed(self._memory), None)
+
+    def clear(self):
+        with self._lock:
+            if self._spilled:
+                try:
+                    self.spill.invalidate_user(self._store_id)
+                except Exception as e:
+                    logger.warning(f"Could not drop spilled CV versions: {e}")
+            self._memory.clear()
+            self._spilled.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'in_memory': len(self._memory), 'spilled': len(self._spilled), 'memory_limit': self.memory_limit}
+
+
+_spill_cache = None
+
+
+def get_cv_version_spill() -> TTLCache:
+    """Spill store configured by CV_VERSIONS_DB_PATH, CV_VERSIONS_MAX_SPILLED and CV_VERSIONS_TTL_DAYS"""
+    global _spill_cache
+    if _spill_cache is None:
+        _spill_cache = TTLCache(
+            'cv_versions',
+            maxsize=int(os.getenv('CV_VERSIONS_MAX_SPILLED', '5000')),
+            ttl=float(os.getenv('CV_VERSIONS_TTL_DAYS', '7')) * 24 * 3600,
+            backend=SQLiteCacheBackend(os.getenv('CV_VERSIONS_DB_PATH', 'cv_versions.db'))
+        )
+    return _spill_cache
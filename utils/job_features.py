@@ -0,0 +1,198 @@
+"""
+Job Features
+Normalized per-job feature record, built once per job text and memoized
+beside the job (the job dict itself is left alone); the scraper's job cache
+files store it with each job. Relevance scoring, profile matching, filtering
+and ATS scoring read these instead of re-lowercasing and re-tokenizing raw
+strings.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields
+from functools import cached_property
+from typing import Any, Dict, List, Set
+
+# Field holding the features in the scraper's job cache files
+FEATURES_KEY = 'features'
+
+# Jobs whose features are kept in memory
+FEATURES_MEMO_SIZE = 4096
+
+# Technical skills recognised in job postings (regex fragments)
+COMMON_SKILLS = [
+    'python', 'java', 'javascript', 'typescript', 'c\\+\\+', 'c#', 'php', 'ruby', 'go', 'rust', 'kotlin', 'swift',
+    'react', 'angular', 'vue', 'svelte', 'node.js', 'express', 'django', 'flask', 'spring', 'fastapi',
+    'sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch', 'cassandra', 'dynamodb',
+    'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'terraform', 'jenkins', 'github actions', 'gitlab',
+    'git', 'linux', 'unix', 'windows', 'bash', 'shell scripting',
+    'agile', 'scrum', 'kanban', 'jira', 'confluence',
+    'machine learning', 'deep learning', 'ai', 'nlp', 'computer vision',
+    'data science', 'data analysis', 'tensorflow', 'pytorch', 'scikit-learn', 'pandas', 'numpy',
+    'rest api', 'graphql', 'microservices', 'ci/cd', 'devops',
+    'html', 'css', 'sass', 'tailwind', 'bootstrap',
+    'api', 'rest', 'graphql', 'websockets',
+    'testing', 'unit testing', 'integration testing', 'pytest', 'jest',
+    'spark', 'hadoop', 'kafka', 'airflow', 'etl'
+]
+
+
+def _compile_skill_patterns():
+    patterns = []
+    for skill in dict.fromkeys(COMMON_SKILLS):
+        # Use word boundary for better matching
+        pattern = re.compile(r'\b' + skill.replace('\\', '\\\\') + r'\b', re.IGNORECASE)
+        skill_name = skill.replace('\\+\\+', '++').replace('\\', '')
+        patterns.append((pattern, skill_name.title() if skill_name.islower() else skill_name))
+    return patterns
+
+
+_SKILL_PATTERNS = _compile_skill_patterns()
+
+
+def extract_skill_names(text: str) -> List[str]:
+    """Sorted, de-duplicated skill names found in (lowercased) text"""
+    return sorted({name for pattern, name in _SKILL_PATTERNS if pattern.search(text)})
+
+
+def seniority_markers(text: str) -> List[str]:
+    """Seniority levels a (lowercased) job text mentions"""
+    markers = []
+    if 'senior' in text:
+        markers.append('senior')
+    if 'junior' in text or 'entry' in text:
+        markers.append('junior')
+    if 'mid' in text or 'intermediate' in text:
+        markers.append('mid')
+    return markers
+
+
+@dataclass
+class JobFeatures:
+    """Normalized text, tokens, skills, seniority and salary of one job"""
+    title: str = ''
+    description: str = ''
+    company: str = ''
+    title_tokens: Set[str] = field(default_factory=set, repr=False)
+    description_tokens: Set[str] = field(default_factory=set, repr=False)
+    skills: List[str] = field(default_factory=list)
+    seniority: List[str] = field(default_factory=list)
+    salary: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+    def __repr__(self):
+        return f"JobFeatures(skills={self.skills}, seniority={self.seniority})"
+
+    @classmethod
+    def from_job(cls, job: Dict[str, Any]) -> 'JobFeatures':
+        title = str(job.get('title', '') or '').lower()
+        description = str(job.get('description', '') or '').lower()
+        company = str(job.get('company', '') or '').lower()
+        features = cls(
+            title=title,
+            description=description,
+            company=company,
+            title_tokens=set(title.split()),
+            description_tokens=set(description.split()),
+            salary=dict(job.get('salary_info') or {}),
+        )
+        features.skills = extract_skill_names(features.skill_text)
+        features.seniority = seniority_markers(features.match_text)
+        return features
+
+    @cached_property
+    def match_text(self) -> str:
+        """Title, description and company, as matched against profile skills"""
+        return f"{self.title} {self.description} {self.company}"
+
+    @cached_property
+    def skill_text(self) -> str:
+        """Title and description, as scanned for skills and salary"""
+        return f"{self.title} {self.description}"
+
+    @cached_property
+    def skill_set(self) -> Set[str]:
+        return {s.lower() for s in self.skills}
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {f.name: getattr(self, f.name) for f in fields(self)}
+        data['title_tokens'] = sorted(self.title_tokens)
+        data['description_tokens'] = sorted(self.description_tokens)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'JobFeatures':
+        known = {f.name for f in fields(cls)}
+        features = cls(**{k: v for k, v in data.items() if k in known})
+        features.title_tokens = set(features.title_tokens)
+        features.description_tokens = set(features.description_tokens)
+        return features
+
+
+_memo: "OrderedDict[str, JobFeatures]" = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def _memo_key(job: Dict[str, Any]) -> str:
+    text = '\x00'.join(str(job.get(k, '') or '') for k in ('title', 'description', 'company'))
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _remember(key: str, features: JobFeatures) -> JobFeatures:
+    with _memo_lock:
+        # Keep the first one built if another thread raced us
+        features = _memo.setdefault(key, features)
+        _memo.move_to_end(key)
+        while len(_memo) > FEATURES_MEMO_SIZE:
+            _memo.popitem(last=False)
+    return features
+
+
+def get_job_features(job: Dict[str, Any]) -> JobFeatures:
+    """
+    Features of a job, built on first use and memoized by its title,
+    description and company, so a job whose description changes gets new
+    ones. The job is not modified, and a FEATURES_KEY field on it (which may
+    come from a client) is ignored.
+    """
+    key = _memo_key(job)
+    with _memo_lock:
+        features = _memo.get(key)
+        if features is not None:
+            _memo.move_to_end(key)
+            return features
+    return _remember(key, JobFeatures.from_job(job))
+
+
+def jobs_with_features(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Copies of jobs carrying their features as dicts, for the job cache files"""
+    return [dict(job, **{FEATURES_KEY: get_job_features(job).to_dict()}) for job in jobs]
+
+
+def restore_job_features(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Take the stored features off a job read from a job cache file and memoize
+    them if they still describe its text. Returns the job.
+    """
+    data = job.pop(FEATURES_KEY, None)
+    if isinstance(data, dict):
+        try:
+            features = JobFeatures.from_dict(data)
+        except (TypeError, ValueError):
+            return job
+        if (features.title, features.description, features.company) == (
+                str(job.get('title', '') or '').lower(),
+                str(job.get('description', '') or '').lower(),
+                str(job.get('company', '') or '').lower()):
+            _remember(_memo_key(job), features)
+    return job
+
+
+def job_json_default(obj):
+    """json.dump default that keeps job features as structured data"""
+    if isinstance(obj, JobFeatures):
+        return obj.to_dict()
+    if isinstance(obj, set):
+        return sorted(obj)
+    return str(obj)
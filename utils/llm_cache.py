@@ -0,0 +1,151 @@
+"""
+LLM Response Cache
+Persistent cache for agent responses keyed by a hash of the normalized prompt
+inputs (CV hash, job hash, template, model ID, ...). Previews, re-previews
+and applications for the same CV and job reuse the earlier response instead
+of calling the model again; callers pass regenerate=True to bypass it.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from .cache import TTLCache, SQLiteCacheBackend
+
+logger = logging.getLogger(__name__)
+
+# Bump when a prompt changes so responses to the old prompt are not served
+LLM_CACHE_VERSION = 3
+
+
+def hash_text(text: Any) -> str:
+    return hashlib.sha256(str(text or '').encode('utf-8')).hexdigest()
+
+
+def hash_job(job: Dict[str, Any]) -> str:
+    """Stable hash of the fields a job posting contributes to a prompt"""
+    job = job or {}
+    fields = [job.get(k) or '' for k in ('title', 'company', 'location', 'description', 'url')]
+    return hash_text('\x1f'.join(' '.join(str(f).split()).lower() for f in fields))
+
+
+def hash_profile(profile: Any) -> str:
+    if isinstance(profile, dict):
+        return hash_text(json.dumps(profile, sort_keys=True, default=str))
+    return hash_text(profile)
+
+
+def agent_model_id(agent) -> str:
+    model = getattr(agent, 'model', None)
+    return str(getattr(model, 'id', None) or 'unknown')
+
+
+@dataclass
+class CachedResponse:
+    """Stands in for an agent RunResponse when the answer is cached or was streamed"""
+    content: str
+    cached: bool = True
+
+    def __str__(self):
+        return self.content
+
+
+def stream_agent(agent, prompt: str, on_delta: Callable[[str], None]) -> str:
+    """Run agent with streaming, passing text chunks to on_delta; returns the full text"""
+    parts = []
+    for chunk in agent.run(prompt, stream=True):
+        delta = getattr(chunk, 'content', chunk)
+        if isinstance(delta, str) and delta:
+            parts.append(delta)
+            on_delta(delta)
+    return ''.join(parts)
+
+
+class LLMResponseCache:
+    """
+    Agent responses in a size-bounded, TTL-expiring SQLite store shared by
+    every worker process. Only text responses are cached.
+    """
+
+    def __init__(self, db_path: str = "llm_cache.db", maxsize: int = 5000,
+                 ttl: float = 7 * 24 * 3600, enabled: bool = True):
+        self._cache = TTLCache('llm_responses', maxsize=maxsize, ttl=ttl, backend=SQLiteCacheBackend(db_path))
+        self.enabled = enabled
+
+    @staticmethod
+    def key(kind: str, **inputs) -> str:
+        payload = json.dumps(inputs, sort_keys=True, default=str)
+        return f"v{LLM_CACHE_VERSION}:{kind}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        return self._cache.get(key)
+
+    def put(self, key: str, content: str):
+        if self.enabled and isinstance(content, str) and content.strip():
+            self._cache.set(key, content)
+
+    def run(self, agent, prompt: str, kind: str, regenerate: bool = False,
+            on_delta: Optional[Callable[[str], None]] = None,
+            validate: Optional[Callable[[Any], bool]] = None, **inputs):
+        """
+        agent.run(prompt) through the cache.
+
+        Args:
+            agent: Agent whose response is cached (its model ID is part of the key)
+            prompt: Prompt sent on a miss
+            kind: Response type, e.g. 'tailored_cv' or 'interview_prep'
+            regenerate: Skip the lookup and replace the cached response
+            on_delta: Stream the response, calling this with each text chunk
+                (a cached response arrives as one chunk)
+            validate: Called with the response; a falsy result keeps it out of
+                the cache (and a cached response failing it is dropped and
+                regenerated), so a malformed reply is not served for the TTL
+            **inputs: Normalized prompt inputs identifying the response
+
+        Returns:
+            The agent response, or a CachedResponse on a hit or when streamed
+        """
+        key = self.key(kind, model=agent_model_id(agent), **inputs)
+        if not regenerate:
+            content = self.get(key)
+            if content is not None and validate and not validate(CachedResponse(content)):
+                logger.warning(f"Dropping cached {kind} response that fails validation")
+                self._cache.delete(key)
+            elif content is not None:
+                logger.info(f"LLM cache hit for {kind}")
+                if on_delta:
+                    on_delta(content)
+                return CachedResponse(content)
+        if on_delta:
+            response = CachedResponse(stream_agent(agent, prompt, on_delta), cached=False)
+        else:
+            response = agent.run(prompt)
+        if validate and not validate(response):
+            logger.warning(f"Not caching {kind} response that fails validation")
+            return response
+        self.put(key, response.content if hasattr(response, 'content') else str(response))
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+_llm_cache = None
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Shared cache configured by LLM_CACHE_ENABLED, LLM_CACHE_DB_PATH, LLM_CACHE_MAX_ENTRIES and LLM_CACHE_TTL_DAYS"""
+    global _llm_cache
+    if _llm_cache is None:
+        _llm_cache = LLMResponseCache(
+            db_path=os.getenv('LLM_CACHE_DB_PATH', 'llm_cache.db'),
+            maxsize=int(os.getenv('LLM_CACHE_MAX_ENTRIES', '5000')),
+            ttl=float(os.getenv('LLM_CACHE_TTL_DAYS', '7')) * 24 * 3600,
+            enabled=os.getenv('LLM_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+        )
+    return _llm_cache
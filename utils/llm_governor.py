@@ -0,0 +1,287 @@
+"""
+LLM Governor
+One budget for every LLM call on the host: a cap on in-flight calls, rolling
+requests-per-minute and tokens-per-minute budgets, and a queue that admits
+waiting calls by priority (interactive previews before applications before
+background enrichment), first come first served within a priority. State
+lives in a SQLite file so all gunicorn workers share the budget. A 429/503
+pauses admission for everyone instead of each thread backing off on its own.
+"""
+
+import contextvars
+import logging
+import os
+import re
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = {'interactive': 0, 'apply': 1, 'background': 2}
+
+_priority = contextvars.ContextVar('llm_priority', default='background')
+
+WINDOW_SECS = 60.0
+# Leases of a worker that died mid-call expire after this long
+LEASE_SECS = 300.0
+
+
+class GovernorTimeout(Exception):
+    """No LLM budget became available within the wait timeout"""
+
+
+@contextmanager
+def llm_priority(name: str):
+    """Run the enclosed LLM calls (in this thread or context) at priority name"""
+    if name not in PRIORITIES:
+        raise ValueError(f"Unknown LLM priority: {name}")
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+def retry_after_secs(exception, default: float) -> float:
+    """Retry delay suggested by a 429 error ("retryDelay': '23s'", "retry in 7.5s"), else default"""
+    match = re.search(r"retry(?:_?delay|\s+in|\s+after)?\W{0,4}(\d+(?:\.\d+)?)\s*s", str(exception), re.IGNORECASE)
+    return float(match.group(1)) if match else default
+
+
+class LLMGovernor:
+    """
+    Admission control for LLM calls.
+
+    Example:
+        with governor.slot(tokens=estimate_tokens(prompt)):
+            response = agent.run(prompt)
+
+    Args:
+        db_path: SQLite file shared by all worker processes
+        max_in_flight: Calls allowed to run at once
+        rpm: Calls admitted per rolling minute
+        tpm: Estimated tokens admitted per rolling minute (a call larger
+            than the whole budget is admitted once the window is empty)
+        timeout: Seconds a call waits for admission before GovernorTimeout
+        poll_interval: Seconds between admission checks while waiting
+    """
+
+    def __init__(self, db_path: str = "llm_governor.db", max_in_flight: int = 4, rpm: int = 60,
+                 tpm: int = 200000, timeout: float = 120.0, poll_interval: float = 0.1,
+                 clock: Callable[[], float] = time.time, sleep: Callable[[float], None] = time.sleep):
+        self.db_path = db_path
+        self.max_in_flight = max_in_flight
+        self.rpm = rpm
+        self.tpm = tpm
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.sleep = sleep
+        self._init_db()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        try:
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS llm_leases (
+                id TEXT PRIMARY KEY,
+                priority INTEGER,
+                tokens INTEGER,
+                acquired_at REAL,
+                expires_at REAL
+            )
+            ''')
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS llm_waiters (
+                id TEXT PRIMARY KEY,
+                priority INTEGER,
+                enqueued_at REAL,
+                expires_at REAL
+            )
+            ''')
+            conn.execute("CREATE TABLE IF NOT EXISTS llm_usage (started_at REAL, tokens INTEGER)")
+            conn.execute("CREATE TABLE IF NOT EXISTS llm_state (key TEXT PRIMARY KEY, value REAL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_usage_time ON llm_usage (started_at)")
+        finally:
+            conn.close()
+
+    def _try_admit(self, conn, waiter_id: str, priority: int, tokens: int) -> Optional[float]:
+        """
+        One admission attempt inside a write transaction. Returns None when
+        the call was admitted, otherwise seconds worth waiting before retrying.
+        """
+        now = self.clock()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM llm_leases WHERE expires_at <= ?", (now,))
+            conn.execute("DELETE FROM llm_waiters WHERE expires_at <= ?", (now,))
+            conn.execute("DELETE FROM llm_usage WHERE started_at <= ?", (now - WINDOW_SECS,))
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_waiters (id, priority, enqueued_at, expires_at) "
+                "VALUES (?, ?, COALESCE((SELECT enqueued_at FROM llm_waiters WHERE id = ?), ?), ?)",
+                (waiter_id, priority, waiter_id, now, now + max(10 * self.poll_interval, 5.0))
+            )
+
+            wait = self.poll_interval
+            head = conn.execute(
+                "SELECT id FROM llm_waiters ORDER BY priority, enqueued_at, id LIMIT 1"
+            ).fetchone()
+            paused_until = conn.execute("SELECT value FROM llm_state WHERE key = 'paused_until'").fetchone()
+            in_flight = conn.execute("SELECT COUNT(*) FROM llm_leases").fetchone()[0]
+            requests, used_tokens, oldest = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tokens), 0), MIN(started_at) FROM llm_usage"
+            ).fetchone()
+
+            if paused_until and paused_until[0] > now:
+                wait = paused_until[0] - now
+            elif head[0] != waiter_id or in_flight >= self.max_in_flight:
+                pass
+            elif requests >= self.rpm or (requests and used_tokens + tokens > self.tpm):
+                wait = oldest + WINDOW_SECS - now
+            else:
+                conn.execute("DELETE FROM llm_waiters WHERE id = ?", (waiter_id,))
+                conn.execute(
+                    "INSERT INTO llm_leases (id, priority, tokens, acquired_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                    (waiter_id, priority, tokens, now, now + LEASE_SECS)
+                )
+                conn.execute("INSERT INTO llm_usage (started_at, tokens) VALUES (?, ?)", (now, tokens))
+                conn.execute("COMMIT")
+                return None
+            conn.execute("COMMIT")
+            return max(self.poll_interval, min(wait, 1.0))
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def acquire(self, tokens: int = 0, priority: Optional[str] = None, timeout: Optional[float] = None) -> str:
+        """
+        Wait for admission. Returns a lease ID to pass to release().
+
+        Raises:
+            GovernorTimeout: not admitted within timeout seconds
+        """
+        priority = priority or current_priority()
+        rank = PRIORITIES.get(priority, PRIORITIES['background'])
+        timeout = self.timeout if timeout is None else timeout
+        lease_id = uuid.uuid4().hex
+        deadline = self.clock() + timeout
+        started = self.clock()
+        conn = self._connect()
+        try:
+            while True:
+                wait = self._try_admit(conn, lease_id, rank, int(tokens or 0))
+                if wait is None:
+                    waited = self.clock() - started
+                    if waited >= 1:
+                        logger.info(f"LLM call ({priority}) admitted after {waited:.1f}s")
+                    return lease_id
+                if self.clock() + wait > deadline:
+                    conn.execute("DELETE FROM llm_waiters WHERE id = ?", (lease_id,))
+                    raise GovernorTimeout(f"No LLM budget for a {priority} call within {timeout:.0f}s")
+                self.sleep(wait)
+        finally:
+            conn.close()
+
+    def release(self, lease_id: str):
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM llm_leases WHERE id = ?", (lease_id,))
+        finally:
+            conn.close()
+
+    @contextmanager
+    def slot(self, tokens: int = 0, priority: Optional[str] = None):
+        lease_id = self.acquire(tokens, priority)
+        try:
+            yield lease_id
+        finally:
+            self.release(lease_id)
+
+    def throttle(self, seconds: float):
+        """Pause admission of new calls in every worker (after a 429/503)"""
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT INTO llm_state (key, value) VALUES ('paused_until', ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = MAX(value, excluded.value)",
+                (self.clock() + seconds,)
+            )
+        finally:
+            conn.close()
+        logger.warning(f"LLM admission paused for {seconds:.1f}s after a rate limit response")
+
+    def stats(self) -> Dict[str, Any]:
+        now = self.clock()
+        conn = self._connect()
+        try:
+            in_flight = conn.execute("SELECT COUNT(*) FROM llm_leases WHERE expires_at > ?", (now,)).fetchone()[0]
+            waiting = dict(conn.execute(
+                "SELECT priority, COUNT(*) FROM llm_waiters WHERE expires_at > ? GROUP BY priority", (now,)
+            ).fetchall())
+            requests, tokens = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tokens), 0) FROM llm_usage WHERE started_at > ?",
+                (now - WINDOW_SECS,)
+            ).fetchone()
+            paused = conn.execute("SELECT value FROM llm_state WHERE key = 'paused_until'").fetchone()
+        finally:
+            conn.close()
+        names = {rank: name for name, rank in PRIORITIES.items()}
+        return {
+            'name': 'llm_governor',
+            'in_flight': in_flight,
+            'max_in_flight': self.max_in_flight,
+            'waiting': {names.get(rank, rank): count for rank, count in waiting.items()},
+            'requests_last_minute': requests,
+            'rpm': self.rpm,
+            'tokens_last_minute': tokens,
+            'tpm': self.tpm,
+            'paused_for': round(max(0.0, paused[0] - now), 1) if paused else 0.0,
+        }
+
+
+class _DisabledGovernor:
+    """Stands in when LLM_GOVERNOR_ENABLED is off"""
+
+    def slot(self, tokens: int = 0, priority: Optional[str] = None):
+        return nullcontext()
+
+    def throttle(self, seconds: float):
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {'name': 'llm_governor', 'enabled': False}
+
+
+_governor = None
+
+
+def get_llm_governor():
+    """
+    Shared governor configured by LLM_GOVERNOR_ENABLED, LLM_GOVERNOR_DB_PATH,
+    LLM_MAX_IN_FLIGHT, LLM_RPM, LLM_TPM and LLM_GOVERNOR_TIMEOUT_SECS
+    """
+    global _governor
+    if _governor is None:
+        if os.getenv('LLM_GOVERNOR_ENABLED', 'true').lower() in ('1', 'true', 'yes'):
+            _governor = LLMGovernor(
+                db_path=os.getenv('LLM_GOVERNOR_DB_PATH', 'llm_governor.db'),
+                max_in_flight=int(os.getenv('LLM_MAX_IN_FLIGHT', '4')),
+                rpm=int(os.getenv('LLM_RPM', '60')),
+                tpm=int(os.getenv('LLM_TPM', '200000')),
+                timeout=float(os.getenv('LLM_GOVERNOR_TIMEOUT_SECS', '120'))
+            )
+        else:
+            _governor = _DisabledGovernor()
+    return _governor
@@ -0,0 +1,87 @@
+"""
+LLM Streaming Helpers
+Incremental decoding of one string field from a JSON response that is still
+being generated (the tailored CV's "cv_content"), and Server-Sent Events
+formatting for the streaming apply-preview endpoint.
+"""
+
+import json
+import re
+from typing import Any, Optional, Tuple
+
+_JSON_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+def _decode_partial(buffer: str, pos: int) -> Tuple[str, int, bool]:
+    """
+    Decode a JSON string body from buffer[pos:] as far as it is complete.
+    Returns (decoded text, next undecoded position, closing quote reached).
+    """
+    out = []
+    n = len(buffer)
+    while pos < n:
+        c = buffer[pos]
+        if c == '"':
+            return ''.join(out), pos + 1, True
+        if c != '\\':
+            out.append(c)
+            pos += 1
+            continue
+        # Escapes split across chunks wait for the next chunk
+        if pos + 1 >= n:
+            break
+        e = buffer[pos + 1]
+        if e == 'u':
+            if pos + 6 > n:
+                break
+            try:
+                out.append(chr(int(buffer[pos + 2:pos + 6], 16)))
+            except ValueError:
+                pass
+            pos += 6
+        else:
+            out.append(_JSON_ESCAPES.get(e, e))
+            pos += 2
+    return ''.join(out), pos, False
+
+
+class JSONFieldStream:
+    """
+    Feed model output chunks; returns the newly decoded part of one string
+    field as it arrives. If the response turns out not to be JSON, the raw
+    text is passed through instead.
+    """
+
+    def __init__(self, key: str):
+        self._key_re = re.compile(r'"%s"\s*:\s*"' % re.escape(key))
+        self._buffer = ''
+        self._pos: Optional[int] = None
+        self._raw = False
+        self.done = False
+        self.text = ''
+
+    def feed(self, chunk: str) -> str:
+        if not chunk or self.done:
+            return ''
+        self._buffer += chunk
+        if self._raw:
+            self.text += chunk
+            return chunk
+        if self._pos is None:
+            match = self._key_re.search(self._buffer)
+            if not match:
+                head = self._buffer.lstrip()
+                if head and not head.startswith(('{', '`')):
+                    self._raw = True
+                    self.text = self._buffer
+                    return self._buffer
+                return ''
+            self._pos = match.end()
+        decoded, self._pos, self.done = _decode_partial(self._buffer, self._pos)
+        self.text += decoded
+        return decoded
+
+
+def sse_event(event: str, data: Any) -> str:
+    """One Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
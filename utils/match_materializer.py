@@ -0,0 +1,149 @@
+"""
+Match Materializer
+Precomputes ranked job matches per user in the background whenever fresh
+jobs land in the job cache for a location.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_location(location: str) -> str:
+    """Normalize a location string so 'Cape Town ' and 'cape town' share results"""
+    return ' '.join((location or '').lower().split())
+
+
+class MatchMaterializer:
+    """
+    Rescores freshly scraped jobs for every subscribed user in a location and
+    hands the ranked results to a writer (cache, database, ...).
+
+    Args:
+        score_fn: Callable(job, profile_data) -> formatted match dict with 'match_score'
+        profile_provider: Callable(user_id) -> profile_data dict or None
+        writer: Callable(user_id, location, matches) persisting the ranked results
+        max_matches: Number of ranked matches kept per user/location
+        result_ttl_secs: How long earlier results are merged with new ones
+    """
+
+    def __init__(self, score_fn: Callable, profile_provider: Callable, writer: Callable,
+                 max_matches: int = 20, result_ttl_secs: int = 6 * 3600):
+        self.score_fn = score_fn
+        self.profile_provider = profile_provider
+        self.writer = writer
+        self.max_matches = max_matches
+        self.result_ttl_secs = result_ttl_secs
+        self._subscriptions: Dict[str, Set[str]] = {}  # {location_key: {user_id}}
+        self._results: Dict[Tuple[str, str], Dict] = {}  # {(user_id, location_key): {matches, materialized_at}}
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------------
+
+    def subscribe(self, user_id: str, location: str):
+        """Register a user for background materialization in a location"""
+        if not user_id or not location:
+            return
+        with self._lock:
+            self._subscriptions.setdefault(normalize_location(location), set()).add(user_id)
+
+    def unsubscribe_user(self, user_id: str):
+        """Drop a user from every location and forget their materialized results"""
+        with self._lock:
+            for users in self._subscriptions.values():
+                users.discard(user_id)
+            for key in [k for k in self._results if k[0] == user_id]:
+                del self._results[key]
+
+    def subscribers(self, location: str) -> List[str]:
+        with self._lock:
+            return list(self._subscriptions.get(normalize_location(location), ()))
+
+    # ------------------------------------------------------------------
+    # Materialization
+    # ------------------------------------------------------------------
+
+    def notify(self, search_term: str, location: str, jobs: List[Dict], skip_users: Iterable[str] = ()):
+        """
+        Job cache listener: queue fresh jobs for background rescoring.
+        skip_users already scored these jobs themselves (e.g. an inline search).
+        """
+        skip_users = frozenset(skip_users)
+        if jobs and set(self.subscribers(location)) - skip_users:
+            self._queue.put((location, list(jobs), skip_users))
+
+    def get(self, user_id: str, location: str) -> Optional[List[Dict]]:
+        """Return the latest materialized matches for a user/location if still fresh"""
+        key = (user_id, normalize_location(location))
+        with self._lock:
+            entry = self._results.get(key)
+            if not entry:
+                return None
+            if time.time() - entry['materialized_at'] > self.result_ttl_secs:
+                del self._results[key]
+                return None
+            return entry['matches']
+
+    def materialize(self, location: str, jobs: List[Dict], skip_users: Iterable[str] = ()) -> int:
+        """Rescore jobs for all subscribers of a location except skip_users. Returns users updated."""
+        updated = 0
+        location_key = normalize_location(location)
+        for user_id in self.subscribers(location):
+            if user_id in skip_users:
+                continue
+            try:
+                profile_data = self.profile_provider(user_id)
+                if not profile_data:
+                    continue
+                fresh = [self.score_fn(job, profile_data) for job in jobs]
+                matches = self._merge(self.get(user_id, location) or [], fresh)
+                with self._lock:
+                    self._results[(user_id, location_key)] = {
+                        'matches': matches,
+                        'materialized_at': time.time()
+                    }
+                self.writer(user_id, location, matches)
+                updated += 1
+            except Exception as e:
+                logger.warning(f"Match materialization failed for user {user_id}: {e}")
+        if updated:
+            logger.info(f"Materialized matches for {updated} user(s) in {location}")
+        return updated
+
+    def _merge(self, existing: List[Dict], fresh: List[Dict]) -> List[Dict]:
+        """Merge new matches into earlier ones, newest score wins per job id"""
+        by_id = {}
+        for match in existing + fresh:
+            job_id = (match.get('job') or {}).get('id')
+            by_id[job_id or id(match)] = match
+        ranked = sorted(by_id.values(), key=lambda m: m.get('match_score', 0), reverse=True)
+        return ranked[:self.max_matches]
+
+    # ------------------------------------------------------------------
+    # Background worker
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the background worker thread (idempotent)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="match-materializer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            location, jobs, skip_users = self._queue.get()
+            try:
+                self.materialize(location, jobs, skip_users)
+            except Exception as e:
+                logger.warning(f"Match materializer error: {e}")
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,117 @@
+"""
+Job/Profile Matching
+Rule-based match scoring for a single job/profile pair and a vectorized
+scorer producing a jobs x profiles score matrix in one pass.
+"""
+
+from typing import Any, Dict, List
+
+import numpy as np
+
+from .job_features import get_job_features
+
+BASE_SCORE = 20
+EXACT_SKILL_POINTS = 15
+PARTIAL_SKILL_POINTS = 10
+EXPERIENCE_POINTS = 15
+MAX_SCORE = 100
+
+
+def _skill_points(skill_lower: str, job_text: str) -> int:
+    if skill_lower in job_text:
+        return EXACT_SKILL_POINTS
+    if any(w in job_text for w in skill_lower.split() if len(w) > 2):
+        return PARTIAL_SKILL_POINTS
+    return 0
+
+
+def _experience_flags(experience: str):
+    """(senior, junior, mid) flags of a profile's experience level"""
+    return ('senior' in experience, 'junior' in experience, 'mid' in experience)
+
+
+def _job_experience_flags(seniority: List[str]):
+    """(senior, junior, mid) markers present in a job's text"""
+    return ('senior' in seniority, 'junior' in seniority, 'mid' in seniority)
+
+
+def score_job_match(job, profile_info):
+    profile_data = profile_info['profile_data']
+    features = get_job_features(job)
+    job_text = features.match_text
+
+    score = BASE_SCORE
+    reasons = []
+
+    skills = profile_data.get('skills', [])
+    matched_skills = []
+
+    for skill in skills:
+        points = _skill_points(skill.lower(), job_text)
+        if points:
+            matched_skills.append(skill)
+            score += points
+
+    if matched_skills:
+        reasons.append(f"Matches your skills: {', '.join(matched_skills[:3])}")
+
+    # Experience
+    experience = profile_data.get('experience_level', '').lower()
+    if experience:
+        if any(p and j for p, j in zip(_experience_flags(experience), _job_experience_flags(features.seniority))):
+            score += EXPERIENCE_POINTS
+            reasons.append("Experience level match")
+
+    score = min(score, MAX_SCORE)
+    if not reasons: reasons.append("Relevant to your profile")
+    return {'score': score, 'reasons': reasons[:3]}
+
+
+def score_matrix(jobs: List[Dict[str, Any]], profiles: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Score every job against every profile. Produces the same scores as
+    score_job_match, but each job text is scanned once per distinct skill
+    across all profiles instead of once per (job, profile) pair.
+
+    Args:
+        jobs: Job dicts (title, description, company)
+        profiles: Profile data dicts (skills, experience_level)
+
+    Returns:
+        int array of shape (len(jobs), len(profiles))
+    """
+    if not jobs or not profiles:
+        return np.zeros((len(jobs), len(profiles)), dtype=np.int32)
+
+    # Distinct skill vocabulary and per-profile skill counts (duplicates score twice)
+    vocab: Dict[str, int] = {}
+    counts = []
+    for profile in profiles:
+        row: Dict[int, int] = {}
+        for skill in profile.get('skills', []) or []:
+            idx = vocab.setdefault(str(skill).lower(), len(vocab))
+            row[idx] = row.get(idx, 0) + 1
+        counts.append(row)
+
+    skill_counts = np.zeros((len(vocab), len(profiles)), dtype=np.int32)
+    for p, row in enumerate(counts):
+        for idx, n in row.items():
+            skill_counts[idx, p] = n
+
+    skills = list(vocab)
+    job_points = np.zeros((len(jobs), len(vocab)), dtype=np.int32)
+    job_flags = np.zeros((len(jobs), 3), dtype=bool)
+    for j, job in enumerate(jobs):
+        features = get_job_features(job)
+        job_points[j] = [_skill_points(s, features.match_text) for s in skills]
+        job_flags[j] = _job_experience_flags(features.seniority)
+
+    profile_flags = np.array(
+        [_experience_flags((p.get('experience_level', '') or '').lower()) for p in profiles],
+        dtype=bool
+    )
+
+    scores = BASE_SCORE + job_points @ skill_counts
+    experience_match = (job_flags.astype(np.int32) @ profile_flags.T.astype(np.int32)) > 0
+    scores = scores + EXPERIENCE_POINTS * experience_match
+    return np.minimum(scores, MAX_SCORE)
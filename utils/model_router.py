@@ -0,0 +1,360 @@
+"""
+Model Router
+Routes each class of LLM call (tailoring, interview prep, description
+generation) to the fastest healthy model of its quality tier. Rolling latency
+and error rate are tracked per model, and a circuit opens on repeated
+429/503 responses so a throttled model is skipped until its cooldown ends.
+Providers are pluggable; FakeProvider simulates models locally for tests.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+from .llm_governor import get_llm_governor, retry_after_secs
+from .prompt_builder import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# Quality tiers, each listing interchangeable models in preference order
+MODEL_TIERS = {
+    'quality': ['gemini-2.5-pro', 'gemini-2.5-flash'],
+    'standard': ['gemini-2.5-flash', 'gemini-2.0-flash'],
+    'fast': ['gemini-2.5-flash-lite', 'gemini-2.0-flash', 'gemini-2.5-flash'],
+}
+
+# Tier used by each call class
+CALL_CLASS_TIERS = {
+    'tailoring': 'standard',
+    'interview_prep': 'standard',
+    'description': 'fast',
+}
+
+ROUTER_FAILURE_THRESHOLD = int(os.getenv('MODEL_ROUTER_FAILURE_THRESHOLD', '3'))
+ROUTER_COOLDOWN_SECS = float(os.getenv('MODEL_ROUTER_COOLDOWN_SECS', '30'))
+ROUTER_MAX_COOLDOWN_SECS = float(os.getenv('MODEL_ROUTER_MAX_COOLDOWN_SECS', '600'))
+ROUTER_WINDOW = 50
+# Admission pause after a 429/503 when the error suggests no retry delay
+ROUTER_THROTTLE_SECS = float(os.getenv('MODEL_ROUTER_THROTTLE_SECS', '5'))
+# Response tokens assumed when budgeting a call that sets no output limit
+OUTPUT_TOKEN_ESTIMATE = 1000
+
+
+class ModelUnavailableError(Exception):
+    """Every model of the call's tier failed or has an open circuit"""
+
+
+def is_capacity_error(exception) -> bool:
+    """429 / 503 style errors: the model is throttled or overloaded, not the request wrong"""
+    status = getattr(exception, 'status_code', None) or getattr(exception, 'code', None)
+    if status in (429, 503):
+        return True
+    text = str(exception).lower()
+    return any(marker in text for marker in (
+        '429', 'resource_exhausted', 'quota', 'too many requests',
+        '503', 'unavailable', 'overloaded'
+    ))
+
+
+@dataclass
+class ModelHealth:
+    """Rolling call outcomes of one model and its circuit state"""
+    model_id: str
+    calls: Deque[Tuple[float, bool]] = field(default_factory=lambda: deque(maxlen=ROUTER_WINDOW))
+    consecutive_failures: int = 0
+    open_until: float = 0.0
+    cooldown: float = ROUTER_COOLDOWN_SECS
+    half_open: bool = False
+
+    @property
+    def latency(self) -> Optional[float]:
+        """Median latency of recent successful calls, None before the first one"""
+        samples = sorted(seconds for seconds, ok in self.calls if ok)
+        return samples[len(samples) // 2] if samples else None
+
+    @property
+    def error_rate(self) -> float:
+        if not self.calls:
+            return 0.0
+        return sum(1 for _, ok in self.calls if not ok) / len(self.calls)
+
+    def state(self, now: float) -> str:
+        if self.open_until > now:
+            return 'open'
+        return 'half_open' if self.half_open else 'closed'
+
+
+class ModelRouter:
+    """
+    Picks models for a call class and records how each call went.
+
+    call() tries the tier's models fastest-first: healthy models ordered by
+    median latency (a model with no samples yet is tried first so it gets
+    measured), then models recovering from capacity errors. A model's circuit
+    opens after failure_threshold consecutive capacity errors; once the
+    cooldown passes it is half-open, and a failed trial call reopens it with
+    double the cooldown.
+    """
+
+    def __init__(self, tiers: Dict[str, List[str]] = None, call_classes: Dict[str, str] = None,
+                 provider=None, governor=None, failure_threshold: int = ROUTER_FAILURE_THRESHOLD,
+                 cooldown: float = ROUTER_COOLDOWN_SECS, max_cooldown: float = ROUTER_MAX_COOLDOWN_SECS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.tiers = tiers or MODEL_TIERS
+        self.call_classes = call_classes or CALL_CLASS_TIERS
+        self.provider = provider
+        self.governor = governor
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.clock = clock
+        self._health: Dict[str, ModelHealth] = {}
+        self._lock = threading.Lock()
+
+    def _model_health(self, model_id: str) -> ModelHealth:
+        health = self._health.get(model_id)
+        if health is None:
+            health = self._health[model_id] = ModelHealth(model_id, cooldown=self.cooldown)
+        return health
+
+    def tier_models(self, call_class: str) -> List[str]:
+        tier = self.call_classes.get(call_class, 'standard')
+        return list(self.tiers.get(tier) or self.tiers['standard'])
+
+    def primary_model(self, call_class: str) -> str:
+        """First model of the call class's tier (stable; used in cache keys)"""
+        return self.tier_models(call_class)[0]
+
+    def slot(self, prompt: str, max_output_tokens: Optional[int] = None):
+        """Admission through the governor (if any) for one call, budgeted by its size"""
+        if self.governor is None:
+            return nullcontext()
+        return self.governor.slot(tokens=estimate_tokens(prompt) + (max_output_tokens or OUTPUT_TOKEN_ESTIMATE))
+
+    def candidates(self, call_class: str) -> List[str]:
+        """Models to try for call_class, best first; open circuits are left out"""
+        now = self.clock()
+        models = self.tier_models(call_class)
+        with self._lock:
+            closed, trial = [], []
+            for rank, model_id in enumerate(models):
+                health = self._model_health(model_id)
+                state = health.state(now)
+                if state == 'open':
+                    continue
+                if state == 'closed' and health.consecutive_failures == 0:
+                    latency = health.latency
+                    closed.append((latency if latency is not None else 0.0, rank, model_id))
+                else:
+                    trial.append((rank, model_id))
+        closed.sort()
+        return [m for _, _, m in closed] + [m for _, m in sorted(trial)]
+
+    def record_success(self, model_id: str, seconds: float):
+        with self._lock:
+            health = self._model_health(model_id)
+            health.calls.append((seconds, True))
+            health.consecutive_failures = 0
+            health.half_open = False
+            health.cooldown = self.cooldown
+
+    def record_failure(self, model_id: str, seconds: float, capacity: bool):
+        with self._lock:
+            health = self._model_health(model_id)
+            health.calls.append((seconds, False))
+            if not capacity:
+                return
+            health.consecutive_failures += 1
+            if health.half_open or health.consecutive_failures >= self.failure_threshold:
+                if health.half_open:
+                    health.cooldown = min(health.cooldown * 2, self.max_cooldown)
+                health.open_until = self.clock() + health.cooldown
+                health.half_open = True
+                logger.warning(f"Circuit open for {model_id} for {health.cooldown:.0f}s after repeated 429/503")
+
+    def call(self, call_class: str, invoke: Callable[[str], T]) -> T:
+        """
+        Run invoke(model_id) on the best available model, falling over to the
+        next one on errors.
+
+        Raises:
+            ModelUnavailableError: no model of the tier succeeded
+        """
+        last_error = None
+        candidates = self.candidates(call_class)
+        for model_id in candidates:
+            started = self.clock()
+            try:
+                result = invoke(model_id)
+            except Exception as e:
+                capacity = is_capacity_error(e)
+                self.record_failure(model_id, self.clock() - started, capacity)
+                if capacity and self.governor is not None:
+                    self.governor.throttle(retry_after_secs(e, ROUTER_THROTTLE_SECS))
+                logger.warning(f"{call_class} call on {model_id} failed ({'capacity' if capacity else 'error'}): {e}")
+                last_error = e
+                continue
+            self.record_success(model_id, self.clock() - started)
+            return result
+        if not candidates:
+            raise ModelUnavailableError(f"All {call_class} models have open circuits")
+        raise ModelUnavailableError(f"All {call_class} models failed: {last_error}") from last_error
+
+    def generate(self, call_class: str, prompt: str, provider=None, **kwargs) -> str:
+        """Text completion for prompt through provider (default: the router's provider)"""
+        provider = provider or self.provider
+        if provider is None:
+            raise ModelUnavailableError("No model provider configured")
+        with self.slot(prompt, kwargs.get('max_output_tokens')):
+            return self.call(call_class, lambda model_id: provider.generate(model_id, prompt, **kwargs))
+
+    def stats(self) -> Dict[str, Any]:
+        now = self.clock()
+        with self._lock:
+            return {
+                model_id: {
+                    'state': health.state(now),
+                    'latency_p50': health.latency,
+                    'error_rate': round(health.error_rate, 3),
+                    'calls': len(health.calls),
+                    'consecutive_failures': health.consecutive_failures,
+                }
+                for model_id, health in self._health.items()
+            }
+
+
+class GeminiProvider:
+    """google-genai text generation"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def generate(self, model_id: str, prompt: str, temperature: Optional[float] = None,
+                 max_output_tokens: Optional[int] = None) -> str:
+        from google.genai import types
+        response = self.client.models.generate_content(
+            model=model_id,
+            contents=prompt,
+            config=types.GenerateContentConfig(temperature=temperature, max_output_tokens=max_output_tokens)
+        )
+        if not response or not response.text:
+            raise ValueError(f"Empty response from {model_id}")
+        return response.text.strip()
+
+
+class FakeProvider:
+    """
+    Local stand-in for a model provider. Each model has a fixed latency
+    (simulated by advancing a FakeClock if given, otherwise by sleeping)
+    and an optional queue of exceptions raised by its next calls.
+    """
+
+    def __init__(self, latencies: Dict[str, float] = None, clock=None):
+        self.latencies = dict(latencies or {})
+        self.failures: Dict[str, List[Exception]] = {}
+        self.calls: List[str] = []
+        self.clock = clock
+
+    def fail(self, model_id: str, error: Exception, times: int = 1):
+        self.failures.setdefault(model_id, []).extend([error] * times)
+
+    def generate(self, model_id: str, prompt: str, **kwargs) -> str:
+        self.calls.append(model_id)
+        latency = self.latencies.get(model_id, 0.0)
+        if self.clock is not None:
+            self.clock.advance(latency)
+        elif latency:
+            time.sleep(latency)
+        pending = self.failures.get(model_id)
+        if pending:
+            raise pending.pop(0)
+        return f"[{model_id}] {prompt}"
+
+
+class FakeClock:
+    """Manually advanced monotonic clock for router tests"""
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RoutedAgent:
+    """
+    Agent facade that routes each run() through the router: the call runs on
+    a copy of the agent bound to the chosen model. model.id is the tier's
+    primary model, so response caches keyed on it stay stable across
+    fallbacks.
+    """
+
+    def __init__(self, agent, call_class: str, router: 'ModelRouter', variant: Callable[[Any, str], Any]):
+        self.agent = agent
+        self.call_class = call_class
+        self.router = router
+        self._variant = variant
+        self.name = getattr(agent, 'name', call_class)
+
+    @property
+    def model(self):
+        return _ModelRef(self.router.primary_model(self.call_class))
+
+    def run(self, prompt: str, stream: bool = False, **kwargs):
+        if not stream:
+            with self.router.slot(prompt):
+                return self.router.call(self.call_class,
+                                        lambda model_id: self._variant(self.agent, model_id).run(prompt, **kwargs))
+        return self._run_stream(prompt, **kwargs)
+
+    def _run_stream(self, prompt: str, **kwargs):
+        # A model can be swapped only until its first chunk is out; errors
+        # after that propagate to the consumer. The governor slot is held
+        # until the stream ends.
+        def first_chunk(model_id):
+            chunks = iter(self._variant(self.agent, model_id).run(prompt, stream=True, **kwargs))
+            return next(chunks, None), chunks
+
+        with self.router.slot(prompt):
+            first, chunks = self.router.call(self.call_class, first_chunk)
+            if first is not None:
+                yield first
+            yield from chunks
+
+
+@dataclass
+class _ModelRef:
+    id: str
+
+
+def _tiers_from_env() -> Dict[str, List[str]]:
+    tiers = {name: list(models) for name, models in MODEL_TIERS.items()}
+    for name in tiers:
+        override = os.getenv(f"MODEL_TIER_{name.upper()}")
+        if override:
+            tiers[name] = [m.strip() for m in override.split(',') if m.strip()]
+    return tiers
+
+
+_router = None
+
+
+def get_model_router() -> ModelRouter:
+    """
+    Process-wide router admitting calls through the shared LLM governor;
+    tiers can be overridden with MODEL_TIER_<NAME>=model,model
+    """
+    global _router
+    if _router is None:
+        _router = ModelRouter(tiers=_tiers_from_env(), governor=get_llm_governor())
+    return _router
@@ -0,0 +1,78 @@
+"""
+Apply Preview Store
+Approved apply-preview output (tailored CV version and cover letter) by
+preview token, so /api/apply-job can render exactly what the user saw without
+new LLM calls. Kept in a SQLite store shared by the worker processes: the
+preview and the apply request may be served by different workers.
+"""
+
+import logging
+import os
+import uuid
+from typing import Any, Dict, Optional
+
+from .cache import TTLCache, SQLiteCacheBackend
+from .cv_versions import pack_version, unpack_version
+
+logger = logging.getLogger(__name__)
+
+
+class PreviewStore:
+    """
+    Previews expire ttl seconds after they are saved. A preview stays
+    available until discard() is called, so a failed apply can be retried
+    with the same token.
+    """
+
+    def __init__(self, db_path: str = "previews.db", maxsize: int = 2000, ttl: float = 30 * 60):
+        self._cache = TTLCache('apply_previews', maxsize=maxsize, ttl=ttl, backend=SQLiteCacheBackend(db_path))
+
+    def save(self, user_id: str, job: Dict[str, Any], template: Optional[str], version_id: Optional[str],
+             cv_version: Dict[str, Any], cover_letter_markdown: Optional[str]) -> str:
+        """Store a preview and return its token"""
+        token = uuid.uuid4().hex
+        self._cache.set(token, {
+            'user_id': user_id,
+            'job': job,
+            'template': template,
+            'version_id': version_id,
+            'cv_version': pack_version(cv_version),
+            'cover_letter_markdown': cover_letter_markdown,
+        }, user_id=user_id)
+        return token
+
+    def get(self, token: Optional[str], user_id: str) -> Optional[Dict[str, Any]]:
+        """The user's unexpired preview for token, or None"""
+        if not token:
+            return None
+        entry = self._cache.get(token)
+        if not entry or entry.get('user_id') != user_id:
+            return None
+        try:
+            return dict(entry, cv_version=unpack_version(entry['cv_version']))
+        except Exception as e:
+            logger.warning(f"Discarding unreadable preview {token}: {e}")
+            self._cache.delete(token)
+            return None
+
+    def discard(self, token: Optional[str]) -> bool:
+        """Drop a preview once its application has been generated"""
+        return bool(token) and self._cache.delete(token)
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+_preview_store = None
+
+
+def get_preview_store() -> PreviewStore:
+    """Shared store configured by PREVIEW_DB_PATH, PREVIEW_MAX_ENTRIES and PREVIEW_TTL_SECS"""
+    global _preview_store
+    if _preview_store is None:
+        _preview_store = PreviewStore(
+            db_path=os.getenv('PREVIEW_DB_PATH', 'previews.db'),
+            maxsize=int(os.getenv('PREVIEW_MAX_ENTRIES', '2000')),
+            ttl=float(os.getenv('PREVIEW_TTL_SECS', str(30 * 60)))
+        )
+    return _preview_store
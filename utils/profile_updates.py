@@ -0,0 +1,149 @@
+"""
+Incremental Profile Updates
+Diffs a profile edit against the profile already held in memory, applies the
+changed fields in place and reports which derived results depend on them, so
+an edit never re-parses the CV and only the affected caches are dropped.
+Edits are published to a store shared by the workers, so a worker that did
+not handle the edit brings its in-memory profiles up to date before use.
+"""
+
+import json
+import threading
+import uuid
+from typing import Any, Dict, Iterable, Optional, Set
+
+from .cache import TTLCache
+
+# Editable fields -> derived results that read them.
+# 'matches': match scores (score_job_match); 'queries': planned search queries (plan_queries)
+PROFILE_FIELD_DEPENDENCIES = {
+    'skills': {'matches', 'queries'},
+    'experience_level': {'matches', 'queries'},
+    'career_goals': {'queries'},
+    'education': set(),
+    'strengths': set(),
+    'notification_enabled': set(),
+    'notification_threshold': set(),
+}
+
+# Fields that live on the parsed profile (the rest are settings kept in Appwrite only)
+PARSED_PROFILE_FIELDS = ('skills', 'experience_level', 'education', 'strengths', 'career_goals')
+
+
+def _normalized(value):
+    # Compare skill/strength lists case-insensitively and ignoring order and blanks
+    if isinstance(value, (list, tuple, set)):
+        return sorted({str(v).strip().lower() for v in value if str(v).strip()})
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def diff_profile(current: Dict[str, Any], updates: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fields in updates whose value differs from current.
+
+    Args:
+        current: Profile held in memory ({} when none is loaded)
+        updates: Submitted values for the editable fields
+
+    Returns:
+        {field: new value} for the changed fields only
+    """
+    changed = {}
+    for field, value in updates.items():
+        if field not in PROFILE_FIELD_DEPENDENCIES:
+            continue
+        if field not in current or _normalized(current[field]) != _normalized(value):
+            changed[field] = value
+    return changed
+
+
+def structured_profile_from_doc(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Editable profile fields of an Appwrite profile document (JSON lists decoded)"""
+    def _safe_json(field, default):
+        try:
+            v = doc.get(field)
+            if isinstance(v, str):
+                if not v.strip(): return default
+                return json.loads(v)
+            return v if v is not None else default
+        except Exception: return default
+    return {
+        'skills': _safe_json('skills', []),
+        'experience_level': doc.get('experience_level', '') or '',
+        'education': doc.get('education', '') or '',
+        'strengths': _safe_json('strengths', []),
+        'career_goals': doc.get('career_goals', '') or '',
+        'notification_enabled': bool(doc.get('notification_enabled', False)),
+        'notification_threshold': int(doc.get('notification_threshold', 70) or 70)
+    }
+
+
+def affected_results(changed: Iterable[str]) -> Set[str]:
+    """Derived results ('matches', 'queries') invalidated by the changed fields"""
+    affected = set()
+    for field in changed:
+        affected |= PROFILE_FIELD_DEPENDENCIES.get(field, set())
+    return affected
+
+
+def apply_profile_diff(profile: Any, changed: Dict[str, Any]) -> bool:
+    """
+    Write the changed parsed-profile fields into profile in place, so every
+    holder of the same dict (pipeline, tailoring engine, profile store) sees them.
+
+    Returns:
+        False if profile is not a dict (e.g. raw LLM text) and was left alone
+    """
+    if not isinstance(profile, dict):
+        return False
+    for field, value in changed.items():
+        if field in PARSED_PROFILE_FIELDS:
+            profile[field] = value
+    return True
+
+
+class ProfileRevisions:
+    """
+    Latest profile edit per user, in a store shared by the worker processes.
+    Each worker remembers the revision its in-memory profiles reflect;
+    pull() returns an edit made on another worker that it has not applied yet.
+
+    Args:
+        cache: Shared store (a TTLCache on the SQLite backend)
+    """
+
+    def __init__(self, cache: TTLCache):
+        self._cache = cache
+        self._applied: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, user_id: str, fields: Dict[str, Any]) -> str:
+        """Record the user's complete edited fields; this worker has applied them"""
+        revision = uuid.uuid4().hex
+        self._cache.set(user_id, {'revision': revision, 'fields': dict(fields)}, user_id=user_id)
+        with self._lock:
+            self._applied[user_id] = revision
+        return revision
+
+    def pull(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Fields of the latest edit not yet applied in this worker (marked applied), else None"""
+        entry = self._cache.get(user_id)
+        if not entry:
+            return None
+        with self._lock:
+            if self._applied.get(user_id) == entry['revision']:
+                return None
+            self._applied[user_id] = entry['revision']
+        return entry['fields']
+
+    def reload(self, user_id: str):
+        """This worker rebuilt the user's profile from the CV: the latest edit applies again"""
+        with self._lock:
+            self._applied.pop(user_id, None)
+
+    def clear(self, user_id: str):
+        """A new CV replaced the profile: earlier edits no longer apply in any worker"""
+        self._cache.invalidate_user(user_id)
+        self.reload(user_id)
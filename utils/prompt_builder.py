@@ -0,0 +1,179 @@
+"""
+Prompt Builder
+Assembles LLM prompts from named sections, each with its own token budget.
+Jobs and profiles contribute only the fields a prompt needs, repeated lines
+and skills already present in the CV are dropped, and every built prompt
+reports its size so oversized prompts show up in the logs.
+"""
+
+import logging
+import math
+import os
+import re
+import textwrap
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Per-section budgets in estimated tokens
+CV_TOKEN_BUDGET = int(os.getenv('PROMPT_CV_TOKEN_BUDGET', '2500'))
+JOB_TOKEN_BUDGET = int(os.getenv('PROMPT_JOB_TOKEN_BUDGET', '1200'))
+PROFILE_TOKEN_BUDGET = int(os.getenv('PROMPT_PROFILE_TOKEN_BUDGET', '300'))
+KEYWORDS_TOKEN_BUDGET = 150
+
+# Job fields that matter to a prompt; enrichment fields (salary_info,
+# processed_at, features, relevance scores, ...) are left out
+JOB_PROMPT_FIELDS = ('title', 'company', 'location', 'job_type', 'description')
+PROFILE_PROMPT_FIELDS = ('experience_level', 'skills', 'strengths', 'education', 'career_goals')
+
+_WORD_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Local token estimate: the larger of ~4 characters per token and one token
+    per word or punctuation mark (close to Gemini/GPT tokenizers on CV text)
+    """
+    if not text:
+        return 0
+    return max(math.ceil(len(text) / 4), len(_WORD_RE.findall(text)))
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """Cut text to about budget tokens, at a line or sentence break where possible"""
+    if estimate_tokens(text) <= budget:
+        return text
+    # Binary search the longest prefix that fits (leaving a token for the
+    # ellipsis), then back off to a boundary
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(text[:mid]) <= budget - 1:
+            lo = mid
+        else:
+            hi = mid - 1
+    cut = text[:lo]
+    boundary = max(cut.rfind('\n'), cut.rfind('. '))
+    if boundary > lo // 2:
+        cut = cut[:boundary + 1]
+    return cut.rstrip() + ' …'
+
+
+def dedupe_lines(text: str, seen: Optional[set] = None) -> str:
+    """Drop blank runs and lines repeated in text (or already in seen)"""
+    seen = set() if seen is None else seen
+    kept = []
+    for line in (text or '').splitlines():
+        key = ' '.join(line.split()).lower()
+        if not key:
+            if kept and kept[-1]:
+                kept.append('')
+            continue
+        if key in seen:
+            continue
+        seen.add(key)
+        kept.append(line.rstrip())
+    return '\n'.join(kept).strip()
+
+
+def format_job(job: Dict[str, Any]) -> str:
+    """The job as labelled lines of its prompt-relevant fields"""
+    job = job or {}
+    lines = []
+    for name in JOB_PROMPT_FIELDS:
+        value = job.get(name)
+        if not value:
+            continue
+        if name == 'description':
+            lines.append(f"Description:\n{dedupe_lines(str(value))}")
+        else:
+            lines.append(f"{name.replace('_', ' ').title()}: {value}")
+    return '\n'.join(lines)
+
+
+def _mentions(text_lower: str, term: str) -> bool:
+    """
+    Whether lowercased text mentions term as a whole word, so 'R' or 'Go' do
+    not match inside other words and 'C' does not match 'C++' or 'C#'
+    """
+    term = term.strip().lower()
+    return bool(term) and re.search(rf"(?<![\w+#]){re.escape(term)}(?![\w+#])", text_lower) is not None
+
+
+def format_profile(profile: Any, cv_text: str = '') -> str:
+    """
+    Prompt-relevant profile fields. Skills and strengths the CV already
+    mentions are omitted since the CV is in the same prompt.
+    """
+    if not isinstance(profile, dict):
+        return str(profile or '')
+    cv_lower = (cv_text or '').lower()
+    lines = []
+    for name in PROFILE_PROMPT_FIELDS:
+        value = profile.get(name)
+        if isinstance(value, (list, tuple)):
+            value = ', '.join(str(v) for v in value if str(v).strip() and not _mentions(cv_lower, str(v)))
+        if value:
+            lines.append(f"{name.replace('_', ' ').title()}: {value}")
+    return '\n'.join(lines)
+
+
+def format_keywords(keywords: Iterable[str]) -> str:
+    return ', '.join(dict.fromkeys(k for k in keywords if k))
+
+
+@dataclass
+class BuiltPrompt:
+    text: str
+    tokens: int
+    section_tokens: Dict[str, int] = field(default_factory=dict)
+    truncated: List[str] = field(default_factory=list)
+
+    def __str__(self):
+        return self.text
+
+
+class PromptBuilder:
+    """
+    Collects labelled sections and joins them under their budgets.
+
+    Example:
+        prompt = (PromptBuilder('tailored_cv')
+                  .add('Master CV', cv_text, CV_TOKEN_BUDGET)
+                  .add('Job Posting', format_job(job), JOB_TOKEN_BUDGET)
+                  .instructions('Return JSON ...')
+                  .build())
+    """
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self._sections = []
+        self._instructions = ''
+
+    def add(self, label: str, text: str, budget: Optional[int] = None) -> 'PromptBuilder':
+        if text and str(text).strip():
+            self._sections.append((label, str(text).strip(), budget))
+        return self
+
+    def instructions(self, text: str) -> 'PromptBuilder':
+        self._instructions = textwrap.dedent(text or '').strip()
+        return self
+
+    def build(self) -> BuiltPrompt:
+        parts, sizes, truncated = [], {}, []
+        for label, text, budget in self._sections:
+            if budget is not None and estimate_tokens(text) > budget:
+                text = truncate_to_tokens(text, budget)
+                truncated.append(label)
+            sizes[label] = estimate_tokens(text)
+            parts.append(f"{label}:\n{text}" if '\n' in text else f"{label}: {text}")
+        if self._instructions:
+            sizes['instructions'] = estimate_tokens(self._instructions)
+            parts.append(self._instructions)
+        text = '\n\n'.join(parts)
+        prompt = BuiltPrompt(text=text, tokens=estimate_tokens(text), section_tokens=sizes, truncated=truncated)
+        logger.info(f"Prompt '{self.kind}': ~{prompt.tokens} tokens {sizes}"
+                    + (f", truncated {truncated}" if truncated else ''))
+        return prompt
+
@@ -0,0 +1,137 @@
+"""
+Job Search Query Planner
+Derives a ranked set of search queries from a profile and runs them
+concurrently through the scraper under a shared deadline.
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAX_QUERIES = int(os.getenv('QUERY_PLANNER_MAX_QUERIES', '3'))
+QUERY_DEADLINE_SECS = float(os.getenv('QUERY_PLANNER_DEADLINE_SECS', '45'))
+
+JOB_TITLE_KEYWORDS = ['developer', 'engineer', 'analyst', 'manager', 'designer',
+                      'architect', 'consultant', 'specialist', 'administrator',
+                      'coordinator', 'lead', 'intern', 'graduate']
+
+SKILL_DOMAINS = {
+    'web': ['react', 'angular', 'vue', 'html', 'css', 'javascript', 'typescript'],
+    'backend': ['python', 'java', 'node', 'express', 'django', 'flask'],
+    'mobile': ['react native', 'flutter', 'swift', 'kotlin', 'android', 'ios'],
+    'data': ['sql', 'mongodb', 'postgresql', 'data', 'analytics'],
+    'cloud': ['aws', 'azure', 'gcp', 'cloud', 'devops']
+}
+
+FALLBACK_QUERY = 'Software Developer'
+
+
+def _title_phrases(career_goals: str) -> List[str]:
+    """Short phrases around job title keywords in career goals, keyword order first"""
+    phrases = []
+    words = career_goals.split()
+    for keyword in JOB_TITLE_KEYWORDS:
+        if keyword not in career_goals.lower():
+            continue
+        for i, word in enumerate(words):
+            if keyword in word.lower():
+                # Take 2-3 words around the keyword
+                phrases.append(' '.join(words[max(0, i - 1):min(len(words), i + 3)]))
+                break
+    return [p for p in phrases if len(p) >= 5]
+
+
+def _domain_queries(skills: Tuple[str, ...], experience_level: str) -> List[str]:
+    """'<Level> <Domain> Developer' for every skill domain present, in domain order"""
+    exp = experience_level.lower()
+    level_prefix = ''
+    if 'senior' in exp:
+        level_prefix = 'Senior '
+    elif 'junior' in exp or 'entry' in exp:
+        level_prefix = 'Junior '
+
+    queries = []
+    for domain, keywords in SKILL_DOMAINS.items():
+        if any(any(kw in skill.lower() for kw in keywords) for skill in skills):
+            queries.append(f"{level_prefix}{domain.capitalize()} Developer")
+    return queries
+
+
+@lru_cache(maxsize=512)
+def _plan(career_goals: str, skills: Tuple[str, ...],
+          experience_level: str, max_queries: int) -> Tuple[str, ...]:
+    candidates = _title_phrases(career_goals) + _domain_queries(skills, experience_level)
+    ranked, seen = [], set()
+    for query in candidates:
+        if query.lower() not in seen:
+            seen.add(query.lower())
+            ranked.append(query)
+    return tuple(ranked[:max_queries] or [FALLBACK_QUERY])
+
+
+def plan_queries(profile_data: Dict[str, Any], max_queries: int = MAX_QUERIES) -> List[str]:
+    """
+    Ranked search queries for a profile, best first. Results are memoized
+    on the profile fields that drive planning, so repeated match requests
+    for an unchanged profile skip the derivation.
+    """
+    skills = tuple(str(s) for s in profile_data.get('skills', []) or [])
+    return list(_plan(
+        profile_data.get('career_goals', '') or '',
+        skills,
+        profile_data.get('experience_level', '') or '',
+        max_queries
+    ))
+
+
+def _job_key(job: Dict[str, Any]) -> str:
+    return job.get('job_hash') or f"{job.get('title', '')}|{job.get('company', '')}|{job.get('location', '')}"
+
+
+def run_queries(search_fn: Callable[[str], List[Dict[str, Any]]], queries: List[str],
+                deadline_secs: float = QUERY_DEADLINE_SECS) -> List[Dict[str, Any]]:
+    """
+    Run search_fn for every query concurrently and merge the results.
+
+    Queries still running at the deadline are abandoned (their scrapes still
+    land in the job cache for later requests). If nothing has finished by the
+    deadline, the first query to complete is used. Results are merged in query
+    rank order and deduplicated by job hash.
+    """
+    if not queries:
+        return []
+
+    started = time.time()
+    executor = ThreadPoolExecutor(max_workers=len(queries), thread_name_prefix="job-query")
+    futures = {executor.submit(search_fn, q): q for q in queries}
+    try:
+        done, pending = wait(futures, timeout=deadline_secs)
+        if not done:
+            done, pending = wait(futures, return_when=FIRST_COMPLETED)
+        if pending:
+            logger.info(f"Query deadline reached, skipping: {[futures[f] for f in pending]}")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    merged, seen = [], set()
+    for future, query in futures.items():
+        if future not in done:
+            continue
+        try:
+            jobs = future.result() or []
+        except Exception as e:
+            logger.warning(f"Search query '{query}' failed: {e}")
+            continue
+        for job in jobs:
+            key = _job_key(job)
+            if key not in seen:
+                seen.add(key)
+                merged.append(job)
+
+    logger.info(f"Ran {len(done)}/{len(queries)} queries in {time.time() - started:.1f}s: {len(merged)} unique jobs")
+    return merged
@@ -32,6 +32,12 @@ from threading import Lock
 from collections import deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from .job_features import (
+    get_job_features, extract_skill_names, job_json_default, jobs_with_features, restore_job_features
+)
+from .model_router import GeminiProvider, ModelUnavailableError, get_model_router
+from .llm_governor import GovernorTimeout
+
 # Initialize Gemini client
 # The client gets the API key from the environment variable `GEMINI_API_KEY` or `GOOGLE_API_KEY`
 try:
@@ -74,7 +80,7 @@ class ScraperConfig:
     # AI settings
     enable_ai_descriptions: bool = True
     min_description_length: int = 100
-    ai_model: str = "gemini-2.0-flash"
+    # Models come from the router's 'fast' tier (MODEL_TIER_FAST)
     ai_temperature: float = 0.7
     ai_max_tokens: int = 2000
     
@@ -186,6 +192,26 @@ class RateLimiter:
             return func(*args, **kwargs)
         return wrapper
 
+
+# Callbacks notified whenever freshly scraped jobs are written to the job cache.
+# Each listener is called as listener(search_term, location, jobs).
+_job_cache_listeners = []
+
+
+def register_job_cache_listener(listener):
+    """Register a callback fired when fresh jobs land in the job cache"""
+    if listener not in _job_cache_listeners:
+        _job_cache_listeners.append(listener)
+
+
+def _notify_job_cache_listeners(search_term: str, location: str, jobs: List[Dict[str, Any]]):
+    for listener in list(_job_cache_listeners):
+        try:
+            listener(search_term, location, jobs)
+        except Exception as e:
+            logging.getLogger(__name__).warning(f"Job cache listener failed: {e}")
+
+
 class AdvancedJobScraper:
     """
     Advanced job scraper with deduplication, scoring, caching, and enrichment features
@@ -399,7 +425,7 @@ class AdvancedJobScraper:
             'salary_period': 'yearly'
         }
 
-        text = f"{job.get('title', '')} {job.get('description', '')}".lower()
+        text = get_job_features(job).skill_text
 
         # Enhanced salary patterns
         patterns = [
@@ -453,44 +479,17 @@ class AdvancedJobScraper:
 
     def extract_skills(self, job: Dict[str, Any]) -> List[str]:
         """Extract technical skills from job description"""
-        skills = []
-        text = f"{job.get('title', '')} {job.get('description', '')}".lower()
-
-        # Expanded technical skills dictionary
-        common_skills = [
-            'python', 'java', 'javascript', 'typescript', 'c\\+\\+', 'c#', 'php', 'ruby', 'go', 'rust', 'kotlin', 'swift',
-            'react', 'angular', 'vue', 'svelte', 'node.js', 'express', 'django', 'flask', 'spring', 'fastapi',
-            'sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch', 'cassandra', 'dynamodb',
-            'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'terraform', 'jenkins', 'github actions', 'gitlab',
-            'git', 'linux', 'unix', 'windows', 'bash', 'shell scripting',
-            'agile', 'scrum', 'kanban', 'jira', 'confluence',
-            'machine learning', 'deep learning', 'ai', 'nlp', 'computer vision',
-            'data science', 'data analysis', 'tensorflow', 'pytorch', 'scikit-learn', 'pandas', 'numpy',
-            'rest api', 'graphql', 'microservices', 'ci/cd', 'devops',
-            'html', 'css', 'sass', 'tailwind', 'bootstrap',
-            'api', 'rest', 'graphql', 'websockets',
-            'testing', 'unit testing', 'integration testing', 'pytest', 'jest',
-            'spark', 'hadoop', 'kafka', 'airflow', 'etl'
-        ]
-
-        for skill in common_skills:
-            # Use word boundary for better matching
-            pattern = r'\b' + skill.replace('\\', '\\\\') + r'\b'
-            if re.search(pattern, text, re.IGNORECASE):
-                # Format skill name properly
-                skill_name = skill.replace('\\+\\+', '++').replace('\\', '')
-                skills.append(skill_name.title() if skill_name.islower() else skill_name)
-
-        return sorted(list(set(skills)))  # Remove duplicates and sort
+        return extract_skill_names(get_job_features(job).skill_text)
 
     def score_job_relevance(self, job: Dict[str, Any], search_term: str) -> float:
         """Score job relevance based on title and description match with search term"""
         score = 0.0
         search_lower = search_term.lower()
         search_words = set(search_lower.split())
-        
-        title = job.get('title', '').lower()
-        description = job.get('description', '').lower()
+
+        features = get_job_features(job)
+        title = features.title
+        description = features.description
 
         # Exact title match (highest score)
         if search_lower == title.strip():
@@ -500,20 +499,18 @@ class AdvancedJobScraper:
             score += 1.5
         # Title contains search words
         else:
-            title_words = set(title.split())
-            matching_words = search_words.intersection(title_words)
+            matching_words = search_words.intersection(features.title_tokens)
             score += len(matching_words) * 0.3
 
         # Description matches
         if search_lower in description:
             score += 0.4
         else:
-            desc_words = set(description.split())
-            matching_words = search_words.intersection(desc_words)
+            matching_words = search_words.intersection(features.description_tokens)
             score += len(matching_words) * 0.1
 
         # Skills matching search term
-        skills = job.get('skills', [])
+        skills = features.skills
         if skills:
             skill_keywords = ' '.join([s.lower() for s in skills])
             if any(word in skill_keywords for word in search_words):
@@ -560,11 +557,15 @@ class AdvancedJobScraper:
                     job['description'] = self.generate_job_description_with_ai(job, search_term)
                     job['description_source'] = 'ai_generated'
 
+                # Build normalized features once the description is final;
+                # salary, skills and relevance below all read from them
+                features = get_job_features(job)
+
                 # Add salary information
-                job['salary_info'] = self.extract_salary_info(job)
+                job['salary_info'] = features.salary = self.extract_salary_info(job)
 
                 # Add extracted skills
-                job['skills'] = self.extract_skills(job)
+                job['skills'] = features.skills
 
                 # Add relevance score
                 job['relevance_score'] = self.score_job_relevance(job, search_term)
@@ -724,46 +725,21 @@ class AdvancedJobScraper:
             Use professional language and ensure it's detailed enough for creating cover letters.
             """
 
-            models_to_try = [self.config.ai_model, 'gemini-2.5-flash', 'gemini-1.5-flash-8b']
-            # Deduplicate preserving order
-            models_to_try = list(dict.fromkeys([m for m in models_to_try if m]))
-
-            last_error = None
-            
-            for model_id in models_to_try:
-                try:
-                    response = client.models.generate_content(
-                        model=model_id,
-                        contents=prompt,
-                        config=genai.GenerateContentConfig(
-                            temperature=self.config.ai_temperature,
-                            max_output_tokens=self.config.ai_max_tokens,
-                        )
-                    )
-                    
-                    if response and response.text:
-                        return response.text.strip()
-                except Exception as e:
-                    # Check for rate limit errors
-                    if "429" in str(e) or "RESOURCE_EXHAUSTED" in str(e):
-                        self.logger.warning(f"Model {model_id} rate limited. Trying next model...")
-                        last_error = e
-                        continue
-                    else:
-                         self.logger.warning(f"Model {model_id} error: {e}")
-                         # Try next model for other errors too, just in case
-                         last_error = e
-                         continue
-            
-            # If we get here, all models failed
-            if last_error:
-                self.logger.error(f"All AI models failed. Last error: {last_error}")
-
-            if response and response.text:
-                return response.text.strip()
-            else:
-                # Fallback description
-                return f"""
+            # The router picks the fastest healthy model of the description
+            # tier and skips models whose circuit is open after repeated 429/503s
+            try:
+                return get_model_router().generate(
+                    'description', prompt, provider=GeminiProvider(client),
+                    temperature=self.config.ai_temperature,
+                    max_output_tokens=self.config.ai_max_tokens
+                )
+            except ModelUnavailableError as e:
+                self.logger.error(f"All AI models failed: {e}")
+            except GovernorTimeout as e:
+                self.logger.warning(f"AI job description timed out waiting for LLM budget: {e}")
+
+            # Fallback description
+            return f"""
                 {job.get('company', 'This company')} is seeking a {job.get('title', search_term)} to join their team in {job.get('location', 'this location')}.
 
                 As a {search_term}, you will be responsible for contributing to software development projects, working with modern technologies, and collaborating with cross-functional teams to deliver high-quality solutions.
@@ -803,17 +779,16 @@ class AdvancedJobScraper:
             required = [s.lower() for s in filters['required_skills']]
             filtered_jobs = [
                 j for j in filtered_jobs
-                if any(skill.lower() in [s.lower() for s in j.get('skills', [])] for skill in required)
+                if any(skill in get_job_features(j).skill_set for skill in required)
             ]
 
         # Filter by salary range
         if 'min_salary' in filters:
             min_salary = filters['min_salary']
-            filtered_jobs = [
-                j for j in filtered_jobs
-                if j.get('salary_info', {}).get('salary_min') and
-                j['salary_info']['salary_min'] >= min_salary
-            ]
+            def _meets_salary(j):
+                salary_min = get_job_features(j).salary.get('salary_min')
+                return bool(salary_min) and salary_min >= min_salary
+            filtered_jobs = [j for j in filtered_jobs if _meets_salary(j)]
 
         # Filter by location keywords
         if 'location_keywords' in filters:
@@ -843,7 +818,7 @@ class AdvancedJobScraper:
         try:
             if format.lower() == 'json':
                 with open(f"{filename}.json", 'w', encoding='utf-8') as f:
-                    json.dump(jobs, f, ensure_ascii=False, indent=2, default=str)
+                    json.dump(jobs, f, ensure_ascii=False, indent=2, default=job_json_default)
             elif format.lower() == 'csv':
                 df = pd.DataFrame(jobs)
                 # Flatten nested dicts for CSV
@@ -888,7 +863,7 @@ class AdvancedJobScraper:
 
         try:
             with open(cache_file, 'r', encoding='utf-8') as f:
-                cached_data = json.load(f)
+                cached_data = [restore_job_features(job) for job in json.load(f)]
                 self.metrics.total_cache_hits += 1
                 self.logger.info(f" Cache hit: Loaded {len(cached_data)} jobs from cache")
                 return cached_data
@@ -903,7 +878,7 @@ class AdvancedJobScraper:
 
         try:
             with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(jobs, f, ensure_ascii=False, indent=2, default=str)
+                json.dump(jobs_with_features(jobs), f, ensure_ascii=False, indent=2, default=job_json_default)
             self.logger.info(f"Cached {len(jobs)} jobs")
         except Exception as e:
             self.logger.warning(f"Error saving cache: {e}")
@@ -925,6 +900,7 @@ class AdvancedJobScraper:
                 with open(path, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                     if isinstance(data, list) and len(data) > 0:
+                        data = [restore_job_features(job) for job in data]
                         self.logger.info(f" Using recent cached jobs from {fname}")
                         self.metrics.total_cache_hits += 1
                         return data
@@ -954,9 +930,12 @@ class AdvancedJobScraper:
                                     enable_url_scraping: Optional[bool] = None,
                                     enable_ai_descriptions: Optional[bool] = None,
                                     min_description_length: Optional[int] = None,
+                                    notify_listeners: bool = True,
                                     **scrape_params) -> List[Dict[str, Any]]:
         """
-        Advanced scraping with all features: deduplication, enrichment, filtering, caching
+        Advanced scraping with all features: deduplication, enrichment, filtering, caching.
+        notify_listeners=False leaves job cache listeners to the caller (e.g. a
+        request that scores the scraped jobs itself).
         """
         # Use config defaults if not specified
         cache_age_hours = cache_age_hours or self.config.cache_max_age_hours
@@ -965,6 +944,8 @@ class AdvancedJobScraper:
         min_description_length = min_description_length or self.config.min_description_length
         
         self.logger.info(f" Starting advanced scrape for '{search_term}' in '{location}'")
+        # `location` is reused per row below; keep the searched location for listeners
+        search_location = location
 
         # Check cache first
         cache_key = None
@@ -1091,6 +1072,10 @@ class AdvancedJobScraper:
         if use_cache and cache_key and processed_jobs:
             self.save_to_cache(cache_key, processed_jobs)
 
+        # Let background consumers (e.g. match materializer) react to fresh jobs
+        if processed_jobs and notify_listeners:
+            _notify_job_cache_listeners(search_term, search_location, processed_jobs)
+
         # Log metrics summary
         self.metrics.log_summary(self.logger)
         
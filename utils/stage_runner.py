@@ -0,0 +1,84 @@
+"""
+Stage Runner
+Runs the stages of one application (CV tailoring, cover letter, interview
+prep, ...) either one after another or overlapped on a shared executor,
+recording per-stage timings. When the application fails, stages that were
+started in the background are cancelled or waited for, so none of them keeps
+writing into the abandoned output directory.
+"""
+
+import contextvars
+import logging
+import time
+from concurrent.futures import Executor, Future, wait
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StageRunner:
+    """
+    Example:
+        stages = StageRunner(executor if concurrent else None)
+        stages.start('cover_letter', write_cover_letter, None)
+        cv = stages.timed('tailored_cv', tailor_cv, job)
+        letter = stages.result('cover_letter', write_cover_letter, cv)
+
+    Args:
+        executor: Pool for background stages; None runs every stage inline
+    """
+
+    def __init__(self, executor: Optional[Executor] = None):
+        self.executor = executor
+        self.timings: Dict[str, float] = {}
+        self._futures: Dict[str, Future] = {}
+        self._started = time.perf_counter()
+
+    @property
+    def concurrent(self) -> bool:
+        return self.executor is not None
+
+    def timed(self, stage: str, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn now, recording its duration under stage"""
+        stage_started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.timings[stage] = round(time.perf_counter() - stage_started, 3)
+
+    def start(self, name: str, fn: Callable, *args, **kwargs) -> bool:
+        """
+        Start fn in the background in a copy of the caller's context (keeps
+        its LLM priority). Returns False without running anything when not
+        concurrent; result() then runs the stage inline.
+        """
+        if not self.concurrent:
+            return False
+        self._futures[name] = self.executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+        return True
+
+    def result(self, name: str, fn: Callable, *args, **kwargs) -> Any:
+        """Result of the stage started as name, or fn(*args, **kwargs) run inline if it was not started"""
+        future = self._futures.pop(name, None)
+        if future is None:
+            return fn(*args, **kwargs)
+        return future.result()
+
+    def cancel(self, timeout: Optional[float] = None) -> int:
+        """
+        Cancel background stages that have not started and wait for the
+        running ones (their errors are logged, not raised). Returns the
+        number of stages that were cancelled before running.
+        """
+        futures, self._futures = self._futures, {}
+        cancelled = sum(1 for future in futures.values() if future.cancel())
+        wait(list(futures.values()), timeout=timeout)
+        for name, future in futures.items():
+            if not future.cancelled() and future.done() and future.exception() is not None:
+                logger.warning(f"Abandoned stage {name} failed: {future.exception()}")
+        return cancelled
+
+    def finish(self) -> Dict[str, float]:
+        """Record the total duration and return the timings"""
+        self.timings['total'] = round(time.perf_counter() - self._started, 3)
+        return self.timings
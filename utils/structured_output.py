@@ -0,0 +1,246 @@
+"""
+Structured LLM Output
+Typed models for JSON the agents are asked to return, a repair pass for
+near-miss JSON (code fences, raw newlines in strings, trailing commas,
+Python literals, truncated output) and validation of responses against the
+models, so a slightly malformed answer is used instead of discarded.
+"""
+
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional, Type, TypeVar
+
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field, ValidationError, field_validator
+
+logger = logging.getLogger(__name__)
+
+M = TypeVar('M', bound=BaseModel)
+
+_PY_LITERALS = {'True': 'true', 'False': 'false', 'None': 'null'}
+_VALID_ESCAPES = set('"\\/bfnrtu')
+_CONTROL_ESCAPES = {'\n': '\\n', '\r': '\\r', '\t': '\\t'}
+
+
+def _string_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [line.strip() for line in value.splitlines() if line.strip()]
+    if isinstance(value, (list, tuple)):
+        return [str(v).strip() for v in value if v is not None and str(v).strip()]
+    return [str(value)]
+
+
+class TailoredCVOutput(BaseModel):
+    """Response of the CV tailoring prompt"""
+    model_config = ConfigDict(extra='ignore')
+
+    cv_content: str = Field(validation_alias=AliasChoices('cv_content', 'optimized_cv', 'cv_markdown', 'cv'),
+                            description="Full markdown of the CV")
+    ats_analysis: str = Field('Analysis not available', description="Brief ATS analysis")
+    ats_score: Optional[int] = Field(None, description="ATS score from 0 to 100")
+    summary: str = Field('', description="1-2 paragraph professional summary")
+    experience: List[str] = Field(default_factory=list, description="Bullet points for roles/projects")
+    projects: List[str] = Field(default_factory=list, description="Bullet points for projects")
+    education: List[str] = Field(default_factory=list, description="Bullet points for education")
+
+    @field_validator('cv_content')
+    @classmethod
+    def _non_empty(cls, value):
+        if not value or not value.strip():
+            raise ValueError('cv_content is empty')
+        return value
+
+    @field_validator('ats_score', mode='before')
+    @classmethod
+    def _score(cls, value):
+        # "85", "85/100", 85.5 -> 85, clamped to 0-100; anything else -> None
+        if value is None or isinstance(value, bool):
+            return None
+        match = re.search(r'\d+(?:\.\d+)?', str(value))
+        return max(0, min(100, round(float(match.group(0))))) if match else None
+
+    @field_validator('experience', 'projects', 'education', mode='before')
+    @classmethod
+    def _lists(cls, value):
+        return _string_list(value)
+
+    @field_validator('summary', 'ats_analysis', mode='before')
+    @classmethod
+    def _text(cls, value):
+        if isinstance(value, (list, tuple)):
+            return '\n'.join(_string_list(value))
+        return '' if value is None else str(value)
+
+
+class ProfileOutput(BaseModel):
+    """Candidate profile as returned by the profile agent"""
+    model_config = ConfigDict(extra='ignore')
+
+    name: str = ''
+    email: str = ''
+    phone: str = ''
+    location: str = ''
+    skills: List[str] = Field(default_factory=list)
+    experience_level: str = ''
+    education: str = ''
+    strengths: List[str] = Field(default_factory=list)
+    career_goals: str = ''
+    links: Dict[str, str] = Field(default_factory=dict)
+
+    @field_validator('skills', 'strengths', mode='before')
+    @classmethod
+    def _lists(cls, value):
+        if isinstance(value, str):
+            return [s.strip() for s in re.split(r'[,\n;]', value) if s.strip()]
+        return _string_list(value)
+
+    @field_validator('name', 'email', 'phone', 'location', 'experience_level', 'education', 'career_goals', mode='before')
+    @classmethod
+    def _text(cls, value):
+        if isinstance(value, (list, tuple)):
+            return ', '.join(_string_list(value))
+        return '' if value is None else str(value)
+
+    @field_validator('links', mode='before')
+    @classmethod
+    def _links(cls, value):
+        if not isinstance(value, dict):
+            return {}
+        return {str(k): str(v or '') for k, v in value.items()}
+
+
+def response_text(response: Any) -> str:
+    """Text of an agent response (RunResponse, CachedResponse or str)"""
+    content = response.content if hasattr(response, 'content') else response
+    if isinstance(content, BaseModel):
+        return content.model_dump_json()
+    if isinstance(content, dict):
+        return json.dumps(content)
+    return '' if content is None else str(content)
+
+
+def repair_json(text: str) -> Optional[str]:
+    """
+    Best-effort valid JSON for the first object in text. Skips surrounding
+    prose and code fences, escapes raw control characters and invalid
+    backslashes inside strings, converts single-quoted strings and Python
+    True/False/None, drops trailing commas and closes truncated output.
+    Returns None if text contains no object.
+    """
+    start = (text or '').find('{')
+    if start < 0:
+        return None
+    out = []
+    stack = []
+    quote = None  # quote character of the string being copied
+    i, n = start, len(text)
+    while i < n:
+        c = text[i]
+        if quote:
+            if c == '\\':
+                nxt = text[i + 1] if i + 1 < n else ''
+                if nxt and nxt in _VALID_ESCAPES:
+                    out.append(c + nxt)
+                    i += 2
+                    continue
+                if nxt == "'":
+                    out.append("'")
+                    i += 2
+                    continue
+                out.append('\\\\')
+            elif c == quote:
+                out.append('"')
+                quote = None
+            elif c == '"':
+                out.append('\\"')
+            elif c in _CONTROL_ESCAPES:
+                out.append(_CONTROL_ESCAPES[c])
+            elif ord(c) < 0x20:
+                out.append('\\u%04x' % ord(c))
+            else:
+                out.append(c)
+            i += 1
+            continue
+
+        if c in '"\'':
+            quote = c
+            out.append('"')
+        elif c in '{[':
+            stack.append('}' if c == '{' else ']')
+            out.append(c)
+        elif c in '}]':
+            _strip_trailing_comma(out)
+            if stack:
+                out.append(stack.pop())
+            if not stack:
+                break
+        elif c.isalpha():
+            j = i
+            while j < n and (text[j].isalnum() or text[j] == '_'):
+                j += 1
+            word = text[i:j]
+            out.append(_PY_LITERALS.get(word, word))
+            i = j
+            continue
+        else:
+            out.append(c)
+        i += 1
+
+    # Truncated output: close the open string, value and containers
+    if quote:
+        out.append('"')
+    if stack:
+        tail = ''.join(out).rstrip()
+        if tail.endswith(':'):
+            out.append(' null')
+        _strip_trailing_comma(out)
+        out.extend(reversed(stack))
+    return ''.join(out)
+
+
+def _strip_trailing_comma(out: List[str]):
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ',':
+        out.pop()
+
+
+def extract_json(response: Any) -> Optional[Dict[str, Any]]:
+    """The JSON object in an agent response, repaired if needed; None if there is none"""
+    content = response_text(response).strip()
+    candidates = [content]
+    repaired = repair_json(content)
+    if repaired and repaired != content:
+        candidates.append(repaired)
+    for candidate in candidates:
+        try:
+            data = json.loads(candidate)
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            return data
+    return None
+
+
+def parse_structured(response: Any, model: Type[M]) -> Optional[M]:
+    """
+    Validate an agent response against model.
+
+    Returns:
+        The model instance, or None if the response holds no JSON object or
+        the object does not validate (the caller falls back)
+    """
+    content = response.content if hasattr(response, 'content') else response
+    if isinstance(content, model):
+        return content
+    data = extract_json(response)
+    if data is None:
+        logger.warning(f"No JSON object in {model.__name__} response")
+        return None
+    try:
+        return model.model_validate(data)
+    except ValidationError as e:
+        logger.warning(f"{model.__name__} response failed validation: {e.error_count()} errors")
+        return None
@@ -0,0 +1,86 @@
+"""
+Upload Streaming
+Writes an uploaded file to disk in chunks while computing its SHA-256 and
+enforcing a size limit, so the upload is never held in memory and the path
+can be handed straight to extraction and storage.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+from typing import BinaryIO, Optional
+
+MAX_CV_UPLOAD_BYTES = int(os.getenv('MAX_CV_UPLOAD_BYTES', str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    """Raised as soon as an upload passes its size limit"""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"File exceeds the {max_bytes // (1024 * 1024)} MB upload limit")
+        self.max_bytes = max_bytes
+
+
+class HashingUploadFile:
+    """
+    Writable/readable temp file that hashes everything written to it and
+    refuses to grow past max_bytes (the partial file is removed). Suitable
+    as the target werkzeug streams multipart file parts into.
+    """
+
+    def __init__(self, directory: str, suffix: str = '', max_bytes: Optional[int] = MAX_CV_UPLOAD_BYTES):
+        self._file = tempfile.NamedTemporaryFile(dir=directory, suffix=suffix, prefix='upload_', delete=False)
+        self._sha = hashlib.sha256()
+        self.max_bytes = max_bytes
+        self.size = 0
+
+    @property
+    def path(self) -> str:
+        return self._file.name
+
+    @property
+    def sha256(self) -> str:
+        return self._sha.hexdigest()
+
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        if self.max_bytes and self.size > self.max_bytes:
+            self.discard()
+            raise UploadTooLarge(self.max_bytes)
+        self._sha.update(data)
+        return self._file.write(data)
+
+    def discard(self):
+        """Close and delete the file"""
+        try:
+            self._file.close()
+        finally:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def __getattr__(self, name):
+        # read, readline, seek, tell, flush, close, ... go to the temp file
+        return getattr(self._file, name)
+
+    def __iter__(self):
+        return iter(self._file)
+
+
+def upload_suffix(filename: Optional[str]) -> str:
+    return os.path.splitext(filename or '')[1].lower()
+
+
+def stream_to_tempfile(stream: BinaryIO, directory: str, suffix: str = '',
+                       max_bytes: Optional[int] = MAX_CV_UPLOAD_BYTES) -> HashingUploadFile:
+    """
+    Copy a readable stream into a HashingUploadFile in UPLOAD_CHUNK_BYTES chunks.
+
+    Raises:
+        UploadTooLarge: as soon as more than max_bytes have been read
+    """
+    target = HashingUploadFile(directory, suffix, max_bytes)
+    shutil.copyfileobj(stream, target, UPLOAD_CHUNK_BYTES)
+    target.flush()
+    return target